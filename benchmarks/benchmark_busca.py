@@ -0,0 +1,71 @@
+"""
+Benchmark da busca textual nas referências
+Compara o índice FTS5 do pacote de referências com a varredura LIKE '%termo%' nas mesmas tabelas
+"""
+
+import sqlite3
+import os
+import sys
+import time
+import argparse
+import statistics
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from config.settings import FILES
+from config.busca import buscar, conectar_busca
+
+TERMOS_PADRAO = ['pneumonia', 'parto cesariano', 'diabetes', 'insuficiencia cardiaca', 'curitiba', 'J18', 'J18.9']
+
+# Varredura equivalente sem índice (LIKE não ignora acentos, por isso encontra menos)
+SQL_LIKE = '''
+    SELECT 'cid', codigo, descricao FROM cid10 WHERE descricao LIKE :termo OR codigo LIKE :termo
+    UNION ALL
+    SELECT 'procedimento', codigo, descricao FROM procedimentos WHERE descricao LIKE :termo OR codigo LIKE :termo
+    UNION ALL
+    SELECT 'municipio', codigo6, nome FROM municipios WHERE nome LIKE :termo
+    LIMIT :limite
+'''
+
+def mediana_ms(funcao, repeticoes):
+    """Mediana do tempo de execução da função, em milissegundos"""
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return statistics.median(tempos)
+
+def executar_benchmark(termos, repeticoes=50, limite=20):
+    """Mede cada termo no FTS5 e no LIKE; retorna {termo: {fts_ms, like_ms, fts_linhas, like_linhas}}"""
+
+    busca = conectar_busca()
+    varredura = sqlite3.connect(FILES['referencias'])
+
+    resultados = {}
+    for termo in termos:
+        parametros = {'termo': f'%{termo}%', 'limite': limite}
+        resultados[termo] = {
+            'fts_ms': mediana_ms(lambda: buscar(termo, limite=limite, conn=busca), repeticoes),
+            'like_ms': mediana_ms(lambda: varredura.execute(SQL_LIKE, parametros).fetchall(), repeticoes),
+            'fts_linhas': len(buscar(termo, limite=limite, conn=busca)),
+            'like_linhas': len(varredura.execute(SQL_LIKE, parametros).fetchall()),
+        }
+
+    busca.close()
+    varredura.close()
+    return resultados
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Compara a busca FTS5 com LIKE nas referências')
+    parser.add_argument('--termos', nargs='+', default=TERMOS_PADRAO)
+    parser.add_argument('--repeticoes', type=int, default=50)
+    args = parser.parse_args()
+
+    print("=== BENCHMARK BUSCA TEXTUAL ===")
+    resultados = executar_benchmark(args.termos, args.repeticoes)
+
+    print(f"\n{'termo':<26}{'fts5 (ms)':>11}{'linhas':>8}{'like (ms)':>11}{'linhas':>8}")
+    for termo, r in resultados.items():
+        print(f"{termo:<26}{r['fts_ms']:>11.2f}{r['fts_linhas']:>8}{r['like_ms']:>11.2f}{r['like_linhas']:>8}")
@@ -0,0 +1,98 @@
+"""
+Benchmark da compactação do DataFrame do dashboard
+Gera o banco sintético do harness de planos, carrega a consulta principal do dashboard e compara
+a cópia original com a compactada (config/compactacao.py): memória, tempo das agregações usadas
+pelas páginas e os KPIs da Visão Geral, que precisam bater
+"""
+
+import sqlite3
+import os
+import sys
+import time
+import argparse
+import tempfile
+import statistics
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(BASE_DIR, 'benchmarks'))
+sys.path.insert(0, BASE_DIR)
+
+from config.motor import executar_consulta
+from config.compactacao import compactar_dados, verificar_kpis
+from plano_consultas import criar_banco_sintetico
+
+# Agregações feitas pelas páginas sobre o DataFrame em cache
+OPERACOES = {
+    'value_counts diagnóstico': lambda df: df['diagnostico_principal'].value_counts(),
+    'groupby diagnóstico (soma)': lambda df: df.groupby('diagnostico_principal', observed=True)['valor_total'].sum(),
+    'groupby caráter (média)': lambda df: df.groupby('carater_internacao', observed=True)['valor_total'].mean(),
+    'groupby município (soma)': lambda df: df.groupby('codigo_municipio_residencia', observed=True)['valor_total'].sum(),
+    'filtro idade + sexo': lambda df: df[(df['idade_anos'] >= 60) & (df['sexo'] == 'Feminino')],
+    'cópia (apply_filters)': lambda df: df.copy(),
+}
+
+def mediana_ms(funcao, df, repeticoes):
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao(df)
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return statistics.median(tempos)
+
+def executar_benchmark(registros, repeticoes=5, banco=None):
+    """Memória, tempos e conferência dos KPIs da base original e da compactada"""
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = banco
+        if not db_path:
+            db_path = os.path.join(tmp, 'sintetico.db')
+            criar_banco_sintetico(db_path, registros)
+        conn = sqlite3.connect(db_path)
+        original = executar_consulta('dashboard_dados_principais', conn)
+        conn.close()
+
+    inicio = time.perf_counter()
+    compacto = compactar_dados(original)
+    tempo_compactacao = (time.perf_counter() - inicio) * 1000
+
+    return {
+        'linhas': len(original),
+        'memoria_mb': {
+            'original': original.memory_usage(deep=True).sum() / 1024 ** 2,
+            'compacto': compacto.memory_usage(deep=True).sum() / 1024 ** 2,
+        },
+        'compactacao_ms': tempo_compactacao,
+        'tipos': {coluna: str(compacto[coluna].dtype) for coluna in compacto.columns},
+        'operacoes': {
+            nome: {'original_ms': mediana_ms(funcao, original, repeticoes),
+                   'compacto_ms': mediana_ms(funcao, compacto, repeticoes)}
+            for nome, funcao in OPERACOES.items()
+        },
+        'kpis_divergentes': verificar_kpis(original, compacto),
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Mede a compactação do DataFrame principal do dashboard')
+    parser.add_argument('--registros', type=int, default=500_000)
+    parser.add_argument('--repeticoes', type=int, default=5)
+    parser.add_argument('--banco', help='Usa um banco existente em vez de gerar o sintético')
+    args = parser.parse_args()
+
+    print(f"=== BENCHMARK COMPACTAÇÃO ({'banco ' + args.banco if args.banco else f'{args.registros:,} internações'}) ===")
+    r = executar_benchmark(args.registros, args.repeticoes, args.banco)
+
+    memoria = r['memoria_mb']
+    print(f"\nLinhas: {r['linhas']:,} | compactação em {r['compactacao_ms']:.0f} ms")
+    print(f"Memória: {memoria['original']:.1f} MB → {memoria['compacto']:.1f} MB "
+          f"({memoria['original'] / memoria['compacto']:.1f}x menor)")
+    print(f"Valores em float32: {', '.join(c for c, t in r['tipos'].items() if t == 'float32') or 'nenhum (KPIs mudariam)'}")
+
+    print(f"\n{'operação':<30}{'original (ms)':>15}{'compacto (ms)':>15}{'ganho':>9}")
+    for nome, o in r['operacoes'].items():
+        ganho = o['original_ms'] / o['compacto_ms'] if o['compacto_ms'] > 0 else float('nan')
+        print(f"{nome:<30}{o['original_ms']:>15.1f}{o['compacto_ms']:>15.1f}{ganho:>8.1f}x")
+
+    if r['kpis_divergentes']:
+        print(f"\n❌ KPIs diferentes após a compactação: {', '.join(r['kpis_divergentes'])}")
+        sys.exit(1)
+    print("\n✅ KPIs da Visão Geral iguais na base original e na compactada")
@@ -0,0 +1,171 @@
+"""
+Benchmark da carga das dimensões (CID, procedimentos e municípios)
+Compara a carga antiga (placeholders + UPDATE pelo pacote de referências) com a inserção
+já resolvida em uma única passada, medindo tempo e volume de escrita (frames do WAL)
+"""
+
+import sqlite3
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(BASE_DIR, 'scripts'))
+
+from create_database import create_lookup_tables
+from pacote_referencias import (
+    get_pacote_path, compilar_pacote_referencias, enriquecer_banco, inserir_dimensoes_resolvidas
+)
+
+def criar_banco_sintetico(db_path, pacote_path, registros, seed=42):
+    """Cria um banco com as tabelas de fato mínimas e códigos sorteados do pacote de referências"""
+
+    rng = np.random.default_rng(seed)
+    ref = sqlite3.connect(pacote_path)
+    cids = [row[0] for row in ref.execute('SELECT codigo FROM cid10')]
+    procedimentos = [row[0].lstrip('0') for row in ref.execute('SELECT codigo FROM procedimentos')]
+    municipios = [row[0] for row in ref.execute('SELECT codigo6 FROM municipios')]
+    ref.close()
+
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    create_lookup_tables(cursor)
+    cursor.execute('CREATE TABLE pacientes (id INTEGER PRIMARY KEY, codigo_municipio_residencia TEXT)')
+    cursor.execute('CREATE TABLE estabelecimentos (id INTEGER PRIMARY KEY, codigo_municipio_movimento TEXT)')
+    cursor.execute('''
+        CREATE TABLE internacoes (
+            id INTEGER PRIMARY KEY,
+            codigo_diagnostico_principal TEXT,
+            codigo_procedimento_solicitado TEXT
+        )
+    ''')
+
+    # Códigos desconhecidos (~5%) exercitam os placeholders
+    cid_sorteado = rng.choice(cids + ['X999'], registros)
+    procedimento_sorteado = rng.choice(procedimentos + ['999999999'], registros)
+    municipio_sorteado = rng.choice(municipios + ['999999'], registros)
+
+    cursor.executemany(
+        'INSERT INTO internacoes (codigo_diagnostico_principal, codigo_procedimento_solicitado) VALUES (?, ?)',
+        zip(cid_sorteado.tolist(), procedimento_sorteado.tolist())
+    )
+    cursor.executemany(
+        'INSERT INTO pacientes (codigo_municipio_residencia) VALUES (?)',
+        ((codigo,) for codigo in municipio_sorteado.tolist())
+    )
+    cursor.executemany(
+        'INSERT INTO estabelecimentos (codigo_municipio_movimento) VALUES (?)',
+        ((codigo,) for codigo in rng.choice(municipios, max(registros // 100, 1)).tolist())
+    )
+    conn.commit()
+    conn.close()
+
+def carga_placeholders(conn):
+    """Carga antiga: insere placeholders e depois atualiza cada linha pelo pacote"""
+
+    cursor = conn.cursor()
+    cursor.execute('''
+        INSERT OR IGNORE INTO cid_diagnosticos (codigo, descricao, capitulo, grupo, sensivel_atencao_basica)
+        SELECT DISTINCT codigo_diagnostico_principal,
+               'Diagnóstico ' || codigo_diagnostico_principal,
+               'Não classificado',
+               'Não classificado',
+               FALSE
+        FROM internacoes
+        WHERE codigo_diagnostico_principal IS NOT NULL
+    ''')
+    cursor.execute('''
+        INSERT OR IGNORE INTO procedimentos (codigo, descricao, grupo_procedimento)
+        SELECT DISTINCT codigo_procedimento_solicitado,
+               'Procedimento ' || codigo_procedimento_solicitado,
+               'Não classificado'
+        FROM internacoes
+        WHERE codigo_procedimento_solicitado IS NOT NULL
+        AND codigo_procedimento_solicitado != ''
+    ''')
+    cursor.execute('''
+        INSERT OR IGNORE INTO municipios (codigo, nome, regiao_saude)
+        SELECT DISTINCT codigo_municipio_residencia,
+               'Município ' || codigo_municipio_residencia,
+               'Paraná'
+        FROM pacientes
+        WHERE codigo_municipio_residencia IS NOT NULL
+        AND codigo_municipio_residencia != ''
+    ''')
+    cursor.execute('''
+        INSERT OR IGNORE INTO municipios (codigo, nome, regiao_saude)
+        SELECT DISTINCT codigo_municipio_movimento,
+               'Município ' || codigo_municipio_movimento,
+               'Paraná'
+        FROM estabelecimentos
+        WHERE codigo_municipio_movimento IS NOT NULL
+        AND codigo_municipio_movimento != ''
+    ''')
+    conn.commit()
+    enriquecer_banco(conn)
+
+def carga_resolvida(conn):
+    """Carga nova: cada linha de dimensão é gravada uma única vez, já resolvida"""
+    inserir_dimensoes_resolvidas(conn)
+    conn.commit()
+
+def medir(db_path, carga):
+    """Executa a carga em WAL sem checkpoint e mede tempo, linhas alteradas e frames gravados"""
+
+    conn = sqlite3.connect(db_path)
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA wal_autocheckpoint=0')
+    conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+    page_size = conn.execute('PRAGMA page_size').fetchone()[0]
+
+    inicio = time.perf_counter()
+    carga(conn)
+    duracao = time.perf_counter() - inicio
+
+    wal_path = db_path + '-wal'
+    # Cabeçalho do WAL tem 32 bytes; cada frame tem 24 bytes de cabeçalho + a página
+    frames = max(os.path.getsize(wal_path) - 32, 0) // (page_size + 24) if os.path.exists(wal_path) else 0
+    alteracoes = conn.total_changes
+    conn.close()
+
+    return {'duracao_segundos': duracao, 'linhas_alteradas': alteracoes, 'frames_wal': frames}
+
+def executar_benchmark(registros):
+    """Roda as duas cargas sobre cópias idênticas do mesmo banco sintético"""
+
+    pacote_path = get_pacote_path()
+    compilar_pacote_referencias(pacote_path)
+
+    resultados = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        base_path = os.path.join(tmp, 'base.db')
+        criar_banco_sintetico(base_path, pacote_path, registros)
+
+        for nome, carga in [('placeholders + UPDATE', carga_placeholders), ('inserção resolvida', carga_resolvida)]:
+            db_path = os.path.join(tmp, f'{len(resultados)}.db')
+            origem = sqlite3.connect(base_path)
+            destino = sqlite3.connect(db_path)
+            origem.backup(destino)
+            origem.close()
+            destino.close()
+
+            resultados[nome] = medir(db_path, carga)
+
+    return resultados
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Benchmark da carga das tabelas de dimensão')
+    parser.add_argument('--registros', type=int, default=100_000,
+                        help='Número de internações sintéticas')
+    args = parser.parse_args()
+
+    print(f"=== BENCHMARK DIMENSÕES ({args.registros:,} internações) ===")
+    resultados = executar_benchmark(args.registros)
+
+    print(f"\n{'carga':<25}{'tempo (s)':>12}{'linhas':>12}{'frames WAL':>12}")
+    for nome, r in resultados.items():
+        print(f"{nome:<25}{r['duracao_segundos']:>12.3f}{r['linhas_alteradas']:>12}{r['frames_wal']:>12}")
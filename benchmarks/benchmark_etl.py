@@ -0,0 +1,212 @@
+"""
+Benchmark ponta a ponta do ETL com dados RD sintéticos
+Monta um workspace temporário com uma cópia do projeto, gera os arquivos RD na escala
+pedida e executa cada etapa em um processo próprio, medindo tempo, vazão e pico de memória.
+Os resultados vão para benchmarks/resultados/etl_<registros>_<data>.json
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import subprocess
+import tracemalloc
+from datetime import datetime
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTADOS_DIR = os.path.join(BASE_DIR, 'benchmarks', 'resultados')
+
+# O que o workspace precisa do projeto (código e fontes do pacote de referências)
+ARQUIVOS_WORKSPACE = [
+    'scripts', 'dashboard', 'config', 'benchmarks', 'docs',
+    os.path.join('data', 'raw', 'legendas_colunas.txt'),
+    os.path.join('data', 'raw', 'tb_procedimento.txt'),
+]
+
+# Etapas na ordem em que rodam; o CNPJ fica de fora por depender de APIs externas
+ETAPAS_BENCHMARK = [
+    'pacote', 'geracao', 'consolidacao', 'limpeza', 'carga', 'dashboard',
+]
+
+def preparar_workspace(destino):
+    """Copia o projeto para o workspace e cria os diretórios de dados vazios"""
+
+    for item in ARQUIVOS_WORKSPACE:
+        origem = os.path.join(BASE_DIR, item)
+        if not os.path.exists(origem):
+            continue
+        alvo = os.path.join(destino, item)
+        if os.path.isdir(origem):
+            shutil.copytree(origem, alvo, ignore=shutil.ignore_patterns('__pycache__', 'resultados'))
+        else:
+            os.makedirs(os.path.dirname(alvo), exist_ok=True)
+            shutil.copy2(origem, alvo)
+
+    for diretorio in ['database', os.path.join('data', 'processed'), os.path.join('data', 'raw', 'dbc')]:
+        os.makedirs(os.path.join(destino, diretorio), exist_ok=True)
+
+def funcao_etapa(nome, registros, seed):
+    """Importa (já dentro do workspace) a função que executa a etapa"""
+
+    workspace = os.getcwd()
+    sys.path.insert(0, os.path.join(workspace, 'scripts'))
+
+    if nome == 'pacote':
+        from pacote_referencias import compilar_pacote_referencias
+        return lambda: compilar_pacote_referencias(forcar=True)
+
+    if nome == 'geracao':
+        sys.path.insert(0, os.path.join(workspace, 'benchmarks'))
+        from gerar_rd_sintetico import gerar_arquivos_rd
+        return lambda: gerar_arquivos_rd(os.path.join(workspace, 'data', 'raw', 'dbc'), registros, seed)
+
+    if nome == 'consolidacao':
+        from consolidar_simples import consolidar_csvs_simples
+        return consolidar_csvs_simples
+
+    if nome == 'limpeza':
+        import pandas as pd
+        from data_cleaning import clean_data
+        csv_path = os.path.join(workspace, 'data', 'processed', 'dados_completos_internacoes_pr_2025.csv')
+        return lambda: clean_data(pd.read_csv(csv_path, dtype=str, low_memory=False), os.path.basename(csv_path))
+
+    if nome == 'carga':
+        from pipeline import carregar_banco
+        return carregar_banco
+
+    if nome == 'dashboard':
+        sys.path.insert(0, os.path.join(workspace, 'dashboard'))
+        from main import load_main_data
+        return load_main_data
+
+    raise ValueError(f"Etapa desconhecida: {nome}")
+
+def medir_etapa(nome, registros, seed):
+    """Executa a etapa no processo atual e mede tempo e pico de memória (mesma medida do pipeline)"""
+
+    funcao = funcao_etapa(nome, registros, seed)
+
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    try:
+        resultado = funcao()
+        sucesso = resultado is not False
+        erro = None
+    except Exception as e:
+        sucesso = False
+        erro = f"{type(e).__name__}: {e}"
+    duracao = time.perf_counter() - inicio
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'etapa': nome,
+        'sucesso': sucesso,
+        'erro': erro,
+        'duracao_segundos': duracao,
+        'registros_por_segundo': registros / duracao if duracao > 0 else None,
+        'memoria_pico_mb': pico / (1024 * 1024),
+    }
+
+def executar_etapa_isolada(nome, workspace, registros, seed, log):
+    """Roda a etapa em um processo novo dentro do workspace, para que o pico de memória seja só dela"""
+
+    saida = os.path.join(workspace, f'resultado_{nome}.json')
+    comando = [
+        sys.executable, os.path.abspath(__file__),
+        '--etapa', nome, '--registros', str(registros), '--seed', str(seed), '--saida', saida,
+    ]
+    processo = subprocess.run(comando, cwd=workspace, stdout=log, stderr=subprocess.STDOUT)
+
+    if processo.returncode != 0 or not os.path.exists(saida):
+        return {
+            'etapa': nome, 'sucesso': False, 'erro': f'processo terminou com código {processo.returncode}',
+            'duracao_segundos': None, 'registros_por_segundo': None, 'memoria_pico_mb': None,
+        }
+
+    with open(saida, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def versao_codigo():
+    """Commit atual do repositório, para comparar resultados entre versões"""
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=BASE_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def executar_benchmark(registros, seed=42, etapas=None, manter_workspace=False):
+    """Executa as etapas em sequência para uma escala e grava o arquivo de resultados"""
+
+    etapas = etapas or ETAPAS_BENCHMARK
+    workspace = tempfile.mkdtemp(prefix='benchmark_etl_')
+    preparar_workspace(workspace)
+
+    print(f"=== BENCHMARK ETL: {registros:,} internações ===")
+    print(f"Workspace: {workspace}")
+
+    resultado = {
+        'registros': registros,
+        'seed': seed,
+        'inicio': datetime.now().isoformat(timespec='seconds'),
+        'commit': versao_codigo(),
+        'python': platform.python_version(),
+        'plataforma': platform.platform(),
+        'etapas': [],
+    }
+
+    with open(os.path.join(workspace, 'benchmark.log'), 'w', encoding='utf-8') as log:
+        for nome in etapas:
+            metrica = executar_etapa_isolada(nome, workspace, registros, seed, log)
+            resultado['etapas'].append(metrica)
+
+            if metrica['sucesso']:
+                print(f"✅ {nome}: {metrica['duracao_segundos']:.2f}s, "
+                      f"{metrica['registros_por_segundo']:,.0f} registros/s, pico {metrica['memoria_pico_mb']:.1f} MB")
+            else:
+                print(f"❌ {nome}: {metrica['erro']}")
+
+    os.makedirs(RESULTADOS_DIR, exist_ok=True)
+    resultados_path = os.path.join(
+        RESULTADOS_DIR, f"etl_{registros}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    )
+    with open(resultados_path, 'w', encoding='utf-8') as f:
+        json.dump(resultado, f, indent=2, ensure_ascii=False)
+    print(f"📄 Resultados: {resultados_path}")
+
+    if manter_workspace:
+        print(f"📁 Workspace mantido (log em benchmark.log): {workspace}")
+    else:
+        shutil.rmtree(workspace, ignore_errors=True)
+
+    return resultado
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Benchmark ponta a ponta do ETL com dados RD sintéticos')
+    parser.add_argument('--registros', type=int, nargs='+', default=[100_000],
+                        help='Escalas a medir (ex.: 100000 1000000 10000000)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--etapas', nargs='+', choices=ETAPAS_BENCHMARK,
+                        help='Executa apenas as etapas informadas (na ordem padrão)')
+    parser.add_argument('--manter-workspace', action='store_true',
+                        help='Não apaga o workspace temporário ao final')
+    # Uso interno: executa uma única etapa no workspace atual e grava a métrica em --saida
+    parser.add_argument('--etapa', choices=ETAPAS_BENCHMARK, help=argparse.SUPPRESS)
+    parser.add_argument('--saida', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.etapa:
+        metrica = medir_etapa(args.etapa, args.registros[0], args.seed)
+        with open(args.saida, 'w', encoding='utf-8') as f:
+            json.dump(metrica, f)
+        sys.exit(0)
+
+    etapas = [etapa for etapa in ETAPAS_BENCHMARK if not args.etapas or etapa in args.etapas]
+    for registros in args.registros:
+        executar_benchmark(registros, args.seed, etapas, args.manter_workspace)
+        print()
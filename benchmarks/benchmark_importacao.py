@@ -0,0 +1,156 @@
+"""
+Benchmark do tempo de importação do dashboard
+Roda `python -X importtime` num processo novo para a partida do dashboard (dashboard/main.py) e
+para a abertura de cada página, soma o tempo por biblioteca e confere que a partida não importa
+as páginas nem as bibliotecas de gráficos
+"""
+
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+from datetime import datetime
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DASHBOARD_DIR = os.path.join(BASE_DIR, 'dashboard')
+RESULTADOS_DIR = os.path.join(BASE_DIR, 'benchmarks', 'resultados')
+
+sys.path.insert(0, DASHBOARD_DIR)
+
+from pages import PAGINAS
+
+# Módulos que a partida não deve importar: as páginas e os gráficos são carregados sob demanda
+# (o streamlit já importa plotly.graph_objects para o tema dos gráficos; o plotly.express não)
+FORA_DA_PARTIDA = ['pages.', 'plotly.express', 'matplotlib', 'seaborn']
+
+# Marcadores gravados no stderr em volta da abertura da página
+INICIO_PAGINA = 'pagina:inicio'
+FIM_PAGINA = 'pagina:fim'
+
+def medir_importacao(codigo, pagina=None):
+    """
+    Executa o código num interpretador novo com -X importtime
+    Retorna (total_ms, {pacote: ms}, módulos importados), com o tempo próprio de cada módulo
+    somado no pacote de nível mais alto.
+    A linha da própria página é montada a partir dos marcadores: o tempo próprio dela é o tempo
+    de carregar_pagina menos o dos módulos que ela importou
+    """
+
+    saida = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', codigo],
+        cwd=DASHBOARD_DIR, capture_output=True, text=True, check=True
+    ).stderr
+
+    pacotes, modulos = {}, []
+    na_pagina, importados_pagina = False, 0
+    for linha in saida.splitlines():
+        if linha == INICIO_PAGINA:
+            na_pagina = True
+            continue
+        if linha.startswith(FIM_PAGINA):
+            na_pagina = False
+            linha = f"import time: {int(linha.split()[1]) - importados_pagina} | 0 | pages.{pagina}"
+        if not linha.startswith('import time:') or 'self [us]' in linha:
+            continue
+        proprio, _, nome = linha[len('import time:'):].split('|')
+        nome = nome.strip()
+        if nome in modulos:
+            continue
+        modulos.append(nome)
+        pacote = nome.split('.')[0]
+        pacotes[pacote] = pacotes.get(pacote, 0) + int(proprio) / 1000
+        if na_pagina:
+            importados_pagina += int(proprio)
+
+    return sum(pacotes.values()), pacotes, modulos
+
+def cenarios():
+    """
+    Partida do dashboard e abertura de cada página pelo carregar_pagina, como o dashboard faz
+    (cada uma num processo novo); devolve (nome, código, módulo da página)
+    """
+    yield 'partida', 'import main', None
+    for rotulo, modulo in PAGINAS.items():
+        yield modulo, (
+            'import sys, time, main\n'
+            'from pages import carregar_pagina\n'
+            f'print({INICIO_PAGINA!r}, file=sys.stderr, flush=True)\n'
+            'inicio = time.perf_counter()\n'
+            f'carregar_pagina({rotulo!r})\n'
+            f'print({FIM_PAGINA!r}, int((time.perf_counter() - inicio) * 1e6), file=sys.stderr, flush=True)\n'
+        ), modulo
+
+def executar_benchmark(repeticoes=5):
+    """Mediana do tempo de importação de cada cenário; retorna {cenario: {...}}"""
+
+    resultados = {}
+    for nome, codigo, pagina in cenarios():
+        medicoes = [medir_importacao(codigo, pagina) for _ in range(repeticoes)]
+        total_ms = statistics.median(total for total, _, _ in medicoes)
+        _, pacotes, modulos = medicoes[-1]
+        resultados[nome] = {
+            'total_ms': total_ms,
+            'pacotes_ms': dict(sorted(pacotes.items(), key=lambda item: -item[1])),
+            'modulos': len(modulos),
+            'indevidos': indevidos(nome, modulos),
+        }
+    return resultados
+
+def indevidos(cenario, modulos):
+    """Módulos que o cenário não deveria importar (outras páginas e, na partida, os gráficos)"""
+
+    if cenario == 'partida':
+        return sorted(
+            modulo for modulo in modulos
+            if any(modulo == proibido or modulo.startswith(proibido.rstrip('.') + '.') for proibido in FORA_DA_PARTIDA)
+        )
+    return sorted(
+        modulo for modulo in modulos
+        if modulo.startswith('pages.') and modulo != f'pages.{cenario}'
+    )
+
+def imprimir_resultados(resultados, top=5):
+    partida = resultados['partida']['total_ms']
+    print(f"\n{'cenário':<22}{'total (ms)':>12}{'+partida (ms)':>15}{'módulos':>9}  maiores pacotes")
+    for nome, r in resultados.items():
+        adicional = r['total_ms'] - partida if nome != 'partida' else 0
+        maiores = ', '.join(f'{pacote} {ms:.0f}' for pacote, ms in list(r['pacotes_ms'].items())[:top])
+        print(f"{nome:<22}{r['total_ms']:>12.1f}{adicional:>15.1f}{r['modulos']:>9}  {maiores}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Mede o tempo de importação da partida e das páginas do dashboard')
+    parser.add_argument('--repeticoes', type=int, default=5,
+                        help='Processos por cenário (é usada a mediana)')
+    parser.add_argument('--limite-ms', type=float,
+                        help='Falha se a partida do dashboard passar deste tempo de importação')
+    args = parser.parse_args()
+
+    print("=== BENCHMARK IMPORTAÇÃO DO DASHBOARD ===")
+    resultados = executar_benchmark(args.repeticoes)
+    imprimir_resultados(resultados)
+
+    os.makedirs(RESULTADOS_DIR, exist_ok=True)
+    resultados_path = os.path.join(
+        RESULTADOS_DIR, f"importacao_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    )
+    with open(resultados_path, 'w', encoding='utf-8') as f:
+        json.dump({
+            'python': sys.version.split()[0],
+            'repeticoes': args.repeticoes,
+            'cenarios': resultados,
+        }, f, indent=2, ensure_ascii=False)
+    print(f"\n📄 Resultados: {resultados_path}")
+
+    falhas = {nome: r['indevidos'] for nome, r in resultados.items() if r['indevidos']}
+    if falhas:
+        print("\n❌ Importações fora do previsto:")
+        for nome, modulos in falhas.items():
+            print(f"   - {nome}: {', '.join(modulos[:10])}")
+    if args.limite_ms and resultados['partida']['total_ms'] > args.limite_ms:
+        print(f"\n❌ Partida com {resultados['partida']['total_ms']:.0f} ms (limite: {args.limite_ms:.0f} ms)")
+        falhas['limite'] = True
+    if falhas:
+        sys.exit(1)
+    print("\n✅ Partida sem páginas nem bibliotecas de gráficos; cada página importa só o próprio módulo")
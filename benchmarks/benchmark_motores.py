@@ -0,0 +1,101 @@
+"""
+Benchmark dos motores de consulta do dashboard (SQLite x DuckDB)
+Gera o banco sintético do harness de planos, exporta a cópia analítica e mede cada
+consulta 'dashboard_*' registrada nos dois motores, conferindo se os resultados batem
+"""
+
+import sqlite3
+import os
+import sys
+import time
+import argparse
+import tempfile
+import statistics
+
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(BASE_DIR, 'scripts'))
+sys.path.insert(0, os.path.join(BASE_DIR, 'benchmarks'))
+sys.path.insert(0, BASE_DIR)
+
+from config.consultas import CONSULTAS
+from config.motor import conectar_duckdb, executar_consulta
+from plano_consultas import criar_banco_sintetico
+from exportar_analitico import exportar_analitico
+
+def medir(nome, conn, repeticoes):
+    """Mediana do tempo da consulta e o último resultado"""
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = executar_consulta(nome, conn)
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return statistics.median(tempos), resultado
+
+def resultados_iguais(a, b):
+    """Compara os resultados ignorando a ordem das linhas e diferenças de tipo numérico"""
+
+    if a.shape != b.shape:
+        return False
+    colunas = list(a.columns)
+    a = a.sort_values(colunas, ignore_index=True)
+    b = b[colunas].sort_values(colunas, ignore_index=True)
+    for coluna in colunas:
+        x, y = a[coluna], b[coluna]
+        if x.dtype.kind in 'biuf' and y.dtype.kind in 'biuf':
+            if not np.allclose(x.astype(float), y.astype(float), equal_nan=True):
+                return False
+        elif not (x.astype(str) == y.astype(str)).all():
+            return False
+    return True
+
+def executar_benchmark(registros, repeticoes=3, formato='duckdb'):
+    """Mede as consultas do dashboard nos dois motores sobre os mesmos dados"""
+
+    with tempfile.TemporaryDirectory() as tmp:
+        sqlite_path = os.path.join(tmp, 'sintetico.db')
+        analitico_path = os.path.join(tmp, 'sintetico.duckdb' if formato == 'duckdb' else 'parquet')
+
+        criar_banco_sintetico(sqlite_path, registros)
+        exportar_analitico(formato, sqlite_path, analitico_path)
+
+        sqlite = sqlite3.connect(sqlite_path)
+        if formato == 'duckdb':
+            duck = conectar_duckdb(duckdb_path=analitico_path)
+        else:
+            duck = conectar_duckdb(duckdb_path=os.path.join(tmp, 'inexistente.duckdb'), parquet_dir=analitico_path)
+
+        resultados = {}
+        for nome in CONSULTAS:
+            if not nome.startswith('dashboard_'):
+                continue
+            tempo_sqlite, df_sqlite = medir(nome, sqlite, repeticoes)
+            tempo_duckdb, df_duckdb = medir(nome, duck, repeticoes)
+            resultados[nome] = {
+                'sqlite_ms': tempo_sqlite,
+                'duckdb_ms': tempo_duckdb,
+                'iguais': resultados_iguais(df_sqlite, df_duckdb),
+            }
+
+        sqlite.close()
+        duck.close()
+
+    return resultados
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Compara os motores SQLite e DuckDB nas consultas do dashboard')
+    parser.add_argument('--registros', type=int, default=500_000)
+    parser.add_argument('--repeticoes', type=int, default=3)
+    parser.add_argument('--formato', choices=['duckdb', 'parquet'], default='duckdb',
+                        help='Cópia analítica lida pelo DuckDB')
+    args = parser.parse_args()
+
+    print(f"=== BENCHMARK MOTORES ({args.registros:,} internações, DuckDB lendo {args.formato}) ===")
+    resultados = executar_benchmark(args.registros, args.repeticoes, args.formato)
+
+    print(f"\n{'consulta':<36}{'sqlite (ms)':>13}{'duckdb (ms)':>13}{'ganho':>9}  resultado")
+    for nome, r in resultados.items():
+        ganho = r['sqlite_ms'] / r['duckdb_ms'] if r['duckdb_ms'] > 0 else float('nan')
+        print(f"{nome:<36}{r['sqlite_ms']:>13.1f}{r['duckdb_ms']:>13.1f}{ganho:>8.1f}x  "
+              f"{'✅ igual' if r['iguais'] else '❌ diferente'}")
@@ -0,0 +1,328 @@
+"""
+Gerador de arquivos RD sintéticos do SIH/SUS
+Usa o layout de colunas de data/raw/legendas_colunas.txt e os códigos reais de CID-10,
+SIGTAP e IBGE do pacote de referências, com distribuições assimétricas (Zipf/lognormal)
+para diagnósticos, procedimentos, hospitais, municípios e valores
+"""
+
+import sqlite3
+import os
+import re
+import sys
+import argparse
+from datetime import date
+
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(BASE_DIR, 'scripts'))
+
+from pacote_referencias import compilar_pacote_referencias
+
+LEGENDAS_PATH = os.path.join(BASE_DIR, 'data', 'raw', 'legendas_colunas.txt')
+
+# Larguras dos campos texto do RD; campos ausentes usam LARGURA_PADRAO
+LARGURAS_RD = {
+    'UF_ZI': 6, 'ANO_CMPT': 4, 'MES_CMPT': 2, 'ESPEC': 2, 'CGC_HOSP': 14, 'N_AIH': 13,
+    'IDENT': 1, 'CEP': 8, 'MUNIC_RES': 6, 'MUNIC_MOV': 6, 'NASC': 8, 'SEXO': 1,
+    'COD_IDADE': 1, 'RACA_COR': 2, 'ETNIA': 4, 'NACIONAL': 3, 'DIAG_PRINC': 4,
+    'DIAG_SECUN': 4, 'CID_ASSO': 4, 'CID_MORTE': 4, 'CID_NOTIF': 4, 'PROC_SOLIC': 10,
+    'PROC_REA': 10, 'COMPLEX': 2, 'DT_INTER': 8, 'DT_SAIDA': 8, 'CAR_INT': 2,
+    'MARCA_UTI': 2, 'MARCA_UCI': 2, 'COBRANCA': 2, 'NATUREZA': 2, 'NAT_JUR': 4,
+    'GESTAO': 1, 'RUBRICA': 4, 'GESTOR_COD': 5, 'GESTOR_TP': 1, 'GESTOR_CPF': 15,
+    'GESTOR_DT': 8, 'FINANC': 2, 'FAEC_TP': 6, 'REGCT': 4, 'CNES': 7, 'CNPJ_MANT': 14,
+    'VINCPREV': 1, 'CBOR': 3, 'CNAER': 3, 'IND_VDRL': 1, 'INFEHOSP': 1, 'GESTRISCO': 1,
+    'INSC_PN': 12, 'CONTRACEP1': 2, 'CONTRACEP2': 2, 'CPF_AUT': 11, 'HOMONIMO': 1,
+    'INSTRU': 1, 'NUM_PROC': 4, 'SEQ_AIH5': 3, 'REMESSA': 21, 'AUD_JUST': 50, 'SIS_JUST': 50,
+}
+LARGURA_PADRAO = 10
+
+# Campos numéricos: (largura, decimais)
+NUMERICOS_RD = {
+    'IDADE': (2, 0), 'DIAS_PERM': (5, 0), 'MORTE': (1, 0), 'QT_DIARIAS': (3, 0),
+    'DIAR_ACOM': (3, 0), 'TOT_PT_SP': (6, 0), 'NUM_FILHOS': (2, 0), 'SEQUENCIA': (9, 0),
+}
+
+# Competências geradas (as mesmas que a consolidação procura)
+COMPETENCIAS = ['2501', '2502', '2503']
+
+# Registros gerados por vez, para limitar a memória nas escalas maiores
+TAMANHO_LOTE = 500_000
+
+def ler_layout_rd(legendas_path=LEGENDAS_PATH):
+    """
+    Monta o layout DBF (nome, tipo, largura, decimais) a partir da legenda de colunas
+    Faixas como 'DIAGSEC1-9' viram DIAGSEC1 ... DIAGSEC9
+    """
+
+    with open(legendas_path, 'r', encoding='utf-8') as f:
+        nomes = re.findall(r'^([A-Z][A-Z0-9_]*(?:\d-\d)?)\s+- ', f.read(), re.MULTILINE)
+
+    campos = []
+    for nome in nomes:
+        faixa = re.match(r'(\D+)(\d)-(\d)$', nome)
+        expandidos = [f'{faixa.group(1)}{i}' for i in range(int(faixa.group(2)), int(faixa.group(3)) + 1)] if faixa else [nome]
+
+        for campo in expandidos:
+            if campo.startswith('VAL_') or campo == 'US_TOT':
+                campos.append((campo, 'N', 12, 2))
+            elif campo.startswith('UTI_'):
+                campos.append((campo, 'N', 3, 0))
+            elif campo in NUMERICOS_RD:
+                campos.append((campo, 'N') + NUMERICOS_RD[campo])
+            elif campo.startswith('DIAGSEC'):
+                campos.append((campo, 'C', 4, 0))
+            elif campo.startswith('TPDISEC'):
+                campos.append((campo, 'C', 1, 0))
+            else:
+                campos.append((campo, 'C', LARGURAS_RD.get(campo, LARGURA_PADRAO), 0))
+
+    return campos
+
+def pesos_zipf(n, rng, expoente=1.1):
+    """Pesos Zipf distribuídos aleatoriamente entre n itens"""
+    pesos = 1.0 / np.arange(1, n + 1) ** expoente
+    rng.shuffle(pesos)
+    return pesos / pesos.sum()
+
+def carregar_distribuicoes(pacote_path, rng, total_hospitais=400):
+    """Lê os códigos reais do pacote de referências e sorteia os pesos e o cadastro de hospitais"""
+
+    conn = sqlite3.connect(pacote_path)
+    cids = conn.execute(
+        'SELECT codigo, sensivel_atencao_basica FROM cid10 WHERE length(codigo) = 4'
+    ).fetchall()
+    procedimentos = conn.execute('''
+        SELECT codigo, COALESCE(valor_sh, 0), COALESCE(valor_sp, 0), COALESCE(complexidade, '2')
+        FROM procedimentos
+        WHERE substr(codigo, 1, 2) IN ('03', '04', '05')
+    ''').fetchall()
+    municipios_pr = [row[0] for row in conn.execute("SELECT codigo6 FROM municipios WHERE uf = 'PR' ORDER BY codigo6")]
+    municipios_outros = [row[0] for row in conn.execute("SELECT codigo6 FROM municipios WHERE uf != 'PR'")]
+    conn.close()
+
+    if not cids or not procedimentos or not municipios_pr:
+        raise ValueError(f"Pacote de referências incompleto: {pacote_path}")
+
+    # Causas sensíveis à atenção básica são mais frequentes nas internações
+    pesos_cid = pesos_zipf(len(cids), rng)
+    pesos_cid *= np.where([bool(sensivel) for _, sensivel in cids], 5.0, 1.0)
+
+    # Curitiba concentra o maior volume do estado
+    pesos_municipio = pesos_zipf(len(municipios_pr), rng)
+    if '410690' in municipios_pr:
+        i = municipios_pr.index('410690')
+        j = int(np.argmax(pesos_municipio))
+        pesos_municipio[[i, j]] = pesos_municipio[[j, i]]
+
+    procedimentos_sh = np.array([p[1] for p in procedimentos])
+    procedimentos_sp = np.array([p[2] for p in procedimentos])
+
+    return {
+        'cids': np.array([c[0] for c in cids]),
+        'pesos_cid': pesos_cid / pesos_cid.sum(),
+        'procedimentos': np.array([p[0] for p in procedimentos]),
+        'pesos_procedimento': pesos_zipf(len(procedimentos), rng, 1.3),
+        # Procedimentos sem valor no SIGTAP recebem um valor base lognormal (mediana ~R$ 500)
+        'valor_sh': np.where(procedimentos_sh > 0, procedimentos_sh, rng.lognormal(6.2, 0.8, len(procedimentos))),
+        'valor_sp': np.where(procedimentos_sp > 0, procedimentos_sp, rng.lognormal(4.8, 0.7, len(procedimentos))),
+        'complexidade': np.array([f'0{p[3]}' if str(p[3]).isdigit() else '02' for p in procedimentos]),
+        'municipios': np.array(municipios_pr),
+        'pesos_municipio': pesos_municipio / pesos_municipio.sum(),
+        'municipios_outros': np.array(municipios_outros or municipios_pr),
+        'hospitais': {
+            'cnes': np.char.zfill(rng.choice(9_999_999, total_hospitais, replace=False).astype(str), 7),
+            'cnpj': np.char.zfill(rng.integers(10**12, 10**14, total_hospitais).astype(str), 14),
+            'municipio': rng.choice(np.array(municipios_pr), total_hospitais, p=pesos_municipio / pesos_municipio.sum()),
+            'espec': np.char.zfill(rng.choice([1, 2, 3, 4, 5, 7], total_hospitais).astype(str), 2),
+            'nat_jur': rng.choice(['1023', '1244', '2062', '3069', '3999'], total_hospitais),
+            'gestao': rng.choice(['E', 'M'], total_hospitais, p=[0.4, 0.6]),
+            'pesos': pesos_zipf(total_hospitais, rng, 0.9),
+        },
+    }
+
+def gerar_lote(rng, dist, n, competencia, sequencia_inicial):
+    """Gera n internações da competência (AAMM) como um dicionário de colunas"""
+
+    ano = 2000 + int(competencia[:2])
+    mes = int(competencia[2:])
+    inicio_mes = np.datetime64(date(ano, mes, 1))
+    dias_no_mes = int((np.datetime64(date(ano + mes // 12, mes % 12 + 1, 1)) - inicio_mes).astype(int))
+
+    hosp = dist['hospitais']
+    h = rng.choice(len(hosp['cnes']), n, p=hosp['pesos'])
+    p = rng.choice(len(dist['procedimentos']), n, p=dist['pesos_procedimento'])
+
+    # Residência: maioria no município do hospital, parte em outros municípios do PR e ~2% em outros estados
+    origem = rng.random(n)
+    munic_res = np.where(
+        origem < 0.65, hosp['municipio'][h],
+        np.where(origem < 0.98,
+                 rng.choice(dist['municipios'], n, p=dist['pesos_municipio']),
+                 rng.choice(dist['municipios_outros'], n))
+    )
+
+    # Permanência geométrica (muitas internações curtas, cauda longa) terminando dentro do mês
+    dias_perm = np.minimum(rng.geometric(0.22, n) - 1, 90)
+    dt_saida = inicio_mes + rng.integers(0, dias_no_mes, n).astype('timedelta64[D]')
+    dt_inter = dt_saida - dias_perm.astype('timedelta64[D]')
+
+    idade = np.where(rng.random(n) < 0.08, 0, np.minimum(rng.gamma(2.0, 22.0, n), 99)).astype(np.int64)
+    nasc = dt_inter - (idade * 365 + rng.integers(0, 365, n)).astype('timedelta64[D]')
+
+    # Valores do SIGTAP com ruído lognormal; ~9% das internações usam UTI
+    dias_uti = np.where(rng.random(n) < 0.09, np.minimum(rng.geometric(0.25, n), dias_perm + 1), 0)
+    val_sh = np.round(dist['valor_sh'][p] * rng.lognormal(0, 0.3, n), 2)
+    val_sp = np.round(dist['valor_sp'][p] * rng.lognormal(0, 0.3, n), 2)
+    val_uti = np.round(dias_uti * 478.72 * rng.lognormal(0, 0.1, n), 2)
+    val_tot = val_sh + val_sp + val_uti
+
+    morte = (rng.random(n) < 0.01 + 0.0008 * idade).astype(np.int64)
+    sequencia = np.arange(sequencia_inicial, sequencia_inicial + n)
+
+    diag = rng.choice(dist['cids'], n, p=dist['pesos_cid'])
+    diag_sec = np.where(rng.random(n) < 0.3, rng.choice(dist['cids'], n), '')
+    proc_rea = dist['procedimentos'][p]
+    proc_solic = np.where(rng.random(n) < 0.95, proc_rea, rng.choice(dist['procedimentos'], n))
+
+    def data_texto(datas):
+        return np.char.replace(np.datetime_as_string(datas, unit='D'), '-', '')
+
+    return {
+        'UF_ZI': np.full(n, '410000'),
+        'ANO_CMPT': np.full(n, str(ano)),
+        'MES_CMPT': np.full(n, f'{mes:02d}'),
+        'ESPEC': hosp['espec'][h],
+        'CGC_HOSP': hosp['cnpj'][h],
+        'N_AIH': np.char.add(f'41{competencia[:2]}1', np.char.zfill(sequencia.astype(str), 8)),
+        'IDENT': np.full(n, '1'),
+        'CEP': np.char.add('8', np.char.zfill(rng.integers(0, 10**7, n).astype(str), 7)),
+        'MUNIC_RES': munic_res,
+        'MUNIC_MOV': hosp['municipio'][h],
+        'NASC': data_texto(nasc),
+        'SEXO': rng.choice(['1', '3'], n, p=[0.45, 0.55]),
+        'COD_IDADE': np.full(n, '4'),
+        'IDADE': idade,
+        'RACA_COR': rng.choice(['01', '02', '03', '04', '05', '99'], n, p=[0.62, 0.03, 0.25, 0.01, 0.01, 0.08]),
+        'NACIONAL': np.full(n, '010'),
+        'DIAG_PRINC': diag,
+        'DIAGSEC1': diag_sec,
+        'PROC_SOLIC': proc_solic,
+        'PROC_REA': proc_rea,
+        'COMPLEX': dist['complexidade'][p],
+        'DT_INTER': data_texto(dt_inter),
+        'DT_SAIDA': data_texto(dt_saida),
+        'DIAS_PERM': dias_perm,
+        'QT_DIARIAS': dias_perm,
+        'MORTE': morte,
+        'CAR_INT': rng.choice(['01', '02'], n, p=[0.3, 0.7]),
+        'UTI_MES_TO': dias_uti,
+        'UTI_INT_TO': dias_uti,
+        'VAL_SH': val_sh,
+        'VAL_SP': val_sp,
+        'VAL_UTI': val_uti,
+        'VAL_TOT': val_tot,
+        'VAL_SH_FED': val_sh,
+        'VAL_SP_FED': val_sp,
+        'US_TOT': np.round(val_tot / 5.3, 2),
+        'NAT_JUR': hosp['nat_jur'][h],
+        'GESTAO': hosp['gestao'][h],
+        'FINANC': np.full(n, '06'),
+        'CNES': hosp['cnes'][h],
+        'CNPJ_MANT': hosp['cnpj'][h],
+        'GESTRISCO': np.full(n, '0'),
+        'SEQUENCIA': sequencia,
+        'REMESSA': np.char.add(f'PR{competencia}', np.char.zfill((sequencia // 50_000).astype(str), 7)),
+    }
+
+def codificar_registros(lote, campos, tamanho_registro):
+    """Converte um lote de colunas na matriz de bytes dos registros DBF de largura fixa"""
+
+    n = len(next(iter(lote.values())))
+    matriz = np.full((n, tamanho_registro), ord(' '), dtype=np.uint8)
+
+    deslocamento = 1
+    for nome, tipo, largura, decimais in campos:
+        if nome in lote:
+            valores = lote[nome]
+            if tipo == 'N':
+                texto = np.char.mod(f'%{largura}.{decimais}f', valores)
+            else:
+                texto = np.char.ljust(valores.astype(str), largura)
+            bruto = np.char.encode(texto, 'latin-1').astype(f'S{largura}')
+            matriz[:, deslocamento:deslocamento + largura] = bruto.view(np.uint8).reshape(n, largura)
+        deslocamento += largura
+
+    return matriz
+
+def escrever_dbf(arquivo_path, campos, total_registros, lotes):
+    """Grava o DBF (cabeçalho dBase III + registros) consumindo os lotes de colunas"""
+
+    tamanho_cabecalho = 32 + 32 * len(campos) + 1
+    tamanho_registro = 1 + sum(campo[2] for campo in campos)
+
+    hoje = date.today()
+    cabecalho = bytearray(32)
+    cabecalho[0] = 0x03
+    cabecalho[1:4] = bytes([hoje.year - 1900, hoje.month, hoje.day])
+    cabecalho[4:8] = total_registros.to_bytes(4, 'little')
+    cabecalho[8:10] = tamanho_cabecalho.to_bytes(2, 'little')
+    cabecalho[10:12] = tamanho_registro.to_bytes(2, 'little')
+
+    for nome, tipo, largura, decimais in campos:
+        descritor = bytearray(32)
+        descritor[:len(nome)] = nome.encode('ascii')
+        descritor[11] = ord(tipo)
+        descritor[16] = largura
+        descritor[17] = decimais
+        cabecalho += descritor
+    cabecalho += b'\r'
+
+    with open(arquivo_path, 'wb') as f:
+        f.write(cabecalho)
+        for lote in lotes:
+            f.write(codificar_registros(lote, campos, tamanho_registro).tobytes())
+        f.write(b'\x1a')
+
+def gerar_arquivos_rd(destino, registros, seed=42, pacote_path=None, competencias=COMPETENCIAS):
+    """
+    Gera os arquivos RDPRAAMM.dbf em 'destino', dividindo 'registros' entre as competências
+    Retorna a lista de arquivos gerados
+    """
+
+    pacote_path = pacote_path or compilar_pacote_referencias()
+    rng = np.random.default_rng(seed)
+    dist = carregar_distribuicoes(pacote_path, rng)
+    campos = ler_layout_rd()
+
+    os.makedirs(destino, exist_ok=True)
+    arquivos = []
+    sequencia = 1
+
+    for i, competencia in enumerate(competencias):
+        total = registros // len(competencias) + (1 if i < registros % len(competencias) else 0)
+
+        def lotes(total=total, competencia=competencia, inicio=sequencia):
+            for deslocamento in range(0, total, TAMANHO_LOTE):
+                n = min(TAMANHO_LOTE, total - deslocamento)
+                yield gerar_lote(rng, dist, n, competencia, inicio + deslocamento)
+
+        arquivo_path = os.path.join(destino, f'RDPR{competencia}.dbf')
+        escrever_dbf(arquivo_path, campos, total, lotes())
+        arquivos.append(arquivo_path)
+        sequencia += total
+
+        print(f"✅ {os.path.basename(arquivo_path)}: {total:,} internações")
+
+    return arquivos
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Gera arquivos RD sintéticos do SIH/SUS')
+    parser.add_argument('--registros', type=int, default=100_000,
+                        help='Total de internações (divididas entre as competências)')
+    parser.add_argument('--destino', default=os.path.join(BASE_DIR, 'data', 'raw', 'dbc'),
+                        help='Diretório de saída dos arquivos .dbf')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    gerar_arquivos_rd(args.destino, args.registros, args.seed)
@@ -0,0 +1,347 @@
+"""
+Harness de planos das consultas registradas
+Roda EXPLAIN QUERY PLAN para cada consulta de config/consultas.py, aponta varreduras
+completas, B-trees temporárias e índices automáticos, e mede o tempo de cada consulta em
+um banco sintético grande. Com --base, falha quando surge um problema de plano que não
+está na base aceita (benchmarks/planos_aceitos.json)
+"""
+
+import sqlite3
+import os
+import re
+import sys
+import json
+import time
+import argparse
+import tempfile
+import statistics
+from datetime import datetime
+
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTADOS_DIR = os.path.join(BASE_DIR, 'benchmarks', 'resultados')
+BASE_ACEITA_PATH = os.path.join(BASE_DIR, 'benchmarks', 'planos_aceitos.json')
+sys.path.insert(0, os.path.join(BASE_DIR, 'scripts'))
+sys.path.insert(0, BASE_DIR)
+
+from config.consultas import CONSULTAS
+from create_database import create_database_structure
+from pacote_referencias import inserir_dimensoes_resolvidas, anexar_pacote
+from indices_consultas import criar_indices_recomendados, INDICES_SUBSTITUIDOS
+
+# Linhas do EXPLAIN QUERY PLAN que indicam problema (formato novo e antigo do SQLite)
+PADRAO_VARREDURA = re.compile(r'^SCAN (?:TABLE )?(\S+)(?: AS (\S+))?(?: LEFT-JOIN)?$')
+PADRAO_BTREE = re.compile(r'^USE TEMP B-TREE FOR (.+)$')
+PADRAO_AUTOMATICO = re.compile(r'^SEARCH (?:TABLE )?(\S+)(?: AS (\S+))? USING AUTOMATIC')
+
+def pesos_zipf(quantidade, expoente=1.1):
+    """Pesos decrescentes por posição, como a frequência real de diagnósticos e municípios"""
+    pesos = 1 / np.arange(1, quantidade + 1) ** expoente
+    return pesos / pesos.sum()
+
+def criar_banco_sintetico(db_path, registros, seed=42, indices=True):
+    """
+    Cria o banco com a estrutura do projeto e preenche as tabelas de fato com dados sorteados
+    Com indices=True, cria também os índices das consultas do dashboard, como a carga faz
+    """
+
+    rng = np.random.default_rng(seed)
+    create_database_structure(db_path)
+
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    cursor.execute('PRAGMA journal_mode=OFF')
+    cursor.execute('PRAGMA synchronous=OFF')
+
+    # Colunas criadas pelo enriquecimento de CNPJ, usadas pelos relatórios
+    cursor.execute('ALTER TABLE estabelecimentos ADD COLUMN nome_estabelecimento TEXT')
+    cursor.execute('ALTER TABLE estabelecimentos ADD COLUMN tipo_estabelecimento TEXT')
+
+    # Universos de códigos com cardinalidade parecida com a do Paraná
+    cids = [f'{letra}{numero:03d}' for letra in 'ABCDEIJKLMNORST' for numero in range(0, 1000, 7)]
+    procedimentos = [str(codigo) for codigo in rng.choice(np.arange(201010010, 417010010), 1500, replace=False)]
+    municipios = [f'41{numero:04d}' for numero in range(0, 4000, 10)] + [f'35{numero:04d}' for numero in range(30)]
+    rng.shuffle(cids)
+    rng.shuffle(municipios)
+
+    total_estabelecimentos = max(50, min(600, registros // 500))
+    cursor.executemany('''
+        INSERT INTO estabelecimentos (
+            codigo_cnes, cnpj_hospital, codigo_municipio_movimento, codigo_especialidade,
+            codigo_natureza_juridica, codigo_tipo_gestao, codigo_complexidade,
+            nome_estabelecimento, tipo_estabelecimento
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ''', [
+        (
+            f'{2_000_000 + i:07d}', f'{10_000_000_000_000 + i * 97:014d}',
+            municipios[i % 60], f'{rng.integers(1, 11):02d}',
+            str(rng.choice(['1023', '2062', '3999', '1104', '2135'])), str(rng.integers(1, 5)),
+            f'{rng.integers(1, 4):02d}', f'Hospital Sintético {i}',
+            str(rng.choice(['Hospital Geral', 'Hospital Especializado', 'Outros'])),
+        )
+        for i in range(total_estabelecimentos)
+    ])
+
+    municipio_residencia = rng.choice(municipios, registros, p=pesos_zipf(len(municipios)))
+    cursor.executemany(
+        'INSERT INTO pacientes (idade_anos, codigo_sexo, codigo_municipio_residencia) VALUES (?, ?, ?)',
+        zip(
+            rng.integers(0, 100, registros).tolist(),
+            rng.choice([1, 3], registros).tolist(),
+            municipio_residencia.tolist(),
+        )
+    )
+
+    meses = rng.integers(1, 13, registros)
+    internacao = np.datetime64('2025-01-01') + rng.integers(0, 365, registros).astype('timedelta64[D]')
+    permanencia = rng.geometric(0.2, registros) - 1
+    saida = internacao + permanencia.astype('timedelta64[D]')
+
+    cursor.executemany('''
+        INSERT INTO internacoes (
+            numero_aih, paciente_id, estabelecimento_id, ano_competencia, mes_competencia,
+            codigo_diagnostico_principal, codigo_procedimento_solicitado, codigo_carater_internacao,
+            data_internacao, data_saida, dias_permanencia, dias_uti_total, gestacao_risco
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ''', zip(
+        (f'41251{i:08d}' for i in range(registros)),
+        range(1, registros + 1),
+        rng.integers(1, total_estabelecimentos + 1, registros).tolist(),
+        [2025] * registros,
+        meses.tolist(),
+        rng.choice(cids, registros, p=pesos_zipf(len(cids))).tolist(),
+        rng.choice(procedimentos, registros, p=pesos_zipf(len(procedimentos))).tolist(),
+        rng.choice(['01', '02', '03', '04', '05', '06'], registros, p=[0.35, 0.55, 0.03, 0.03, 0.03, 0.01]).tolist(),
+        np.datetime_as_string(internacao).tolist(),
+        np.datetime_as_string(saida).tolist(),
+        permanencia.tolist(),
+        np.where(rng.random(registros) < 0.1, rng.integers(1, 15, registros), 0).tolist(),
+        (rng.random(registros) < 0.02).tolist(),
+    ))
+
+    # ~2% sem valor, para exercitar o filtro valor_total > 0
+    valor_total = np.round(rng.lognormal(7, 1, registros), 2)
+    valor_total[rng.random(registros) < 0.02] = 0
+    cursor.executemany('''
+        INSERT INTO valores_financeiros (
+            internacao_id, valor_servicos_hospitalares, valor_servicos_profissionais,
+            valor_total, valor_uti, valor_em_dolares
+        ) VALUES (?, ?, ?, ?, ?, ?)
+    ''', zip(
+        range(1, registros + 1),
+        np.round(valor_total * 0.8, 2).tolist(),
+        np.round(valor_total * 0.2, 2).tolist(),
+        valor_total.tolist(),
+        np.round(valor_total * 0.1, 2).tolist(),
+        np.round(valor_total / 5.4, 2).tolist(),
+    ))
+    conn.commit()
+
+    inserir_dimensoes_resolvidas(conn)
+    conn.commit()
+
+    if indices:
+        criar_indices_recomendados(conn)
+
+    # Mesmas estatísticas do otimizador que a etapa de agregados do pipeline gera
+    cursor.execute('ANALYZE')
+    conn.close()
+
+def analisar_plano(conn, sql):
+    """Retorna as linhas do EXPLAIN QUERY PLAN e os problemas encontrados nelas"""
+
+    linhas = [row[3] for row in conn.execute(f'EXPLAIN QUERY PLAN {sql}')]
+
+    problemas = []
+    for detalhe in linhas:
+        if detalhe.startswith('SCAN CONSTANT ROW'):
+            continue
+        varredura = PADRAO_VARREDURA.match(detalhe)
+        if varredura:
+            problemas.append(f'varredura_completa:{varredura.group(2) or varredura.group(1)}')
+        btree = PADRAO_BTREE.match(detalhe)
+        if btree:
+            problemas.append(f'btree_temporaria:{btree.group(1)}')
+        automatico = PADRAO_AUTOMATICO.match(detalhe)
+        if automatico:
+            problemas.append(f'indice_automatico:{automatico.group(2) or automatico.group(1)}')
+
+    return linhas, sorted(set(problemas))
+
+def medir_consulta(conn, sql, repeticoes):
+    """Mediana do tempo de execução; comandos de escrita são desfeitos após cada execução"""
+
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        cursor = conn.execute(sql)
+        linhas = len(cursor.fetchall())
+        tempos.append((time.perf_counter() - inicio) * 1000)
+        if conn.in_transaction:
+            conn.rollback()
+
+    return statistics.median(tempos), linhas
+
+def executar_harness(db_path, repeticoes=3, consultas=None):
+    """Analisa o plano e mede o tempo de cada consulta registrada no banco informado"""
+
+    conn = sqlite3.connect(db_path)
+    anexar_pacote(conn)
+
+    resultados = {}
+    for nome, sql in CONSULTAS.items():
+        if consultas and nome not in consultas:
+            continue
+        try:
+            plano, problemas = analisar_plano(conn, sql)
+            tempo_ms, linhas = medir_consulta(conn, sql, repeticoes)
+            resultados[nome] = {'plano': plano, 'problemas': problemas, 'tempo_ms': tempo_ms, 'linhas': linhas}
+        except sqlite3.Error as e:
+            resultados[nome] = {'erro': f'{type(e).__name__}: {e}'}
+
+    conn.close()
+    return resultados
+
+def comparar_com_base(resultados, base_path):
+    """Problemas que não estão na base aceita, por consulta"""
+
+    with open(base_path, 'r', encoding='utf-8') as f:
+        base = json.load(f)
+
+    novos = {}
+    for nome, resultado in resultados.items():
+        if 'erro' in resultado:
+            novos[nome] = [resultado['erro']]
+            continue
+        diferenca = sorted(set(resultado['problemas']) - set(base.get(nome, [])))
+        if diferenca:
+            novos[nome] = diferenca
+    return novos
+
+def comparar_indices(db_path, repeticoes=3, consultas=None):
+    """
+    Mede as consultas sem e com os índices recomendados, no mesmo banco
+    O 'antes' recria os índices substituídos, como em um banco carregado pela versão anterior
+    """
+
+    conn = sqlite3.connect(db_path)
+    for nome, definicao in INDICES_SUBSTITUIDOS.items():
+        conn.execute(f'CREATE INDEX IF NOT EXISTS {nome} ON {definicao}')
+    conn.execute('ANALYZE')
+    conn.close()
+
+    antes = executar_harness(db_path, repeticoes, consultas)
+
+    conn = sqlite3.connect(db_path)
+    criados = criar_indices_recomendados(conn)
+    conn.execute('ANALYZE')
+    conn.close()
+
+    depois = executar_harness(db_path, repeticoes, consultas)
+    return antes, depois, criados
+
+def imprimir_comparacao(antes, depois):
+    """Tabela com o tempo de cada consulta antes e depois dos índices"""
+
+    print(f"\n{'consulta':<36}{'antes (ms)':>12}{'depois (ms)':>13}{'ganho':>9}")
+    for nome in antes:
+        if 'erro' in antes[nome] or 'erro' in depois[nome]:
+            print(f"{nome:<36}  ❌ {antes[nome].get('erro') or depois[nome].get('erro')}")
+            continue
+        tempo_antes, tempo_depois = antes[nome]['tempo_ms'], depois[nome]['tempo_ms']
+        ganho = f"{tempo_antes / tempo_depois:.1f}x" if tempo_depois > 0 else '-'
+        print(f"{nome:<36}{tempo_antes:>12.1f}{tempo_depois:>13.1f}{ganho:>9}")
+
+def imprimir_resultados(resultados):
+    """Tabela resumida: tempo, linhas retornadas e problemas de plano de cada consulta"""
+
+    print(f"\n{'consulta':<36}{'tempo (ms)':>12}{'linhas':>10}  problemas")
+    for nome, r in resultados.items():
+        if 'erro' in r:
+            print(f"{nome:<36}{'-':>12}{'-':>10}  ❌ {r['erro']}")
+            continue
+        print(f"{nome:<36}{r['tempo_ms']:>12.1f}{r['linhas']:>10}  {', '.join(r['problemas']) or '✅'}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Verifica os planos e mede o tempo das consultas registradas')
+    parser.add_argument('--registros', type=int, default=500_000,
+                        help='Internações do banco sintético')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--repeticoes', type=int, default=3,
+                        help='Execuções por consulta (é usada a mediana)')
+    parser.add_argument('--banco', help='Usa um banco existente em vez de gerar o sintético')
+    parser.add_argument('--consultas', nargs='+', choices=sorted(CONSULTAS),
+                        help='Analisa apenas as consultas informadas')
+    parser.add_argument('--base', nargs='?', const=BASE_ACEITA_PATH,
+                        help='Falha se houver problemas fora da base aceita (gerada com o número padrão de registros)')
+    parser.add_argument('--atualizar-base', action='store_true',
+                        help='Grava os problemas atuais como a nova base aceita')
+    parser.add_argument('--comparar-indices', action='store_true',
+                        help='Mede as consultas antes e depois dos índices recomendados (banco sintético)')
+    args = parser.parse_args()
+
+    if args.comparar_indices:
+        with tempfile.TemporaryDirectory() as tmp:
+            db_path = os.path.join(tmp, 'sintetico.db')
+            print(f"=== Gerando banco sintético sem os índices recomendados ({args.registros:,} internações) ===")
+            criar_banco_sintetico(db_path, args.registros, args.seed, indices=False)
+            antes, depois, criados = comparar_indices(db_path, args.repeticoes, args.consultas)
+
+        imprimir_comparacao(antes, depois)
+
+        os.makedirs(RESULTADOS_DIR, exist_ok=True)
+        resultados_path = os.path.join(
+            RESULTADOS_DIR, f"indices_{args.registros}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+        )
+        with open(resultados_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'registros': args.registros,
+                'sqlite': sqlite3.sqlite_version,
+                'indices': criados,
+                'antes': antes,
+                'depois': depois,
+            }, f, indent=2, ensure_ascii=False)
+        print(f"\n📄 Resultados: {resultados_path}")
+        sys.exit(0)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = args.banco
+        if not db_path:
+            db_path = os.path.join(tmp, 'sintetico.db')
+            print(f"=== Gerando banco sintético ({args.registros:,} internações) ===")
+            inicio = time.perf_counter()
+            criar_banco_sintetico(db_path, args.registros, args.seed)
+            print(f"✅ Banco gerado em {time.perf_counter() - inicio:.1f}s")
+
+        resultados = executar_harness(db_path, args.repeticoes, args.consultas)
+
+    imprimir_resultados(resultados)
+
+    os.makedirs(RESULTADOS_DIR, exist_ok=True)
+    resultados_path = os.path.join(
+        RESULTADOS_DIR, f"planos_{args.registros}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    )
+    with open(resultados_path, 'w', encoding='utf-8') as f:
+        json.dump({
+            'registros': None if args.banco else args.registros,
+            'banco': args.banco,
+            'sqlite': sqlite3.sqlite_version,
+            'consultas': resultados,
+        }, f, indent=2, ensure_ascii=False)
+    print(f"\n📄 Resultados: {resultados_path}")
+
+    if args.atualizar_base:
+        with open(BASE_ACEITA_PATH, 'w', encoding='utf-8') as f:
+            json.dump({nome: r.get('problemas', []) for nome, r in resultados.items()},
+                      f, indent=2, ensure_ascii=False)
+        print(f"📄 Base aceita atualizada: {BASE_ACEITA_PATH}")
+
+    if args.base:
+        novos = comparar_com_base(resultados, args.base)
+        if novos:
+            print("\n❌ Problemas de plano fora da base aceita:")
+            for nome, problemas in novos.items():
+                print(f"   - {nome}: {', '.join(problemas)}")
+            sys.exit(1)
+        print("\n✅ Nenhum problema de plano novo")
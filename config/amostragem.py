@@ -0,0 +1,81 @@
+"""
+Amostragem e pré-agregação para os gráficos do dashboard
+Histogramas são agregados no servidor (contagens exatas; só as faixas vão para o Plotly) e
+gráficos de pontos usam uma amostra estratificada por competência com orçamento fixo de pontos.
+Médias estimadas pela amostra levam intervalo de confiança; os KPIs continuam exatos
+"""
+
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+from config.settings import GRAFICOS
+
+def histograma(valores, bins):
+    """Contagens exatas por faixa, ignorando nulos; retorna (contagens, limites)"""
+
+    valores = pd.to_numeric(valores, errors='coerce').to_numpy(dtype=float)
+    valores = valores[np.isfinite(valores)]
+    if not len(valores):
+        return np.zeros(bins, dtype=np.int64), np.linspace(0, 1, bins + 1)
+    return np.histogram(valores, bins=bins)
+
+def alocacao(tamanhos, pontos):
+    """Pontos de cada estrato, proporcionais ao tamanho (ao menos um, nunca mais que o estrato)"""
+
+    tamanhos = np.asarray(tamanhos, dtype=np.int64)
+    if tamanhos.sum() <= pontos:
+        return tamanhos.copy()
+    proporcionais = np.floor(tamanhos * (pontos / tamanhos.sum())).astype(np.int64)
+    return np.minimum(np.maximum(proporcionais, 1), tamanhos)
+
+def amostra_estratificada(df, estratos, pontos=None, semente=0):
+    """
+    Amostra aleatória simples sem reposição dentro de cada estrato, com alocação proporcional
+    Cada linha leva o estrato ('estrato_amostra') e o peso N_h / n_h ('peso_amostra'); com menos
+    linhas que o orçamento, a amostra é a base inteira com peso 1
+    """
+
+    pontos = pontos or GRAFICOS['pontos']
+    codigos = df.groupby(estratos, sort=False, observed=True, dropna=False).ngroup().to_numpy()
+    tamanhos = np.bincount(codigos)
+    n = alocacao(tamanhos, pontos)
+
+    # Ordem aleatória dentro de cada estrato: ficam as n_h primeiras linhas de cada um
+    aleatorios = np.random.default_rng(semente).random(len(df))
+    ordem = np.lexsort((aleatorios, codigos))
+    inicios = np.concatenate([[0], np.cumsum(tamanhos)[:-1]])
+    posicao = np.empty(len(df), dtype=np.int64)
+    posicao[ordem] = np.arange(len(df)) - inicios[codigos[ordem]]
+    selecionadas = posicao < n[codigos]
+
+    amostra = df[selecionadas].copy()
+    amostra['estrato_amostra'] = codigos[selecionadas]
+    amostra['peso_amostra'] = (tamanhos / np.maximum(n, 1))[codigos[selecionadas]]
+    return amostra
+
+def estimar_media(amostra, coluna, confianca=None):
+    """
+    Média da coluna na base estimada pela amostra estratificada, com intervalo de confiança
+    (aproximação normal; numa amostra filtrada os tamanhos dos estratos são os estimados pelos pesos)
+    Retorna (media, inferior, superior)
+    """
+
+    confianca = confianca or GRAFICOS['confianca']
+    validas = amostra[amostra[coluna].notna()]
+    if validas.empty:
+        return np.nan, np.nan, np.nan
+
+    grupos = validas.groupby('estrato_amostra')
+    tamanhos = grupos['peso_amostra'].sum()
+    n = grupos.size()
+    pesos = tamanhos / tamanhos.sum()
+
+    media = float((pesos * grupos[coluna].mean()).sum())
+    variancias = grupos[coluna].var(ddof=1).fillna(0)
+    fracao = (n / tamanhos).clip(upper=1)
+    erro = float(np.sqrt((pesos ** 2 * (1 - fracao) * variancias / n).sum()))
+
+    z = NormalDist().inv_cdf(0.5 + confianca / 2)
+    return media, media - z * erro, media + z * erro
@@ -0,0 +1,80 @@
+"""
+Busca textual nas descrições de CID-10, procedimentos SIGTAP e municípios
+Consulta o índice FTS5 'busca' do pacote de referências (scripts/pacote_referencias.py):
+acentos e maiúsculas são ignorados e a última palavra digitada vale como prefixo
+"""
+
+import os
+import re
+import sqlite3
+
+import pandas as pd
+
+from config.settings import FILES
+
+TIPOS_BUSCA = ('cid', 'procedimento', 'municipio')
+
+# Palavras do termo digitado; o resto (aspas, operadores, pontuação) é descartado
+PADRAO_PALAVRA = re.compile(r'\w+')
+
+# Ponto entre caracteres de um código (CID 'J18.9'), gravado sem ele no índice ('J189')
+PADRAO_PONTO_CODIGO = re.compile(r'(?<=\w)\.(?=\w)')
+
+def conectar_busca(pacote_path=None):
+    """Conexão somente leitura com o pacote de referências, que precisa ter o índice de busca"""
+
+    pacote_path = pacote_path or FILES['referencias']
+    if not os.path.exists(pacote_path):
+        raise FileNotFoundError(
+            f"Pacote de referências não encontrado em {pacote_path}; execute scripts/pacote_referencias.py"
+        )
+
+    conn = sqlite3.connect(f'file:{pacote_path}?mode=ro', uri=True, check_same_thread=False)
+    if not conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'busca'").fetchone():
+        conn.close()
+        raise FileNotFoundError(
+            "Pacote de referências sem o índice de busca; recompile com scripts/pacote_referencias.py"
+        )
+    return conn
+
+def montar_expressao(termo):
+    """
+    Converte o texto digitado em uma expressão FTS5: todas as palavras precisam aparecer
+    ('parto cesariano' → "parto" AND "cesariano"*) e códigos com ponto perdem o ponto
+    ('J18.9' → "J189"*). Retorna None se não sobrar nenhuma palavra
+    """
+
+    palavras = PADRAO_PALAVRA.findall(PADRAO_PONTO_CODIGO.sub('', termo or ''))
+    if not palavras:
+        return None
+    termos = [f'"{palavra}"' for palavra in palavras]
+    termos[-1] += '*'
+    return ' AND '.join(termos)
+
+def buscar(termo, tipos=None, limite=20, conn=None):
+    """
+    Busca o termo nas descrições (e códigos) das referências, das mais relevantes para as menos
+    Retorna um DataFrame com tipo, codigo, descricao e detalhe (capítulo, grupo ou UF)
+    """
+
+    colunas = ['tipo', 'codigo', 'descricao', 'detalhe']
+    expressao = montar_expressao(termo)
+    if expressao is None:
+        return pd.DataFrame(columns=colunas)
+
+    tipos = tipos or TIPOS_BUSCA
+    sql = f'''
+        SELECT {', '.join(colunas)}
+        FROM busca
+        WHERE busca MATCH ? AND tipo IN ({', '.join('?' * len(tipos))})
+        ORDER BY rank
+        LIMIT ?
+    '''
+
+    propria = conn is None
+    conn = conn or conectar_busca()
+    try:
+        return pd.DataFrame(conn.execute(sql, (expressao, *tipos, limite)).fetchall(), columns=colunas)
+    finally:
+        if propria:
+            conn.close()
@@ -0,0 +1,165 @@
+"""
+Compactação do DataFrame do dashboard em memória
+Colunas de dimensão (descrições e códigos repetidos) viram category com dicionários
+compartilhados entre as cópias em cache (cada período carregado e a amostra usam as mesmas
+categorias) e as numéricas vão para o menor tipo que guarda os valores. Os valores em reais só
+viram float32 se a soma e a média continuarem iguais em centavos; senão ficam em float64
+"""
+
+import threading
+
+import numpy as np
+import pandas as pd
+
+# Colunas de texto repetido da consulta dashboard_dados_principais
+CATEGORICAS = [
+    'sexo', 'codigo_municipio_residencia', 'diagnostico_principal', 'capitulo_cid',
+    'carater_internacao', 'codigo_cnes', 'especialidade', 'complexidade', 'tipo_gestao',
+]
+
+# Colunas inteiras e o tipo alvo (mantêm o tipo original se tiverem nulos ou valores fora da faixa)
+INTEIROS = {
+    'internacao_id': 'uint32',
+    'ano_competencia': 'uint16',
+    'mes_competencia': 'uint8',
+    'data_internacao': 'uint32',
+    'data_saida': 'uint32',
+    'dias_permanencia': 'uint16',
+    'dias_uti_total': 'uint16',
+    'gestacao_risco': 'uint8',
+    'reinternacao': 'uint8',
+    'gerou_reinternacao': 'uint8',
+    'idade_anos': 'uint8',
+    'sensivel_atencao_basica': 'uint8',
+}
+
+# Datas: AAAAMMDD inteiro vira uint32 (em INTEIROS); texto vira category
+DATAS = ['data_internacao', 'data_saida']
+
+VALORES = [
+    'valor_total', 'valor_servicos_hospitalares', 'valor_servicos_profissionais', 'valor_uti', 'valor_em_dolares',
+]
+
+# Dicionários (CategoricalDtype) compartilhados por coluna, da versão dos dados em _versao;
+# a thread de aquecimento também compacta
+_dicionarios = {}
+_versao = None
+_trava = threading.Lock()
+
+def usar_versao(versao):
+    """Descarta os dicionários de uma versão anterior dos dados (as cópias dela saem do cache)"""
+
+    global _versao
+    with _trava:
+        if versao != _versao:
+            _dicionarios.clear()
+            _versao = versao
+
+def categorizar(coluna, valores):
+    """Converte para category com o dicionário compartilhado da coluna, ampliado só com valores novos"""
+
+    categorico = pd.Categorical(valores)
+    with _trava:
+        tipo = _dicionarios.get(coluna)
+        if tipo is None:
+            tipo = pd.CategoricalDtype(categorico.categories)
+        else:
+            novos = categorico.categories[~categorico.categories.isin(tipo.categories)]
+            if len(novos):
+                tipo = pd.CategoricalDtype(tipo.categories.append(novos))
+        _dicionarios[coluna] = tipo
+    return pd.Series(categorico.set_categories(tipo.categories), index=valores.index, name=valores.name).astype(tipo)
+
+def reduzir_inteiro(valores, tipo):
+    """
+    Inteiro no tipo alvo se todos os valores couberem nele (com nulos, o tipo anulável do pandas);
+    colunas de texto não numérico, com decimais ou fora da faixa ficam como estão
+    """
+
+    if valores.dtype == object:
+        numeros = pd.to_numeric(valores, errors='coerce')
+        if numeros.notna().sum() != valores.notna().sum():
+            return valores
+        valores = numeros
+    if valores.dtype.kind not in 'iuf':
+        return valores
+
+    presentes = valores.dropna().to_numpy()
+    if presentes.dtype.kind == 'f' and not np.array_equal(presentes, np.floor(presentes)):
+        return valores
+    limites = np.iinfo(tipo)
+    if len(presentes) and (presentes.min() < limites.min or presentes.max() > limites.max):
+        return valores
+    return valores.astype('UInt' + tipo[len('uint'):] if len(presentes) < len(valores) else tipo)
+
+def reduzir_valor(valores):
+    """float32 se a soma e a média (os KPIs de valor) continuarem iguais em centavos"""
+
+    reduzidos = valores.astype('float32')
+    if round(float(reduzidos.sum()), 2) != round(float(valores.sum()), 2):
+        return valores
+    if round(float(reduzidos.mean()), 2) != round(float(valores.mean()), 2):
+        return valores
+    return reduzidos
+
+def compactar_dados(df, versao=None):
+    """
+    Versão compacta do DataFrame principal do dashboard (mesmas colunas e linhas)
+    Com a versão dos dados, os dicionários só são compartilhados entre cópias da mesma versão
+    """
+
+    if versao is not None:
+        usar_versao(versao)
+    df = df.copy()
+    for coluna in CATEGORICAS:
+        if coluna in df.columns:
+            df[coluna] = categorizar(coluna, df[coluna])
+    for coluna, tipo in INTEIROS.items():
+        if coluna in df.columns:
+            df[coluna] = reduzir_inteiro(df[coluna], tipo)
+    # Datas gravadas como texto (AAAA-MM-DD) se repetem tanto quanto as dimensões
+    for coluna in DATAS:
+        if coluna in df.columns and df[coluna].dtype.kind not in 'iuf':
+            df[coluna] = categorizar(coluna, df[coluna])
+    for coluna in VALORES:
+        if coluna in df.columns:
+            df[coluna] = reduzir_valor(df[coluna])
+    return df
+
+def contagens(serie):
+    """value_counts sem as categorias ausentes (colunas category listam todas as do dicionário)"""
+    contagem = serie.value_counts()
+    return contagem[contagem > 0]
+
+def kpis_dashboard(df):
+    """KPIs da Visão Geral, arredondados como são exibidos"""
+
+    total = len(df)
+    kpis = {
+        'internacoes': total,
+        'valor_total': round(float(df['valor_total'].sum()), 2),
+        'valor_medio': round(float(df['valor_total'].mean()), 2),
+        'permanencia_media': round(float(df['dias_permanencia'].mean()), 1),
+        'idade_media': round(float(df['idade_anos'].mean()), 1),
+        'custo_dia': round(float((df['valor_total'] / df['dias_permanencia']).mean()), 2),
+        'perc_urgencia': round((df['carater_internacao'] == 'Urgência').sum() / total * 100, 1) if total else 0,
+        'perc_idosos': round((df['idade_anos'] >= 60).sum() / total * 100, 1) if total else 0,
+    }
+    # Empates ordenados pelo nome: a ordem do value_counts nos empates depende do tipo da coluna
+    causas = df['diagnostico_principal'].value_counts()
+    kpis['top_causas'] = sorted(
+        ((str(causa), int(casos)) for causa, casos in causas[causas > 0].items()),
+        key=lambda item: (-item[1], item[0])
+    )[:10]
+    competencias = df.groupby(['ano_competencia', 'mes_competencia'], observed=True)['valor_total'].agg(['size', 'sum'])
+    kpis['competencias'] = [
+        (int(ano), int(mes), int(linha['size']), round(float(linha['sum']), 2))
+        for (ano, mes), linha in competencias.iterrows()
+    ]
+    return kpis
+
+def verificar_kpis(original, compacto):
+    """Nomes dos KPIs que mudaram com a compactação (lista vazia se todos batem)"""
+
+    antes, depois = kpis_dashboard(original), kpis_dashboard(compacto)
+    return [nome for nome in antes if antes[nome] != depois[nome]]
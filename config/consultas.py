@@ -0,0 +1,438 @@
+"""
+Consultas SQL registradas do projeto
+Dashboard, ETL e relatórios usam as consultas daqui, e o harness de planos
+(benchmarks/plano_consultas.py) verifica cada uma com EXPLAIN QUERY PLAN
+"""
+
+import re
+
+CONSULTAS = {
+    # Dashboard: base principal carregada por load_main_data
+    'dashboard_dados_principais': '''
+        SELECT
+            i.id as internacao_id,
+            i.numero_aih,
+            i.ano_competencia,
+            i.mes_competencia,
+            i.data_internacao,
+            i.data_saida,
+            i.dias_permanencia,
+            i.dias_uti_total,
+            i.gestacao_risco,
+            i.reinternacao,
+            i.gerou_reinternacao,
+
+            -- Dados do paciente
+            p.idade_anos,
+            s.descricao as sexo,
+            p.codigo_municipio_residencia,
+
+            -- Dados clínicos com descrições
+            cid.descricao as diagnostico_principal,
+            cid.capitulo as capitulo_cid,
+            cid.sensivel_atencao_basica,
+            ci.descricao as carater_internacao,
+
+            -- Dados do estabelecimento
+            e.codigo_cnes,
+            esp.descricao as especialidade,
+            comp.descricao as complexidade,
+            tg.descricao as tipo_gestao,
+
+            -- Valores financeiros
+            vf.valor_total,
+            vf.valor_servicos_hospitalares,
+            vf.valor_servicos_profissionais,
+            vf.valor_uti,
+            vf.valor_em_dolares
+
+        FROM internacoes i
+        LEFT JOIN pacientes p ON i.paciente_id = p.id
+        LEFT JOIN sexo s ON p.codigo_sexo = s.codigo
+        LEFT JOIN cid_diagnosticos cid ON i.codigo_diagnostico_principal = cid.codigo
+        LEFT JOIN carater_internacao ci ON i.codigo_carater_internacao = ci.codigo
+        LEFT JOIN estabelecimentos e ON i.estabelecimento_id = e.id
+        LEFT JOIN especialidades esp ON e.codigo_especialidade = esp.codigo
+        LEFT JOIN complexidade comp ON e.codigo_complexidade = comp.codigo
+        LEFT JOIN tipos_gestao tg ON e.codigo_tipo_gestao = tg.codigo
+        LEFT JOIN valores_financeiros vf ON i.id = vf.internacao_id
+
+        WHERE i.codigo_diagnostico_principal IS NOT NULL
+        AND p.idade_anos IS NOT NULL
+        AND vf.valor_total IS NOT NULL
+        AND vf.valor_total > 0
+    ''',
+
+    # Serviço HTTP (servico/servidor.py): agregados por competência, somáveis entre competências
+    'servico_kpis': '''
+        SELECT
+            i.ano_competencia,
+            i.mes_competencia,
+            COUNT(*) as internacoes,
+            SUM(vf.valor_total) as valor_total,
+            SUM(i.dias_permanencia) as dias_permanencia,
+            SUM(i.dias_uti_total) as dias_uti
+        FROM internacoes i
+        JOIN valores_financeiros vf ON vf.internacao_id = i.id
+        GROUP BY 1, 2
+    ''',
+
+    'servico_principais_causas': '''
+        SELECT
+            i.ano_competencia,
+            i.mes_competencia,
+            i.codigo_diagnostico_principal,
+            c.descricao,
+            COUNT(*) as internacoes,
+            SUM(vf.valor_total) as valor_total,
+            SUM(i.dias_permanencia) as dias_permanencia
+        FROM internacoes i
+        JOIN valores_financeiros vf ON vf.internacao_id = i.id
+        LEFT JOIN cid_diagnosticos c ON c.codigo = i.codigo_diagnostico_principal
+        WHERE i.codigo_diagnostico_principal IS NOT NULL
+        GROUP BY 1, 2, 3, 4
+    ''',
+
+    'servico_serie_temporal': '''
+        SELECT
+            i.ano_competencia,
+            i.mes_competencia,
+            i.data_internacao,
+            COUNT(*) as internacoes,
+            SUM(vf.valor_total) as valor_total,
+            SUM(i.dias_permanencia) as dias_permanencia
+        FROM internacoes i
+        JOIN valores_financeiros vf ON vf.internacao_id = i.id
+        WHERE i.data_internacao IS NOT NULL
+        GROUP BY 1, 2, 3
+    ''',
+
+    'servico_ranking_municipios': '''
+        SELECT
+            i.ano_competencia,
+            i.mes_competencia,
+            p.codigo_municipio_residencia,
+            m.nome,
+            COUNT(*) as internacoes,
+            SUM(vf.valor_total) as valor_total,
+            SUM(i.dias_permanencia) as dias_permanencia
+        FROM internacoes i
+        JOIN pacientes p ON i.paciente_id = p.id
+        JOIN valores_financeiros vf ON vf.internacao_id = i.id
+        LEFT JOIN municipios m ON m.codigo = p.codigo_municipio_residencia
+        WHERE p.codigo_municipio_residencia IS NOT NULL
+        GROUP BY 1, 2, 3, 4
+    ''',
+
+    # Relatórios em lote (scripts/relatorios_municipios.py): uma leitura para todos os municípios
+    'relatorio_lote_base': '''
+        SELECT
+            p.codigo_municipio_residencia,
+            m.nome as municipio,
+            i.ano_competencia,
+            i.mes_competencia,
+            i.codigo_diagnostico_principal,
+            cid.descricao as diagnostico,
+            ci.descricao as carater_internacao,
+            i.dias_permanencia,
+            i.dias_uti_total,
+            vf.valor_total,
+            vf.valor_servicos_hospitalares,
+            vf.valor_servicos_profissionais,
+            vf.valor_uti
+        FROM internacoes i
+        JOIN pacientes p ON i.paciente_id = p.id
+        JOIN valores_financeiros vf ON vf.internacao_id = i.id
+        LEFT JOIN municipios m ON m.codigo = p.codigo_municipio_residencia
+        LEFT JOIN cid_diagnosticos cid ON cid.codigo = i.codigo_diagnostico_principal
+        LEFT JOIN carater_internacao ci ON ci.codigo = i.codigo_carater_internacao
+        WHERE p.codigo_municipio_residencia IS NOT NULL
+    ''',
+
+    # ETL: CIDs resolvidos pelo pacote de referências (exato e pela categoria de 3 caracteres)
+    'etl_dimensao_cid': '''
+        INSERT OR IGNORE INTO cid_diagnosticos (codigo, descricao, capitulo, grupo, sensivel_atencao_basica)
+        SELECT d.codigo,
+               COALESCE(r.descricao, r3.descricao, 'Diagnóstico ' || d.codigo),
+               COALESCE(r.capitulo, r3.capitulo, 'Não classificado'),
+               COALESCE(r.grupo, r3.grupo, 'Não classificado'),
+               COALESCE(r.sensivel_atencao_basica, r3.sensivel_atencao_basica, FALSE)
+        FROM (
+            SELECT DISTINCT codigo_diagnostico_principal AS codigo
+            FROM internacoes
+            WHERE codigo_diagnostico_principal IS NOT NULL
+        ) d
+        LEFT JOIN ref.cid10 r ON r.codigo = d.codigo
+        LEFT JOIN ref.cid10 r3 ON r3.codigo = substr(d.codigo, 1, 3)
+    ''',
+
+    # ETL: procedimentos resolvidos pelo pacote (códigos gravados sem o zero à esquerda)
+    'etl_dimensao_procedimentos': '''
+        INSERT OR IGNORE INTO procedimentos (codigo, descricao, grupo_procedimento)
+        SELECT d.codigo,
+               COALESCE(r.descricao, 'Procedimento ' || d.codigo),
+               COALESCE(r.grupo_procedimento, 'Não classificado')
+        FROM (
+            SELECT DISTINCT codigo_procedimento_solicitado AS codigo
+            FROM internacoes
+            WHERE codigo_procedimento_solicitado IS NOT NULL
+            AND codigo_procedimento_solicitado != ''
+            AND codigo_procedimento_solicitado != '0'
+        ) d
+        LEFT JOIN ref.procedimentos r ON r.codigo = substr('0000000000' || d.codigo, -10)
+    ''',
+
+    # ETL: municípios de residência e de movimento (códigos DATASUS de 6 dígitos)
+    'etl_dimensao_municipios': '''
+        INSERT OR IGNORE INTO municipios (codigo, nome, regiao_saude)
+        SELECT d.codigo,
+               CASE WHEN r.codigo6 IS NULL THEN 'Município ' || d.codigo
+                    WHEN r.uf = 'PR' THEN COALESCE(r.nome, 'Município PR ' || d.codigo)
+                    ELSE 'Outros Estados' END,
+               CASE WHEN r.codigo6 IS NULL OR r.uf = 'PR' THEN 'Paraná'
+                    ELSE 'Outros Estados (' || r.uf || ')' END
+        FROM (
+            SELECT codigo_municipio_residencia AS codigo
+            FROM pacientes
+            WHERE codigo_municipio_residencia IS NOT NULL
+            AND codigo_municipio_residencia != ''
+            UNION
+            SELECT codigo_municipio_movimento
+            FROM estabelecimentos
+            WHERE codigo_municipio_movimento IS NOT NULL
+            AND codigo_municipio_movimento != ''
+        ) d
+        LEFT JOIN ref.municipios r ON r.codigo6 = substr(d.codigo, 1, 6)
+    ''',
+
+    # ETL (popular_tabelas_faltantes): exemplos de procedimentos mais frequentes
+    'etl_exemplos_procedimentos': '''
+        SELECT p.codigo, p.descricao, COUNT(*) as frequencia
+        FROM procedimentos p
+        JOIN internacoes i ON p.codigo = i.codigo_procedimento_solicitado
+        GROUP BY p.codigo, p.descricao
+        ORDER BY COUNT(*) DESC
+        LIMIT 5
+    ''',
+
+    # ETL (popular_tabelas_faltantes): exemplos de municípios com mais pacientes
+    'etl_exemplos_municipios': '''
+        SELECT m.codigo, m.nome, COUNT(*) as frequencia
+        FROM municipios m
+        JOIN pacientes p ON m.codigo = p.codigo_municipio_residencia
+        GROUP BY m.codigo, m.nome
+        ORDER BY COUNT(*) DESC
+        LIMIT 5
+    ''',
+
+    # ETL (config/particoes.py): chave de cada AIH da partição, para remover as reapresentadas
+    # numa competência mais recente por uma carga posterior
+    'etl_chaves_aih': '''
+        SELECT id, numero_aih, sequencia_registro
+        FROM internacoes
+    ''',
+
+    # ETL (config/resumos.py): colunas resumidas em cada partição, com os filtros da base do dashboard
+    'etl_resumos_particao': '''
+        SELECT
+            cid.descricao as diagnostico_principal,
+            p.codigo_municipio_residencia,
+            vf.valor_total,
+            i.dias_permanencia,
+            p.idade_anos
+        FROM internacoes i
+        JOIN pacientes p ON i.paciente_id = p.id
+        JOIN valores_financeiros vf ON vf.internacao_id = i.id
+        LEFT JOIN cid_diagnosticos cid ON i.codigo_diagnostico_principal = cid.codigo
+        WHERE i.codigo_diagnostico_principal IS NOT NULL
+        AND p.idade_anos IS NOT NULL
+        AND vf.valor_total > 0
+    ''',
+
+    # ETL (scripts/reinternacoes.py): datas de cada internação e a chave do paciente
+    'etl_reinternacoes_base': '''
+        SELECT
+            i.id,
+            i.data_internacao,
+            i.data_saida,
+            p.data_nascimento,
+            p.codigo_sexo,
+            p.codigo_municipio_residencia,
+            p.cep
+        FROM internacoes i
+        JOIN pacientes p ON i.paciente_id = p.id
+    ''',
+
+    # ETL (config/fluxos.py): triplas origem-destino (residência x movimento) por competência
+    'etl_fluxos_municipios': '''
+        INSERT INTO fluxos_municipios
+        SELECT
+            i.ano_competencia,
+            i.mes_competencia,
+            CAST(p.codigo_municipio_residencia AS INTEGER),
+            CAST(e.codigo_municipio_movimento AS INTEGER),
+            COUNT(*),
+            SUM(vf.valor_total),
+            SUM(i.dias_permanencia)
+        FROM internacoes i
+        JOIN pacientes p ON i.paciente_id = p.id
+        JOIN estabelecimentos e ON i.estabelecimento_id = e.id
+        JOIN valores_financeiros vf ON vf.internacao_id = i.id
+        WHERE p.codigo_municipio_residencia IS NOT NULL
+        AND e.codigo_municipio_movimento IS NOT NULL
+        GROUP BY 1, 2, 3, 4
+    ''',
+
+    # ETL (config/taxas.py): casos por município, CID, competência, sexo e idade (numeradores)
+    'etl_taxas_casos': '''
+        SELECT
+            p.codigo_municipio_residencia as municipio,
+            substr(i.codigo_diagnostico_principal, 1, 3) as cid,
+            i.ano_competencia,
+            i.mes_competencia,
+            p.codigo_sexo,
+            p.idade_anos,
+            COUNT(*) as internacoes,
+            SUM(vf.valor_total) as valor_total
+        FROM internacoes i
+        JOIN pacientes p ON i.paciente_id = p.id
+        JOIN valores_financeiros vf ON vf.internacao_id = i.id
+        WHERE p.codigo_municipio_residencia IS NOT NULL
+        AND p.idade_anos IS NOT NULL
+        GROUP BY 1, 2, 3, 4, 5, 6
+    ''',
+
+    # Relatório do enriquecimento de CIDs: diagnósticos mais frequentes
+    'relatorio_cid_frequentes': '''
+        SELECT
+            i.codigo_diagnostico_principal,
+            cid.descricao,
+            COUNT(*) as frequencia
+        FROM internacoes i
+        LEFT JOIN cid_diagnosticos cid ON i.codigo_diagnostico_principal = cid.codigo
+        WHERE i.codigo_diagnostico_principal IS NOT NULL
+        AND cid.descricao IS NOT NULL
+        AND cid.descricao NOT LIKE 'Diagnóstico %'
+        GROUP BY i.codigo_diagnostico_principal, cid.descricao
+        ORDER BY COUNT(*) DESC
+        LIMIT 10
+    ''',
+
+    # Relatório do enriquecimento de municípios: distribuição por categoria
+    'relatorio_municipios_categorias': '''
+        SELECT
+            CASE
+                WHEN nome = 'Outros Estados' THEN 'Outros Estados'
+                WHEN nome = 'Município Não Identificado' THEN 'Não Identificado'
+                ELSE 'Paraná'
+            END as categoria,
+            COUNT(DISTINCT m.codigo) as municipios,
+            COUNT(DISTINCT p.id) as pacientes
+        FROM municipios m
+        LEFT JOIN pacientes p ON m.codigo = p.codigo_municipio_residencia
+        GROUP BY categoria
+        ORDER BY COUNT(DISTINCT p.id) DESC
+    ''',
+
+    # Relatório do enriquecimento de municípios: top 10 do Paraná
+    'relatorio_municipios_top': '''
+        SELECT m.nome, COUNT(p.id) as pacientes
+        FROM municipios m
+        LEFT JOIN pacientes p ON m.codigo = p.codigo_municipio_residencia
+        WHERE m.regiao_saude = 'Paraná'
+        GROUP BY m.codigo, m.nome
+        ORDER BY COUNT(p.id) DESC
+        LIMIT 10
+    ''',
+
+    # Relatório do enriquecimento de procedimentos: quantidade por grupo
+    'relatorio_procedimentos_grupos': '''
+        SELECT
+            grupo_procedimento,
+            COUNT(*) as quantidade
+        FROM procedimentos
+        GROUP BY grupo_procedimento
+        ORDER BY COUNT(*) DESC
+        LIMIT 10
+    ''',
+
+    # Relatório do enriquecimento de procedimentos: mais frequentes
+    'relatorio_procedimentos_top': '''
+        SELECT
+            p.descricao,
+            COUNT(i.id) as frequencia
+        FROM procedimentos p
+        JOIN internacoes i ON p.codigo = i.codigo_procedimento_solicitado
+        WHERE p.descricao NOT LIKE 'Procedimento %'
+        GROUP BY p.codigo, p.descricao
+        ORDER BY COUNT(i.id) DESC
+        LIMIT 10
+    ''',
+
+    # Relatório do enriquecimento de CNPJ: estabelecimentos por tipo
+    'relatorio_estabelecimentos_tipos': '''
+        SELECT
+            tipo_estabelecimento,
+            COUNT(DISTINCT cnpj_hospital) as estabelecimentos,
+            COUNT(DISTINCT i.id) as internacoes
+        FROM estabelecimentos e
+        LEFT JOIN internacoes i ON e.id = i.estabelecimento_id
+        GROUP BY tipo_estabelecimento
+        ORDER BY COUNT(DISTINCT i.id) DESC
+    ''',
+
+    # Relatório do enriquecimento de CNPJ: top 10 estabelecimentos
+    'relatorio_estabelecimentos_top': '''
+        SELECT e.nome_estabelecimento, COUNT(i.id) as internacoes
+        FROM estabelecimentos e
+        LEFT JOIN internacoes i ON e.id = i.estabelecimento_id
+        WHERE e.nome_estabelecimento IS NOT NULL
+        GROUP BY e.cnpj_hospital, e.nome_estabelecimento
+        ORDER BY COUNT(i.id) DESC
+        LIMIT 10
+    ''',
+
+    # Relatório de reinternações: diagnósticos com maior proporção de internações seguidas de
+    # reinternação (só diagnósticos com volume mínimo)
+    'relatorio_reinternacao_cid': '''
+        SELECT
+            cid.codigo,
+            cid.descricao,
+            COUNT(*) as internacoes,
+            SUM(i.gerou_reinternacao) as reinternacoes,
+            100.0 * SUM(i.gerou_reinternacao) / COUNT(*) as taxa
+        FROM internacoes i
+        JOIN cid_diagnosticos cid ON cid.codigo = i.codigo_diagnostico_principal
+        GROUP BY cid.codigo, cid.descricao
+        HAVING COUNT(*) >= 30
+        ORDER BY taxa DESC
+        LIMIT 10
+    ''',
+
+    # Relatório de reinternações: municípios de residência com maior proporção de reinternação
+    'relatorio_reinternacao_municipio': '''
+        SELECT
+            m.codigo,
+            m.nome,
+            COUNT(*) as internacoes,
+            SUM(i.gerou_reinternacao) as reinternacoes,
+            100.0 * SUM(i.gerou_reinternacao) / COUNT(*) as taxa
+        FROM internacoes i
+        JOIN pacientes p ON i.paciente_id = p.id
+        JOIN municipios m ON m.codigo = p.codigo_municipio_residencia
+        GROUP BY m.codigo, m.nome
+        HAVING COUNT(*) >= 30
+        ORDER BY taxa DESC
+        LIMIT 10
+    ''',
+}
+
+def consulta(nome, engine='sqlite'):
+    """
+    SQL da consulta registrada para o motor informado
+    No DuckDB o CROSS JOIN ... ON (dica de ordem de junção do SQLite) vira JOIN comum
+    """
+    sql = CONSULTAS[nome]
+    if engine == 'duckdb':
+        sql = re.sub(r'\bCROSS\s+JOIN\b', 'JOIN', sql)
+    return sql
@@ -0,0 +1,190 @@
+"""
+Deduplicação de AIHs pela chave do SIH
+A chave de uma AIH é N_AIH + SEQUENCIA; reapresentações da mesma chave em competências
+diferentes seguem a regra "a mais recente vence". As chaves viram hashes uint64 (um por linha,
+sem comparar as ~100 colunas) e, na carga particionada, as já carregadas ficam num conjunto
+persistente em SQLite, consultado como array ordenado, valendo entre arquivos e entre cargas
+"""
+
+import os
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+from config.settings import FILES
+
+COLUNAS_CHAVE_AIH = ['N_AIH', 'SEQUENCIA']
+COLUNAS_COMPETENCIA = ['ANO_CMPT', 'MES_CMPT']
+
+TAMANHO_LOTE = 500_000
+
+def normalizar_chave(valores):
+    """Texto da coluna sem espaços nem o '.0' de colunas lidas como número"""
+    valores = valores.astype(str).str.strip().str.removesuffix('.0')
+    return valores.replace({'nan': '', 'None': '', '<NA>': ''}).to_numpy(dtype=object)
+
+def hash_chaves(df, colunas=COLUNAS_CHAVE_AIH):
+    """
+    Hash uint64 da chave de cada linha (colunas ausentes entram vazias)
+    Cada coluna é hasheada sem categorizar (a chave é quase única) e os hashes são combinados
+    """
+
+    combinado = np.zeros(len(df), dtype=np.uint64)
+    for coluna in colunas:
+        valores = normalizar_chave(df[coluna]) if coluna in df.columns else np.full(len(df), '', dtype=object)
+        h = pd.util.hash_array(valores, categorize=False)
+        combinado ^= h + np.uint64(0x9E3779B97F4A7C15) + (combinado << np.uint64(6)) + (combinado >> np.uint64(2))
+    return combinado
+
+def valores_inteiros(valores):
+    """Converte para inteiro só os valores distintos (poucos, como ano e mês); ausentes viram 0"""
+    codigos, distintos = pd.factorize(valores)
+    inteiros = pd.to_numeric(pd.Series(distintos, dtype=object), errors='coerce').fillna(0).to_numpy(dtype=np.int64)
+    return np.where(codigos >= 0, inteiros[np.maximum(codigos, 0)] if len(inteiros) else 0, 0)
+
+def competencias(df):
+    """Competência AAAAMM de cada linha (0 se ausente)"""
+    return valores_inteiros(df[COLUNAS_COMPETENCIA[0]]) * 100 + valores_inteiros(df[COLUNAS_COMPETENCIA[1]])
+
+def vencedoras(hashes, competencias):
+    """
+    Máscara das linhas que ficam: por chave, a da competência mais recente
+    (no empate, a última na ordem de leitura); uma única ordenação para todas as chaves
+    """
+
+    n = len(hashes)
+    mascara = np.zeros(n, dtype=bool)
+    if not n:
+        return mascara
+
+    ordem = np.lexsort((np.arange(n), competencias, hashes))
+    ultima = np.ones(n, dtype=bool)
+    ultima[:-1] = hashes[ordem[1:]] != hashes[ordem[:-1]]
+    mascara[ordem[ultima]] = True
+    return mascara
+
+class ChavesVistas:
+    """
+    Conjunto persistente das chaves já carregadas, com a competência mais recente de cada uma
+    Fica numa tabela SQLite (hash como INTEGER) e é consultado como array ordenado
+    """
+
+    def __init__(self, path=None):
+        self.path = path or FILES['aihs_vistas']
+        conn = sqlite3.connect(self.path)
+        try:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS aihs_vistas (
+                    hash INTEGER PRIMARY KEY,
+                    competencia INTEGER
+                ) WITHOUT ROWID
+            ''')
+            linhas = conn.execute('SELECT hash, competencia FROM aihs_vistas ORDER BY hash').fetchall()
+        finally:
+            conn.close()
+
+        dados = np.array(linhas, dtype=np.int64).reshape(-1, 2)
+        # O SQLite guarda inteiros com sinal: o hash volta a uint64 pela mesma representação binária
+        self.hashes = dados[:, 0].view(np.uint64)
+        self.competencias = dados[:, 1]
+        ordem = np.argsort(self.hashes, kind='stable')
+        self.hashes, self.competencias = self.hashes[ordem], self.competencias[ordem]
+
+    def __len__(self):
+        return len(self.hashes)
+
+    def competencia_vista(self, hashes):
+        """Competência já carregada de cada hash; -1 para chaves novas"""
+
+        if not len(self.hashes):
+            return np.full(len(hashes), -1, dtype=np.int64)
+        posicoes = np.minimum(np.searchsorted(self.hashes, hashes), len(self.hashes) - 1)
+        encontradas = self.hashes[posicoes] == hashes
+        return np.where(encontradas, self.competencias[posicoes], -1)
+
+    def registrar(self, hashes, competencias):
+        """Grava as chaves carregadas, mantendo a competência mais recente de cada uma"""
+
+        conn = sqlite3.connect(self.path)
+        try:
+            conn.executemany(
+                '''
+                    INSERT INTO aihs_vistas VALUES (?, ?)
+                    ON CONFLICT(hash) DO UPDATE SET competencia = max(competencia, excluded.competencia)
+                ''',
+                zip(hashes.view(np.int64).tolist(), np.asarray(competencias, dtype=np.int64).tolist())
+            )
+            conn.commit()
+        finally:
+            conn.close()
+
+        todas_hashes = np.concatenate([self.hashes, hashes])
+        todas_competencias = np.concatenate([self.competencias, np.asarray(competencias, dtype=np.int64)])
+        mantidas = vencedoras(todas_hashes, todas_competencias)
+        ordem = np.argsort(todas_hashes[mantidas], kind='stable')
+        self.hashes = todas_hashes[mantidas][ordem]
+        self.competencias = todas_competencias[mantidas][ordem]
+
+def mascara_deduplicacao(hashes, competencias, vistas=None):
+    """
+    Linhas que ficam após a regra da competência mais recente, dentro dos dados e contra
+    as chaves já carregadas; retorna a máscara, as duplicadas nos dados e as superadas
+    """
+
+    mascara = vencedoras(hashes, competencias)
+    duplicadas = int(len(mascara) - mascara.sum())
+
+    superadas = 0
+    if vistas is not None and len(vistas):
+        # Uma versão mais recente da AIH já foi carregada antes
+        ja_carregadas = vistas.competencia_vista(hashes) > competencias
+        superadas = int((mascara & ja_carregadas).sum())
+        mascara &= ~ja_carregadas
+
+    return mascara, duplicadas, superadas
+
+def deduplicar(df, vistas=None):
+    """Remove as AIHs repetidas de um DataFrame do RD; retorna o DataFrame e as contagens"""
+
+    hashes = hash_chaves(df)
+    comps = competencias(df)
+    mascara, duplicadas, superadas = mascara_deduplicacao(hashes, comps, vistas)
+    if vistas is not None:
+        vistas.registrar(hashes[mascara], comps[mascara])
+    return df[mascara], duplicadas, superadas
+
+def chaves_csv(csv_path, tamanho_lote=TAMANHO_LOTE):
+    """Hashes das chaves e competências de cada linha do CSV, lendo só essas colunas em lotes"""
+
+    colunas = set(COLUNAS_CHAVE_AIH + COLUNAS_COMPETENCIA)
+    hashes, comps = [], []
+    for lote in pd.read_csv(csv_path, dtype=str, usecols=lambda coluna: coluna in colunas, chunksize=tamanho_lote):
+        hashes.append(hash_chaves(lote))
+        comps.append(competencias(lote))
+
+    hashes = np.concatenate(hashes) if hashes else np.empty(0, dtype=np.uint64)
+    comps = np.concatenate(comps) if comps else np.empty(0, dtype=np.int64)
+    return hashes, comps
+
+def deduplicar_csv(csv_path, vistas=None, tamanho_lote=TAMANHO_LOTE):
+    """
+    Deduplica o CSV em duas leituras em lotes: só as colunas da chave e da competência para
+    decidir as vencedoras e, se houver o que remover, o arquivo inteiro reescrito sem as demais
+    As chaves não são registradas em 'vistas': isso cabe à carga, depois que ela der certo
+    Retorna registros lidos, duplicadas e superadas
+    """
+
+    hashes, comps = chaves_csv(csv_path, tamanho_lote)
+    mascara, duplicadas, superadas = mascara_deduplicacao(hashes, comps, vistas)
+
+    if duplicadas or superadas:
+        temporario = csv_path + '.dedup'
+        inicio = 0
+        lotes = pd.read_csv(csv_path, dtype=str, keep_default_na=False, chunksize=tamanho_lote)
+        for i, lote in enumerate(lotes):
+            lote[mascara[inicio:inicio + len(lote)]].to_csv(temporario, mode='w' if i == 0 else 'a', header=i == 0, index=False)
+            inicio += len(lote)
+        os.replace(temporario, csv_path)
+
+    return len(hashes), duplicadas, superadas
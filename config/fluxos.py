@@ -0,0 +1,149 @@
+"""
+Fluxo de pacientes entre municípios de residência e de internação
+A carga grava, por competência, a matriz origem-destino em triplas COO (tabela fluxos_municipios).
+As consultas montam matrizes esparsas CSR do SciPy indexadas pelo código IBGE (6 dígitos) e
+respondem "onde meus residentes se internam" e os maiores fluxos de entrada e saída sem
+refazer as junções das internações
+"""
+
+import os
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+from config.settings import DATABASE, PARTICIONAMENTO
+from config.consultas import CONSULTAS
+
+# Códigos IBGE de 6 dígitos indexam diretamente linhas (residência) e colunas (movimento)
+DIMENSAO_MATRIZ = 10 ** 6
+
+ESTRUTURA_FLUXOS = '''
+    CREATE TABLE IF NOT EXISTS fluxos_municipios (
+        ano_competencia INTEGER,
+        mes_competencia INTEGER,
+        municipio_residencia INTEGER,
+        municipio_movimento INTEGER,
+        internacoes INTEGER,
+        valor_total REAL,
+        dias_permanencia INTEGER,
+        PRIMARY KEY (ano_competencia, mes_competencia, municipio_residencia, municipio_movimento)
+    ) WITHOUT ROWID
+'''
+
+# Matrizes somáveis; a permanência média é dias_permanencia / internacoes
+METRICAS_FLUXO = ['internacoes', 'valor_total', 'dias_permanencia']
+
+def importar_sparse():
+    """Importa o scipy.sparse só quando os fluxos são consultados"""
+    try:
+        from scipy import sparse
+    except ImportError as e:
+        raise ImportError("Os fluxos entre municípios requerem o pacote scipy (pip install scipy)") from e
+    return sparse
+
+def calcular_fluxos(conn):
+    """Recalcula as triplas origem-destino de todas as competências do banco"""
+
+    conn.execute(ESTRUTURA_FLUXOS)
+    conn.execute('DELETE FROM fluxos_municipios')
+    cursor = conn.execute(CONSULTAS['etl_fluxos_municipios'])
+    conn.commit()
+    return cursor.rowcount
+
+def bancos_fluxos(competencias=None):
+    """Bancos com a tabela de fluxos: as partições do período ou o banco único"""
+
+    if PARTICIONAMENTO['ativo']:
+        from config.particoes import podar_particoes
+        return [particao['path'] for particao in podar_particoes(competencias)]
+    return [DATABASE['path']] if os.path.exists(DATABASE['path']) else []
+
+def ler_triplas(competencias=None):
+    """Triplas de todas as competências pedidas (None = todas), concatenadas"""
+
+    filtro, parametros = '', []
+    if competencias:
+        filtro = 'WHERE ' + ' OR '.join(['(ano_competencia = ? AND mes_competencia = ?)'] * len(competencias))
+        parametros = [valor for competencia in competencias for valor in competencia]
+
+    triplas = []
+    for db_path in bancos_fluxos(competencias):
+        conn = sqlite3.connect(f'file:{db_path}?mode=ro', uri=True)
+        try:
+            if conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'fluxos_municipios'").fetchone():
+                triplas.append(pd.read_sql_query(
+                    f"SELECT municipio_residencia, municipio_movimento, {', '.join(METRICAS_FLUXO)} "
+                    f"FROM fluxos_municipios {filtro}",
+                    conn, params=parametros
+                ))
+        finally:
+            conn.close()
+
+    if not triplas:
+        raise FileNotFoundError("Fluxos entre municípios não encontrados; recarregue o banco (scripts/create_database.py)")
+    return pd.concat(triplas, ignore_index=True)
+
+def carregar_fluxos(competencias=None):
+    """
+    Matrizes CSR residência x movimento de cada métrica, somando as competências pedidas
+    Triplas repetidas (mesmo par em meses diferentes) são somadas na conversão COO → CSR
+    """
+
+    sparse = importar_sparse()
+    triplas = ler_triplas(competencias)
+    linhas = triplas['municipio_residencia'].to_numpy(dtype=np.int32)
+    colunas = triplas['municipio_movimento'].to_numpy(dtype=np.int32)
+
+    return {
+        metrica: sparse.coo_array(
+            (triplas[metrica].to_numpy(dtype=float), (linhas, colunas)),
+            shape=(DIMENSAO_MATRIZ, DIMENSAO_MATRIZ)
+        ).tocsr()
+        for metrica in METRICAS_FLUXO
+    }
+
+def destinos_residentes(fluxos, municipio):
+    """Onde os residentes do município se internam: uma linha da matriz, maiores fluxos primeiro"""
+
+    # As matrizes vêm das mesmas triplas, então a linha tem os mesmos destinos em todas
+    linha = int(municipio)
+    linhas = {metrica: matriz[linha:linha + 1] for metrica, matriz in fluxos.items()}
+
+    resultado = pd.DataFrame({
+        'municipio_movimento': linhas['internacoes'].indices,
+        'internacoes': linhas['internacoes'].data.astype(int),
+        'valor_total': linhas['valor_total'].data,
+        'dias_permanencia': linhas['dias_permanencia'].data,
+    })
+    resultado['permanencia_media'] = resultado['dias_permanencia'] / resultado['internacoes']
+    resultado['percentual'] = resultado['internacoes'] / resultado['internacoes'].sum() * 100
+    return resultado.drop(columns='dias_permanencia').sort_values('internacoes', ascending=False, ignore_index=True)
+
+def fluxos_externos(fluxos, eixo, n=10):
+    """
+    Soma de cada município sem a diagonal (quem se interna no próprio município)
+    eixo=1: saídas (residentes internados fora); eixo=0: entradas (internações de não residentes)
+    """
+
+    internacoes = fluxos['internacoes']
+    totais = np.asarray(internacoes.sum(axis=eixo)).ravel() - internacoes.diagonal()
+    valores = fluxos['valor_total']
+    valores_totais = np.asarray(valores.sum(axis=eixo)).ravel() - valores.diagonal()
+
+    principais = np.argpartition(totais, -n)[-n:]
+    principais = principais[np.argsort(totais[principais])[::-1]]
+    principais = principais[totais[principais] > 0]
+    return pd.DataFrame({
+        'municipio': principais,
+        'internacoes': totais[principais].astype(int),
+        'valor_total': valores_totais[principais],
+    })
+
+def principais_entradas(fluxos, n=10):
+    """Municípios que mais recebem pacientes de outros municípios"""
+    return fluxos_externos(fluxos, 0, n)
+
+def principais_saidas(fluxos, n=10):
+    """Municípios cujos residentes mais se internam em outros municípios"""
+    return fluxos_externos(fluxos, 1, n)
@@ -0,0 +1,211 @@
+"""
+Motor das consultas analíticas
+SQLite (padrão) lê o banco normalizado; DuckDB lê a cópia analítica (.duckdb ou diretório
+Parquet) gerada por scripts/exportar_analitico.py e executa as agregações vetorizadas em
+várias threads. O motor é escolhido em DATABASE['engine']
+"""
+
+import os
+import queue
+import hashlib
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+import pandas as pd
+
+from config.settings import DATABASE, PARTICIONAMENTO
+from config.consultas import consulta
+from config.particoes import listar_particoes
+
+MOTORES = ('sqlite', 'duckdb')
+
+def importar_duckdb():
+    """Importa o DuckDB só quando o motor é usado, já que ele é opcional"""
+    try:
+        import duckdb
+    except ImportError as e:
+        raise ImportError(
+            "O motor 'duckdb' requer o pacote duckdb (pip install duckdb) "
+            "ou DATABASE['engine'] = 'sqlite' em config/settings.py"
+        ) from e
+    return duckdb
+
+def conectar_duckdb(duckdb_path=None, parquet_dir=None):
+    """
+    Conexão DuckDB somente leitura com a cópia analítica
+    Sem o arquivo .duckdb, cria views sobre os arquivos <tabela>.parquet do diretório Parquet
+    """
+
+    duckdb = importar_duckdb()
+    duckdb_path = duckdb_path or DATABASE['duckdb_path']
+    parquet_dir = parquet_dir or DATABASE['parquet_dir']
+
+    if os.path.exists(duckdb_path):
+        conn = duckdb.connect(duckdb_path, read_only=True)
+    elif os.path.isdir(parquet_dir):
+        conn = duckdb.connect()
+        for arquivo in sorted(os.listdir(parquet_dir)):
+            tabela, extensao = os.path.splitext(arquivo)
+            if extensao == '.parquet':
+                caminho = os.path.join(parquet_dir, arquivo).replace("'", "''")
+                conn.execute(f"CREATE VIEW {tabela} AS SELECT * FROM read_parquet('{caminho}')")
+    else:
+        raise FileNotFoundError(
+            f"Cópia analítica não encontrada em {duckdb_path} nem {parquet_dir}; "
+            "execute scripts/exportar_analitico.py"
+        )
+
+    if DATABASE['duckdb_threads']:
+        conn.execute(f"SET threads = {int(DATABASE['duckdb_threads'])}")
+    return conn
+
+def conectar(engine=None, somente_leitura=False):
+    """Abre a conexão do motor configurado (ou do informado); a do DuckDB é sempre somente leitura"""
+
+    engine = engine or DATABASE['engine']
+    if engine == 'sqlite':
+        if somente_leitura:
+            return sqlite3.connect(f"file:{DATABASE['path']}?mode=ro", uri=True, check_same_thread=False)
+        return sqlite3.connect(DATABASE['path'], check_same_thread=False)
+    if engine == 'duckdb':
+        return conectar_duckdb()
+    raise ValueError(f"Motor desconhecido: {engine} (use um de {', '.join(MOTORES)})")
+
+class PoolConexoes:
+    """
+    Conexões do motor configurado reaproveitadas entre threads (dashboard e serviço HTTP)
+    As conexões são somente leitura; no SQLite cada thread usa uma conexão própria e no DuckDB
+    a conexão é uma só e ler_consulta abre um cursor por consulta.
+    As conexões são de uma versão dos dados: quando o ETL regrava o banco ou troca a cópia
+    analítica (os.replace), o próximo empréstimo espera as conexões em uso voltarem, fecha todas
+    e abre novas, para nenhuma consulta continuar lendo o arquivo substituído
+    """
+
+    # Colocada na fila de uma versão fechada para acordar quem ainda esperava por ela
+    SENTINELA = None
+
+    def __init__(self, tamanho=4, engine=None):
+        self.tamanho = tamanho
+        self.engine = engine or DATABASE['engine']
+        self.trava = threading.Lock()
+        self.geracao = self.abrir()
+
+    def abrir(self):
+        """Conexões da versão atual dos dados e a fila das livres"""
+
+        geracao = {'versao': versao_dados(), 'livres': queue.Queue()}
+        if self.engine == 'duckdb':
+            compartilhada = conectar(self.engine, somente_leitura=True)
+            geracao['conexoes'] = [compartilhada]
+            for _ in range(self.tamanho):
+                geracao['livres'].put(compartilhada)
+        else:
+            geracao['conexoes'] = [conectar(self.engine, somente_leitura=True) for _ in range(self.tamanho)]
+            for conn in geracao['conexoes']:
+                geracao['livres'].put(conn)
+        return geracao
+
+    def renovar(self):
+        """Reabre as conexões se a versão dos dados mudou; True se reabriu"""
+
+        if versao_dados() == self.geracao['versao']:
+            return False
+        with self.trava:
+            versao = versao_dados()
+            if versao == self.geracao['versao']:
+                return False
+            antiga = self.geracao
+            # O DuckDB reaproveita a instância ainda aberta para o mesmo caminho: a versão antiga
+            # precisa estar fechada antes de abrir a nova
+            for _ in range(self.tamanho):
+                antiga['livres'].get()
+            self.fechar_geracao(antiga)
+            self.geracao = self.abrir()
+            antiga['livres'].put(self.SENTINELA)
+        return True
+
+    @contextmanager
+    def conexao(self):
+        """Empresta uma conexão da versão atual, esperando se todas estiverem em uso"""
+
+        while True:
+            self.renovar()
+            livres = self.geracao['livres']
+            conn = livres.get()
+            if conn is not self.SENTINELA:
+                break
+            # Versão fechada enquanto esperava: repassa o aviso e tenta na atual
+            livres.put(self.SENTINELA)
+        try:
+            yield conn
+        finally:
+            livres.put(conn)
+
+    @staticmethod
+    def fechar_geracao(geracao):
+        for conn in geracao['conexoes']:
+            conn.close()
+
+    def fechar(self):
+        self.fechar_geracao(self.geracao)
+
+def motor_da_conexao(conn):
+    """'sqlite' ou 'duckdb', conforme o tipo da conexão"""
+    return 'sqlite' if isinstance(conn, sqlite3.Connection) else 'duckdb'
+
+def ler_consulta(conn, sql):
+    """Executa o SQL na conexão e devolve um DataFrame"""
+
+    if motor_da_conexao(conn) == 'sqlite':
+        return pd.read_sql_query(sql, conn)
+
+    # Cursor próprio: a conexão DuckDB é compartilhada entre as sessões do Streamlit
+    cursor = conn.cursor()
+    try:
+        return cursor.execute(sql).df()
+    finally:
+        cursor.close()
+
+def executar_consulta(nome, conn=None, engine=None):
+    """Executa uma consulta registrada em config/consultas.py no motor da conexão"""
+
+    propria = conn is None
+    conn = conn or conectar(engine)
+    try:
+        return ler_consulta(conn, consulta(nome, motor_da_conexao(conn)))
+    finally:
+        if propria:
+            conn.close()
+
+def arquivos_dados():
+    """Arquivos lidos pelas consultas no modo configurado"""
+
+    if PARTICIONAMENTO['ativo'] and DATABASE['engine'] == 'sqlite':
+        arquivos = [particao['path'] for particao in listar_particoes()]
+    elif DATABASE['engine'] == 'duckdb':
+        parquet_dir = DATABASE['parquet_dir']
+        arquivos = [DATABASE['duckdb_path']]
+        if not os.path.exists(DATABASE['duckdb_path']) and os.path.isdir(parquet_dir):
+            arquivos = [os.path.join(parquet_dir, arquivo) for arquivo in sorted(os.listdir(parquet_dir))]
+    else:
+        arquivos = [DATABASE['path']]
+    # O WAL recebe as escritas antes do checkpoint
+    return arquivos + [f'{arquivo}-wal' for arquivo in arquivos]
+
+def versao_dados():
+    """
+    Versão dos dados: muda quando algum arquivo muda de tamanho ou de data
+    Um -wal vazio não conta: a primeira leitura depois do checkpoint do ETL o cria sem mudar os dados
+    """
+
+    partes = []
+    for arquivo in arquivos_dados():
+        try:
+            estado = os.stat(arquivo)
+        except FileNotFoundError:
+            continue
+        if arquivo.endswith('-wal') and not estado.st_size:
+            continue
+        partes.append(f'{arquivo}:{estado.st_size}:{estado.st_mtime_ns}')
+    return hashlib.sha1('|'.join(partes).encode()).hexdigest()[:16]
@@ -0,0 +1,162 @@
+"""
+Roteamento das consultas entre as partições por competência
+Cada partição é um banco SQLite completo (mesma estrutura do banco único) com as internações
+de um mês ou ano, opcionalmente de uma UF. As consultas anexam só as partições do período pedido
+"""
+
+import os
+import re
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+from config.settings import PARTICIONAMENTO
+from config.consultas import consulta
+from config.deduplicacao import hash_chaves
+from config.resumos import ler_resumos, mesclar_resumos, atualizar_resumos_banco
+
+# Código IBGE de cada UF, usado para manter os ids únicos entre partições
+UFS_IBGE = {
+    'RO': 11, 'AC': 12, 'AM': 13, 'RR': 14, 'PA': 15, 'AP': 16, 'TO': 17,
+    'MA': 21, 'PI': 22, 'CE': 23, 'RN': 24, 'PB': 25, 'PE': 26, 'AL': 27, 'SE': 28, 'BA': 29,
+    'MG': 31, 'ES': 32, 'RJ': 33, 'SP': 35,
+    'PR': 41, 'SC': 42, 'RS': 43,
+    'MS': 50, 'MT': 51, 'GO': 52, 'DF': 53,
+}
+
+# Linhas reservadas por partição: os ids de cada uma começam em chave_particao * LINHAS_POR_PARTICAO
+LINHAS_POR_PARTICAO = 10 ** 8
+
+PADRAO_ARQUIVO = re.compile(r'^internacoes_(?:([A-Z]{2})_)?(\d{4})(\d{2})?\.db$')
+
+def caminho_particao(ano, mes=None, uf=None):
+    """Arquivo da partição da competência, conforme a granularidade configurada"""
+
+    partes = ['internacoes']
+    if PARTICIONAMENTO['por_uf']:
+        partes.append(uf or PARTICIONAMENTO['uf_padrao'])
+    if PARTICIONAMENTO['granularidade'] == 'mes':
+        partes.append(f'{int(ano)}{int(mes):02d}')
+    else:
+        partes.append(f'{int(ano)}')
+    return os.path.join(PARTICIONAMENTO['dir'], '_'.join(partes) + '.db')
+
+def chave_particao(ano, mes=None, uf=None):
+    """Número único da partição (UF, ano e mês), base dos ids das suas linhas"""
+    codigo_uf = UFS_IBGE.get(uf, 0) if PARTICIONAMENTO['por_uf'] else 0
+    mes = int(mes) if PARTICIONAMENTO['granularidade'] == 'mes' else 0
+    return codigo_uf * 10 ** 6 + int(ano) * 100 + mes
+
+def listar_particoes():
+    """Partições existentes no diretório, ordenadas por UF e competência"""
+
+    if not os.path.isdir(PARTICIONAMENTO['dir']):
+        return []
+
+    particoes = []
+    for arquivo in os.listdir(PARTICIONAMENTO['dir']):
+        encontrado = PADRAO_ARQUIVO.match(arquivo)
+        if encontrado:
+            uf, ano, mes = encontrado.groups()
+            particoes.append({
+                'uf': uf,
+                'ano': int(ano),
+                'mes': int(mes) if mes else None,
+                'path': os.path.join(PARTICIONAMENTO['dir'], arquivo),
+            })
+
+    return sorted(particoes, key=lambda p: (p['uf'] or '', p['ano'], p['mes'] or 0))
+
+def podar_particoes(competencias=None, ufs=None):
+    """
+    Partições que podem conter as competências (ano, mês) e UFs pedidas
+    Partições anuais entram quando o ano coincide; None em um filtro significa todas
+    """
+
+    selecionadas = []
+    for particao in listar_particoes():
+        if ufs and particao['uf'] and particao['uf'] not in ufs:
+            continue
+        if competencias and not any(
+            ano == particao['ano'] and (particao['mes'] is None or mes == particao['mes'])
+            for ano, mes in competencias
+        ):
+            continue
+        selecionadas.append(particao)
+    return selecionadas
+
+def remover_aihs(path, hashes):
+    """
+    Remove da partição as internações cujas chaves (N_AIH + SEQUENCIA) estão em 'hashes', com os
+    valores financeiros, e recalcula os resumos; retorna o número de internações removidas
+    """
+
+    conn = sqlite3.connect(path)
+    try:
+        chaves = pd.read_sql_query(consulta('etl_chaves_aih'), conn)
+        chaves = chaves.rename(columns={'numero_aih': 'N_AIH', 'sequencia_registro': 'SEQUENCIA'})
+        ids = [(int(i),) for i in chaves['id'][np.isin(hash_chaves(chaves), hashes)]]
+        if ids:
+            conn.executemany('DELETE FROM valores_financeiros WHERE internacao_id = ?', ids)
+            conn.executemany('DELETE FROM internacoes WHERE id = ?', ids)
+            conn.commit()
+    finally:
+        conn.close()
+
+    if ids:
+        atualizar_resumos_banco(path)
+    return len(ids)
+
+def executar_consulta_particionada(nome, competencias=None, ufs=None):
+    """
+    Executa uma consulta registrada em cada partição do período e concatena os resultados
+    As partições são anexadas uma de cada vez, somente leitura; indicado para consultas linha
+    a linha (agregações entre partições são feitas depois, no pandas)
+    """
+
+    particoes = podar_particoes(competencias, ufs)
+    if not particoes:
+        raise FileNotFoundError(
+            f"Nenhuma partição encontrada em {PARTICIONAMENTO['dir']} para o período pedido; "
+            "execute scripts/carregar_particoes.py"
+        )
+
+    conn = sqlite3.connect(':memory:', uri=True, check_same_thread=False)
+    sql = consulta(nome)
+
+    resultados = []
+    try:
+        for particao in particoes:
+            conn.execute('ATTACH DATABASE ? AS particao', (f"file:{particao['path']}?mode=ro",))
+            try:
+                resultados.append(pd.read_sql_query(sql, conn))
+            finally:
+                conn.execute('DETACH DATABASE particao')
+    finally:
+        conn.close()
+
+    return pd.concat(resultados, ignore_index=True)
+
+def resumos_particionados(competencias=None, ufs=None):
+    """
+    Resumos aproximados do período, mesclados a partir da tabela 'resumos' de cada partição
+    Lê só alguns KB por partição, sem tocar nas internações
+    """
+
+    particoes = podar_particoes(competencias, ufs)
+    if not particoes:
+        raise FileNotFoundError(
+            f"Nenhuma partição encontrada em {PARTICIONAMENTO['dir']} para o período pedido; "
+            "execute scripts/carregar_particoes.py"
+        )
+
+    lista = []
+    for particao in particoes:
+        conn = sqlite3.connect(f"file:{particao['path']}?mode=ro", uri=True)
+        try:
+            lista.append(ler_resumos(conn))
+        finally:
+            conn.close()
+
+    return mesclar_resumos(lista)
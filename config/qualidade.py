@@ -0,0 +1,173 @@
+"""
+Regras de qualidade dos dados do SIH
+Cada regra declara as colunas do RD que usa e devolve a máscara booleana das linhas que a violam.
+O CSV consolidado é lido em lotes só com as colunas das regras; em cada lote as colunas são
+convertidas uma vez e todas as regras viram operações vetorizadas sobre elas, então o custo
+cresce linearmente com o número de linhas
+"""
+
+import json
+from datetime import datetime
+
+import pandas as pd
+
+TAMANHO_LOTE = 500_000
+
+# AIHs guardadas por regra para conferência
+AMOSTRA_AIH = 20
+
+# Diferença aceita entre VAL_TOT e a soma das parcelas (arredondamento dos centavos)
+TOLERANCIA_VALOR = 0.05
+
+# Diferença aceita entre IDADE e a idade calculada pelo nascimento (em anos)
+TOLERANCIA_IDADE = 1
+
+# COD_IDADE do SIH em que IDADE está em anos
+IDADE_EM_ANOS = '4'
+
+# Categoria (letra + 2 dígitos) e subcategoria opcional, sem ponto, como no RD
+PADRAO_CID = r'[A-Z][0-9]{2}[0-9A-Z]?'
+
+COLUNAS_DATA = ['DT_INTER', 'DT_SAIDA', 'NASC']
+COLUNAS_NUMERICAS = ['DIAS_PERM', 'IDADE', 'VAL_TOT', 'VAL_SH', 'VAL_SP', 'VAL_UTI']
+
+def datas(valores):
+    """Datas AAAAMMDD (ou AAAA-MM-DD) em datetime64; inválidas viram NaT"""
+    return pd.to_datetime(valores.str.replace('-', '', regex=False).str[:8], format='%Y%m%d', errors='coerce')
+
+def idade_calculada(nascimento, referencia):
+    """Anos completos entre o nascimento e a data de referência"""
+    aniversario_depois = (referencia.dt.month * 100 + referencia.dt.day) < (nascimento.dt.month * 100 + nascimento.dt.day)
+    return referencia.dt.year - nascimento.dt.year - aniversario_depois.astype(int)
+
+def permanencia_inconsistente(c):
+    dias = (c['DT_SAIDA'] - c['DT_INTER']).dt.days
+    return c['DIAS_PERM'].notna() & dias.notna() & (c['DIAS_PERM'] != dias)
+
+def valor_total_divergente(c):
+    # Há remessas com a UTI lançada à parte de VAL_SH; VAL_TOT pode incluí-la ou não
+    parcelas = c['VAL_SH'] + c['VAL_SP']
+    diferenca = c['VAL_TOT'] - parcelas
+    com_uti = (diferenca - c['VAL_UTI'].fillna(0)).abs() > TOLERANCIA_VALOR
+    return (diferenca.abs() > TOLERANCIA_VALOR) & com_uti
+
+def idade_inconsistente(c):
+    em_anos = c['COD_IDADE'].str.strip().str.lstrip('0') == IDADE_EM_ANOS
+    return em_anos & ((c['IDADE'] - idade_calculada(c['NASC'], c['DT_INTER'])).abs() > TOLERANCIA_IDADE)
+
+# Regras avaliadas em cada lote: colunas do RD que usam e máscara das linhas que as violam
+# (comparações com valores ausentes dão False, então só a regra de ausência acusa campos vazios)
+REGRAS = {
+    'data_internacao_invalida': {
+        'descricao': 'DT_INTER ausente ou inválida',
+        'colunas': ['DT_INTER'],
+        'violacao': lambda c: c['DT_INTER'].isna(),
+    },
+    'saida_antes_internacao': {
+        'descricao': 'DT_SAIDA anterior a DT_INTER',
+        'colunas': ['DT_INTER', 'DT_SAIDA'],
+        'violacao': lambda c: c['DT_SAIDA'] < c['DT_INTER'],
+    },
+    'permanencia_inconsistente': {
+        'descricao': 'DIAS_PERM diferente de DT_SAIDA - DT_INTER',
+        'colunas': ['DT_INTER', 'DT_SAIDA', 'DIAS_PERM'],
+        'violacao': permanencia_inconsistente,
+    },
+    'valor_total_divergente': {
+        'descricao': f'VAL_TOT diferente de VAL_SH + VAL_SP (+ VAL_UTI) (tolerância R$ {TOLERANCIA_VALOR:.2f})',
+        'colunas': ['VAL_TOT', 'VAL_SH', 'VAL_SP', 'VAL_UTI'],
+        'violacao': valor_total_divergente,
+    },
+    'idade_inconsistente': {
+        'descricao': f'IDADE (em anos) difere da idade calculada por NASC em mais de {TOLERANCIA_IDADE} ano',
+        'colunas': ['IDADE', 'COD_IDADE', 'NASC', 'DT_INTER'],
+        'violacao': idade_inconsistente,
+    },
+    'cid_invalido': {
+        'descricao': 'DIAG_PRINC ausente ou fora do formato CID-10 (ex.: J189)',
+        'colunas': ['DIAG_PRINC'],
+        'violacao': lambda c: ~c['DIAG_PRINC'].str.strip().str.upper().str.fullmatch(PADRAO_CID).fillna(False).astype(bool),
+    },
+}
+
+COLUNAS_REGRAS = {'N_AIH'} | {coluna for regra in REGRAS.values() for coluna in regra['colunas']}
+
+ESTRUTURA_QUALIDADE = '''
+    CREATE TABLE IF NOT EXISTS qualidade_dados (
+        regra TEXT PRIMARY KEY,
+        descricao TEXT,
+        arquivo TEXT,
+        registros INTEGER,
+        violacoes INTEGER,
+        percentual REAL,
+        amostra_aih TEXT,
+        executado_em TEXT
+    )
+'''
+
+def preparar_colunas(lote):
+    """Converte uma única vez as colunas do lote usadas pelas regras"""
+
+    colunas = {}
+    for coluna in lote.columns:
+        if coluna in COLUNAS_DATA:
+            colunas[coluna] = datas(lote[coluna])
+        elif coluna in COLUNAS_NUMERICAS:
+            colunas[coluna] = pd.to_numeric(lote[coluna], errors='coerce')
+        else:
+            colunas[coluna] = lote[coluna]
+    return colunas
+
+def regras_aplicaveis(colunas_arquivo, regras=REGRAS):
+    """Regras cujas colunas existem no arquivo"""
+    return {nome: regra for nome, regra in regras.items() if set(regra['colunas']) <= set(colunas_arquivo)}
+
+def avaliar_regras(lote, regras=REGRAS):
+    """Máscara de violação (array booleano) de cada regra no lote"""
+    colunas = preparar_colunas(lote)
+    return {nome: regra['violacao'](colunas).to_numpy(dtype=bool) for nome, regra in regras.items()}
+
+def validar_arquivo(csv_path, tamanho_lote=TAMANHO_LOTE, amostra=AMOSTRA_AIH):
+    """
+    Avalia as regras no CSV em lotes; retorna o total de registros e, por regra aplicável,
+    o número de violações e as primeiras AIHs que a violaram
+    """
+
+    cabecalho = pd.read_csv(csv_path, nrows=0).columns
+    regras = regras_aplicaveis(cabecalho)
+    resultado = {nome: {'violacoes': 0, 'amostra': []} for nome in regras}
+    registros = 0
+
+    lotes = pd.read_csv(
+        csv_path, dtype=str, usecols=lambda coluna: coluna in COLUNAS_REGRAS,
+        chunksize=tamanho_lote, low_memory=False
+    )
+    for lote in lotes:
+        aih = lote['N_AIH'].to_numpy() if 'N_AIH' in lote.columns else lote.index.to_numpy()
+        for nome, mascara in avaliar_regras(lote, regras).items():
+            resultado[nome]['violacoes'] += int(mascara.sum())
+            faltam = amostra - len(resultado[nome]['amostra'])
+            if faltam > 0:
+                resultado[nome]['amostra'].extend(str(valor) for valor in aih[mascara][:faltam])
+        registros += len(lote)
+
+    return registros, resultado
+
+def gravar_qualidade(conn, arquivo, registros, resultado):
+    """Substitui o resultado da validação na tabela qualidade_dados"""
+
+    executado_em = datetime.now().isoformat(timespec='seconds')
+    conn.execute(ESTRUTURA_QUALIDADE)
+    conn.execute('DELETE FROM qualidade_dados')
+    conn.executemany(
+        'INSERT INTO qualidade_dados VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+        [
+            (
+                nome, REGRAS[nome]['descricao'], arquivo, registros, r['violacoes'],
+                r['violacoes'] / registros * 100 if registros else 0.0,
+                json.dumps(r['amostra']), executado_em
+            )
+            for nome, r in resultado.items()
+        ]
+    )
+    conn.commit()
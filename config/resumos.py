@@ -0,0 +1,269 @@
+"""
+Resumos aproximados (sketches) das internações por partição
+Cada partição guarda, na tabela 'resumos', um Space-Saving dos diagnósticos e municípios mais
+frequentes e um KLL dos quantis de valor total, permanência e idade. Os resumos são mesclados
+entre partições, então o dashboard monta top-10 e histogramas de qualquer período com alguns KB,
+sem ler as internações
+"""
+
+import json
+import math
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+from config.consultas import consulta
+
+# Contadores do Space-Saving: o erro de cada contagem é no máximo total / capacidade
+CAPACIDADE_TOP = 500
+
+# Parâmetro k do KLL: erro de rank de ~1,7 / k com alta probabilidade (~1% para k=200)
+K_QUANTIS = 200
+
+TAMANHO_LOTE = 100_000
+
+# Resumo de cada coluna da consulta 'etl_resumos_particao'
+RESUMOS = {
+    'diagnostico_principal': 'top',
+    'codigo_municipio_residencia': 'top',
+    'valor_total': 'quantis',
+    'dias_permanencia': 'quantis',
+    'idade_anos': 'quantis',
+}
+
+class TopK:
+    """
+    Space-Saving mesclável: contagens dos itens mais frequentes, superestimadas em no máximo 'erro'
+    Cada lote é contado exatamente e mesclado, então a ordem dos lotes e partições não importa
+    """
+
+    def __init__(self, capacidade=CAPACIDADE_TOP):
+        self.capacidade = capacidade
+        self.total = 0
+        self.contagens = {}
+        self.erros = {}
+
+    def minimo(self):
+        """Maior contagem possível de um item fora dos contadores"""
+        return min(self.contagens.values()) if len(self.contagens) >= self.capacidade else 0
+
+    def atualizar(self, valores):
+        """Conta os valores do lote e mescla no resumo"""
+
+        contagem = pd.Series(valores).dropna().value_counts()
+        lote = TopK(self.capacidade)
+        lote.total = int(contagem.sum())
+        lote.contagens = {item: int(n) for item, n in contagem.head(self.capacidade).items()}
+        lote.erros = dict.fromkeys(lote.contagens, 0)
+        self.mesclar(lote)
+
+    def mesclar(self, outro):
+        """Soma os contadores; um item ausente de um resumo cheio recebe o mínimo dele"""
+
+        minimo, minimo_outro = self.minimo(), outro.minimo()
+        contagens, erros = {}, {}
+        for item in self.contagens.keys() | outro.contagens.keys():
+            contagens[item] = self.contagens.get(item, minimo) + outro.contagens.get(item, minimo_outro)
+            erros[item] = self.erros.get(item, minimo) + outro.erros.get(item, minimo_outro)
+
+        mantidos = sorted(contagens, key=contagens.get, reverse=True)[:self.capacidade]
+        self.contagens = {item: contagens[item] for item in mantidos}
+        self.erros = {item: erros[item] for item in mantidos}
+        self.total += outro.total
+
+    def top(self, n=10):
+        """Os n itens mais frequentes como Series (índice = item, valor = contagem estimada)"""
+        mantidos = sorted(self.contagens, key=self.contagens.get, reverse=True)[:n]
+        return pd.Series([self.contagens[item] for item in mantidos], index=mantidos, dtype='int64')
+
+    def para_dict(self):
+        return {
+            'tipo': 'top', 'capacidade': self.capacidade, 'total': self.total,
+            'itens': [[item, self.contagens[item], self.erros[item]] for item in self.contagens],
+        }
+
+    @classmethod
+    def de_dict(cls, dados):
+        resumo = cls(dados['capacidade'])
+        resumo.total = dados['total']
+        resumo.contagens = {item: n for item, n, _ in dados['itens']}
+        resumo.erros = {item: erro for item, _, erro in dados['itens']}
+        return resumo
+
+class Quantis:
+    """
+    KLL mesclável: níveis de amostras onde cada item do nível h representa 2^h valores
+    Mínimo, máximo, total e soma são exatos; quantis e histogramas têm erro de rank limitado
+    """
+
+    def __init__(self, k=K_QUANTIS, semente=42):
+        self.k = k
+        self.niveis = [np.empty(0)]
+        self.total = 0
+        self.soma = 0.0
+        self.minimo = math.inf
+        self.maximo = -math.inf
+        self.rng = np.random.default_rng(semente)
+
+    def capacidade(self, nivel):
+        """Níveis mais altos guardam mais itens (fator 2/3 a cada nível abaixo do topo)"""
+        return max(2, math.ceil(self.k * (2 / 3) ** (len(self.niveis) - nivel - 1)))
+
+    def compactar(self):
+        """
+        Ordena cada nível cheio e promove metade dos itens (pares ou ímpares, ao acaso)
+        Repete até nenhum nível estar cheio, já que um nível novo reduz a capacidade dos de baixo
+        """
+
+        cheio = True
+        while cheio:
+            cheio = False
+            for nivel in range(len(self.niveis)):
+                itens = self.niveis[nivel]
+                if len(itens) < self.capacidade(nivel):
+                    continue
+                cheio = True
+                itens = np.sort(itens)
+                sobra = itens[-1:] if len(itens) % 2 else itens[:0]
+                pares = itens[:len(itens) - len(sobra)]
+                promovidos = pares[self.rng.integers(2)::2]
+                if nivel + 1 == len(self.niveis):
+                    self.niveis.append(np.empty(0))
+                self.niveis[nivel] = sobra
+                self.niveis[nivel + 1] = np.concatenate([self.niveis[nivel + 1], promovidos])
+
+    def atualizar(self, valores):
+        """Acrescenta os valores do lote ao nível 0 e compacta"""
+
+        valores = pd.to_numeric(pd.Series(valores), errors='coerce').dropna().to_numpy(dtype=float)
+        if not len(valores):
+            return
+        self.total += len(valores)
+        self.soma += float(valores.sum())
+        self.minimo = min(self.minimo, float(valores.min()))
+        self.maximo = max(self.maximo, float(valores.max()))
+        self.niveis[0] = np.concatenate([self.niveis[0], valores])
+        self.compactar()
+
+    def mesclar(self, outro):
+        """Junta nível a nível e compacta"""
+
+        while len(self.niveis) < len(outro.niveis):
+            self.niveis.append(np.empty(0))
+        for nivel, itens in enumerate(outro.niveis):
+            self.niveis[nivel] = np.concatenate([self.niveis[nivel], itens])
+        self.total += outro.total
+        self.soma += outro.soma
+        self.minimo = min(self.minimo, outro.minimo)
+        self.maximo = max(self.maximo, outro.maximo)
+        self.compactar()
+
+    def amostra(self):
+        """Itens ordenados e o peso de cada um"""
+        itens = np.concatenate(self.niveis)
+        pesos = np.concatenate([np.full(len(n), 2 ** h, dtype=float) for h, n in enumerate(self.niveis)])
+        ordem = np.argsort(itens, kind='stable')
+        return itens[ordem], pesos[ordem]
+
+    def quantil(self, q):
+        """Valor aproximado do quantil q (0 a 1)"""
+
+        if not self.total:
+            return math.nan
+        if q <= 0:
+            return self.minimo
+        if q >= 1:
+            return self.maximo
+        itens, pesos = self.amostra()
+        acumulado = np.cumsum(pesos)
+        return float(itens[np.searchsorted(acumulado, q * acumulado[-1])])
+
+    def media(self):
+        return self.soma / self.total if self.total else math.nan
+
+    def histograma(self, bins=30):
+        """Contagens estimadas por faixa, escaladas para o total exato; retorna (contagens, limites)"""
+
+        itens, pesos = self.amostra()
+        if not len(itens):
+            return np.zeros(bins), np.linspace(0, 1, bins + 1)
+        contagens, limites = np.histogram(itens, bins=bins, range=(self.minimo, self.maximo), weights=pesos)
+        return contagens * (self.total / pesos.sum()), limites
+
+    def para_dict(self):
+        return {
+            'tipo': 'quantis', 'k': self.k, 'total': self.total, 'soma': self.soma,
+            'minimo': self.minimo if self.total else None, 'maximo': self.maximo if self.total else None,
+            'niveis': [n.tolist() for n in self.niveis],
+        }
+
+    @classmethod
+    def de_dict(cls, dados):
+        resumo = cls(dados['k'])
+        resumo.total = dados['total']
+        resumo.soma = dados['soma']
+        resumo.minimo = math.inf if dados['minimo'] is None else dados['minimo']
+        resumo.maximo = -math.inf if dados['maximo'] is None else dados['maximo']
+        resumo.niveis = [np.array(n, dtype=float) for n in dados['niveis']]
+        return resumo
+
+TIPOS_RESUMO = {'top': TopK, 'quantis': Quantis}
+
+def novos_resumos():
+    """Um resumo vazio para cada coluna de RESUMOS"""
+    return {coluna: TIPOS_RESUMO[tipo]() for coluna, tipo in RESUMOS.items()}
+
+def calcular_resumos(conn, tamanho_lote=TAMANHO_LOTE):
+    """Percorre as internações do banco em lotes, atualizando os resumos de cada coluna"""
+
+    resumos = novos_resumos()
+    for lote in pd.read_sql_query(consulta('etl_resumos_particao'), conn, chunksize=tamanho_lote):
+        for coluna, resumo in resumos.items():
+            resumo.atualizar(lote[coluna])
+    return resumos
+
+def gravar_resumos(conn, resumos):
+    """Substitui a tabela 'resumos' do banco pelos resumos informados"""
+
+    conn.execute('CREATE TABLE IF NOT EXISTS resumos (coluna TEXT PRIMARY KEY, dados TEXT)')
+    conn.execute('DELETE FROM resumos')
+    conn.executemany(
+        'INSERT INTO resumos VALUES (?, ?)',
+        [(coluna, json.dumps(resumo.para_dict())) for coluna, resumo in resumos.items()]
+    )
+    conn.commit()
+
+def ler_resumos(conn):
+    """Resumos gravados no banco; vazio se ele não tiver a tabela"""
+
+    existe = conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'resumos'").fetchone()
+    if not existe:
+        return {}
+
+    resumos = {}
+    for coluna, dados in conn.execute('SELECT coluna, dados FROM resumos'):
+        dados = json.loads(dados)
+        resumos[coluna] = TIPOS_RESUMO[dados['tipo']].de_dict(dados)
+    return resumos
+
+def mesclar_resumos(lista):
+    """Mescla os resumos de várias partições coluna a coluna"""
+
+    mesclados = novos_resumos()
+    for resumos in lista:
+        for coluna, resumo in resumos.items():
+            if coluna in mesclados:
+                mesclados[coluna].mesclar(resumo)
+    return mesclados
+
+def atualizar_resumos_banco(db_path):
+    """Recalcula e grava os resumos de um banco (partição ou banco único)"""
+
+    conn = sqlite3.connect(db_path)
+    try:
+        resumos = calcular_resumos(conn)
+        gravar_resumos(conn, resumos)
+    finally:
+        conn.close()
+    return resumos
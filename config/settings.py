@@ -15,6 +15,7 @@ DIRS = {
     'docs': os.path.join(BASE_DIR, 'docs'),
     'scripts': os.path.join(BASE_DIR, 'scripts'),
     'dashboard': os.path.join(BASE_DIR, 'dashboard'),
+    'relatorios': os.path.join(BASE_DIR, 'data', 'relatorios'),
 }
 
 # Arquivos principais
@@ -22,6 +23,11 @@ FILES = {
     'database': os.path.join(DIRS['database'], 'internacoes_datasus.db'),
     'csv_completo': os.path.join(DIRS['data_processed'], 'dados_completos_internacoes_pr_2025.csv'),
     'cid10_reference': os.path.join(DIRS['docs'], 'cid10_ultimaversaodisponivel_2012.txt'),
+    'referencias': os.path.join(DIRS['database'], 'referencias.db'),
+    # Chaves (N_AIH + SEQUENCIA) já carregadas, preservadas entre recargas do banco
+    'aihs_vistas': os.path.join(DIRS['database'], 'aihs_vistas.db'),
+    # Estimativas populacionais por município, sexo e faixa etária (CSV exportado do TabNet)
+    'populacao': os.path.join(DIRS['data_raw'], 'populacao_municipios.csv'),
     'requirements': os.path.join(BASE_DIR, 'requirements.txt'),
 }
 
@@ -30,6 +36,22 @@ DATABASE = {
     'name': 'internacoes_datasus.db',
     'path': FILES['database'],
     'version': '2.0',
+    # Motor das consultas do dashboard: 'sqlite' (padrão) ou 'duckdb' (pip install duckdb)
+    'engine': 'sqlite',
+    # Cópia analítica gerada por scripts/exportar_analitico.py; sem o .duckdb, lê o diretório Parquet
+    'duckdb_path': os.path.join(DIRS['database'], 'internacoes_datasus.duckdb'),
+    'parquet_dir': os.path.join(DIRS['database'], 'parquet'),
+    'duckdb_threads': None,  # None = todos os núcleos
+}
+
+# Particionamento das tabelas por competência: um banco SQLite por mês (ou ano), opcionalmente
+# por UF, anexado sob demanda pelas consultas (config/particoes.py)
+PARTICIONAMENTO = {
+    'ativo': False,
+    'granularidade': 'mes',  # 'mes' ou 'ano'
+    'por_uf': False,
+    'uf_padrao': 'PR',  # UF dos registros cujo arquivo de origem não indica a UF
+    'dir': os.path.join(DIRS['database'], 'particoes'),
 }
 
 # Configurações do dashboard
@@ -44,6 +66,19 @@ DASHBOARD = {
     }
 }
 
+# Gráficos do dashboard: histogramas agregados no servidor e gráficos de pontos por amostra
+GRAFICOS = {
+    'pontos': 20_000,  # orçamento de pontos da amostra estratificada por competência
+    'confianca': 0.95,  # nível dos intervalos de confiança das médias estimadas pela amostra
+}
+
+# Serviço HTTP local (somente leitura) com as agregações do dashboard em JSON ou Arrow
+SERVICO = {
+    'host': '127.0.0.1',
+    'porta': 8502,
+    'workers': 8,  # threads que atendem as requisições; cada uma com sua conexão do pool
+}
+
 # Configurações de dados
 DATA = {
     'periodo_analise': '2025 (Janeiro-Março)',
@@ -74,6 +109,23 @@ LOGGING = {
     'format': '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 }
 
+# Instrumentação do dashboard (tempo, linhas e memória por seção), desligada por padrão;
+# DASHBOARD_INSTRUMENTACAO=1 liga os logs estruturados sem editar este arquivo
+INSTRUMENTACAO = {
+    'ativa': os.environ.get('DASHBOARD_INSTRUMENTACAO') == '1',
+    'memoria': False,  # delta de memória via tracemalloc (overhead em todas as alocações)
+    'painel_debug': False,  # painel recolhível com os tempos da última execução
+    'cprofile': False,  # grava um .prof por rerun em cprofile_dir
+    'cprofile_dir': os.path.join(BASE_DIR, 'logs', 'profiles'),
+}
+
+# Aquecimento dos caches do dashboard em segundo plano
+AQUECIMENTO = {
+    'ativo': True,
+    'vizinhas': 1,  # páginas pré-carregadas de cada lado da página atual nas pills
+    'intervalo': 30,  # segundos entre as verificações de nova carga do ETL com a fila vazia
+}
+
 def get_database_path():
     """Retorna o caminho para o banco de dados"""
     return FILES['database']
@@ -0,0 +1,196 @@
+"""
+Taxas de internação e de custo por 10 mil habitantes
+Carrega as estimativas populacionais por município, sexo e faixa etária em um array indexado
+pelo código IBGE e calcula, de forma vetorizada, taxas brutas e padronizadas por idade e sexo
+(método direto, com a população do arquivo como padrão) para cada município x CID x período.
+As taxas ficam gravadas por período na tabela taxas_municipios, prontas para o dashboard
+"""
+
+import os
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+from config.settings import DATABASE, FILES
+from config.consultas import CONSULTAS
+
+# Faixas etárias quinquenais (0-4, 5-9, ..., 80+), como nas estimativas do DATASUS/IBGE
+TAMANHO_FAIXA = 5
+FAIXAS_ETARIAS = 17
+
+# Código do sexo no SIH (1 = masculino, 3 = feminino) → posição no array de população
+SEXOS = {1: 0, 3: 1}
+
+POR_HABITANTES = 10_000
+
+# Período que soma todas as competências e CID que soma todos os diagnósticos
+TODOS = 'todos'
+
+ESTRUTURA_TAXAS = '''
+    CREATE TABLE taxas_municipios (
+        periodo TEXT,
+        codigo_municipio TEXT,
+        cid TEXT,
+        internacoes INTEGER,
+        valor_total REAL,
+        populacao INTEGER,
+        taxa_bruta REAL,
+        taxa_padronizada REAL,
+        custo_padronizado REAL,
+        PRIMARY KEY (periodo, cid, codigo_municipio)
+    ) WITHOUT ROWID
+'''
+
+def faixa_etaria(idades):
+    """Índice da faixa quinquenal de cada idade (80 anos ou mais na última)"""
+    return np.clip(np.asarray(idades, dtype=float) // TAMANHO_FAIXA, 0, FAIXAS_ETARIAS - 1).astype(np.int64)
+
+def indice_sexo(codigos):
+    """Posição de cada sexo no array de população; -1 se ignorado"""
+    codigos = pd.Series(codigos).astype(str).str.strip().str[:1].str.upper()
+    return codigos.map({'1': 0, 'M': 0, '3': 1, 'F': 1}).fillna(-1).to_numpy(dtype=np.int64)
+
+def linhas_populacao(indice, municipios):
+    """Linha de cada município no array de população; -1 sem estimativa"""
+    codigos = pd.to_numeric(pd.Series(municipios), errors='coerce').fillna(-1).astype(np.int64).to_numpy()
+    validos = (codigos >= 0) & (codigos < len(indice))
+    return np.where(validos, indice[np.where(validos, codigos, 0)], -1)
+
+def ler_populacao(path=None):
+    """
+    Lê as estimativas (CSV com município, sexo, faixa etária e população, como o TabNet exporta)
+    Retorna o índice código IBGE → linha (array de 10^6 posições, -1 sem população), os códigos
+    e o array populacao[linha, sexo, faixa]
+    """
+
+    path = path or FILES['populacao']
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Estimativas populacionais não encontradas em {path}")
+
+    df = pd.read_csv(path, sep=None, engine='python', dtype=str)
+    df.columns = [coluna.strip().lower() for coluna in df.columns]
+
+    # '410690 Curitiba' ou '4106902' → 410690; '20 a 24 anos' → faixa 4
+    codigos = pd.to_numeric(df['municipio'].str.extract(r'(\d{6})', expand=False), errors='coerce')
+    inicio_faixa = pd.to_numeric(df['faixa_etaria'].str.extract(r'(\d+)', expand=False), errors='coerce')
+    populacao = pd.to_numeric(df['populacao'].str.replace('.', '', regex=False), errors='coerce')
+    sexos = indice_sexo(df['sexo'])
+
+    validos = codigos.notna().to_numpy() & inicio_faixa.notna().to_numpy() & populacao.notna().to_numpy() & (sexos >= 0)
+    codigos = codigos[validos].astype(np.int64).to_numpy()
+
+    unicos = np.unique(codigos)
+    indice = np.full(10 ** 6, -1, dtype=np.int32)
+    indice[unicos] = np.arange(len(unicos), dtype=np.int32)
+
+    array = np.zeros((len(unicos), len(SEXOS), FAIXAS_ETARIAS))
+    np.add.at(
+        array,
+        (indice[codigos], sexos[validos], faixa_etaria(inicio_faixa[validos])),
+        populacao[validos].to_numpy(dtype=float)
+    )
+    return indice, unicos, array
+
+def calcular_taxas(casos, indice, populacao):
+    """
+    Taxas de cada período x município x CID a partir dos casos agrupados por estrato
+    (colunas municipio, cid, periodo, codigo_sexo, idade_anos, internacoes, valor_total)
+    Cada estrato contribui com casos / população do estrato x peso do estrato no padrão
+    """
+
+    padrao = populacao.sum(axis=0)
+    pesos = padrao / padrao.sum()
+    populacao_municipio = populacao.sum(axis=(1, 2))
+
+    linhas = linhas_populacao(indice, casos['municipio'])
+    sexos = indice_sexo(casos['codigo_sexo'])
+    faixas = faixa_etaria(casos['idade_anos'])
+
+    validos = (linhas >= 0) & (sexos >= 0)
+    casos = casos[validos]
+    linhas, sexos, faixas = linhas[validos], sexos[validos], faixas[validos]
+
+    populacao_estrato = populacao[linhas, sexos, faixas]
+    fator = np.divide(pesos[sexos, faixas], populacao_estrato, out=np.zeros(len(linhas)), where=populacao_estrato > 0)
+
+    estratos = pd.DataFrame({
+        'periodo': casos['periodo'].to_numpy(),
+        'codigo_municipio': casos['municipio'].astype(str).to_numpy(),
+        'cid': casos['cid'].to_numpy(),
+        'internacoes': casos['internacoes'].to_numpy(),
+        'valor_total': casos['valor_total'].to_numpy(dtype=float),
+        'populacao': populacao_municipio[linhas],
+        'taxa_padronizada': casos['internacoes'].to_numpy() * fator,
+        'custo_padronizado': casos['valor_total'].to_numpy(dtype=float) * fator,
+    })
+
+    # Cada célula aparece com o CID e com o total ('todos'), por competência e no período inteiro
+    celulas = [estratos, estratos.assign(cid=TODOS)]
+    celulas += [celula.assign(periodo=TODOS) for celula in celulas]
+    taxas = pd.concat(celulas, ignore_index=True).groupby(
+        ['periodo', 'codigo_municipio', 'cid'], as_index=False
+    ).agg(
+        internacoes=('internacoes', 'sum'),
+        valor_total=('valor_total', 'sum'),
+        populacao=('populacao', 'first'),
+        taxa_padronizada=('taxa_padronizada', 'sum'),
+        custo_padronizado=('custo_padronizado', 'sum'),
+    )
+
+    taxas['taxa_bruta'] = taxas['internacoes'] / taxas['populacao'] * POR_HABITANTES
+    taxas['taxa_padronizada'] *= POR_HABITANTES
+    taxas['custo_padronizado'] *= POR_HABITANTES
+    return taxas
+
+def casos_por_estrato(conn):
+    """Internações e valor por município, CID (3 caracteres), competência, sexo e idade"""
+    casos = pd.read_sql_query(CONSULTAS['etl_taxas_casos'], conn)
+    casos['periodo'] = casos['ano_competencia'].astype(str) + '-' + casos['mes_competencia'].astype(int).map('{:02d}'.format)
+    return casos
+
+def gravar_taxas(conn, taxas):
+    """Substitui a tabela de taxas do banco"""
+
+    colunas = [
+        'periodo', 'codigo_municipio', 'cid', 'internacoes', 'valor_total', 'populacao',
+        'taxa_bruta', 'taxa_padronizada', 'custo_padronizado'
+    ]
+    conn.execute('DROP TABLE IF EXISTS taxas_municipios')
+    conn.execute(ESTRUTURA_TAXAS)
+    conn.executemany(
+        f"INSERT INTO taxas_municipios VALUES ({', '.join('?' * len(colunas))})",
+        taxas[colunas].astype(object).itertuples(index=False, name=None)
+    )
+    conn.commit()
+
+def atualizar_populacao_municipios(conn, indice, codigos, populacao):
+    """Preenche municipios.populacao com o total das estimativas"""
+    totais = populacao.sum(axis=(1, 2))
+    cursor = conn.executemany(
+        'UPDATE municipios SET populacao = ? WHERE codigo = ?',
+        [(int(total), f'{codigo:06d}') for codigo, total in zip(codigos, totais)]
+    )
+    conn.commit()
+    return cursor.rowcount
+
+def ler_taxas(periodo=None, db_path=None):
+    """Taxas gravadas (de um período ou de todos), com o nome do município"""
+
+    db_path = db_path or DATABASE['path']
+    conn = sqlite3.connect(f'file:{db_path}?mode=ro', uri=True)
+    try:
+        if not conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'taxas_municipios'").fetchone():
+            raise FileNotFoundError("Taxas por habitante não calculadas; execute scripts/taxas_populacionais.py")
+        filtro = 'WHERE t.periodo = ?' if periodo else ''
+        return pd.read_sql_query(
+            f'''
+                SELECT t.*, m.nome as municipio
+                FROM taxas_municipios t
+                LEFT JOIN municipios m ON m.codigo = t.codigo_municipio
+                {filtro}
+            ''',
+            conn, params=[periodo] if periodo else []
+        )
+    finally:
+        conn.close()
@@ -0,0 +1,110 @@
+"""
+Aquecimento dos caches do dashboard em segundo plano
+Na primeira execução do servidor e sempre que a versão dos dados muda (nova carga do ETL, vista
+numa execução ou conferida periodicamente com a fila vazia), uma thread carrega os dados de todas
+as páginas com os filtros padrão e importa os módulos delas; enquanto o gestor está numa página,
+as vizinhas nas pills passam na frente da fila.
+A primeira visita a uma página já aquecida encontra tudo no cache
+"""
+
+import json
+import time
+import queue
+import logging
+import itertools
+import threading
+
+from config.settings import AQUECIMENTO
+
+logger = logging.getLogger('dashboard.aquecimento')
+
+# Prioridades da fila (menor sai primeiro)
+PRIORIDADE_VIZINHAS = 0
+PRIORIDADE_TODAS = 1
+
+class Aquecimento:
+    """
+    Fila de pré-cargas atendida por uma thread daemon
+    Cada tarefa tem uma chave (versão dos dados + página) e roda uma única vez; reagendar uma
+    chave pendente com prioridade maior só a adianta na fila
+    """
+
+    def __init__(self, verificar=None):
+        self.verificar = verificar
+        self.fila = queue.PriorityQueue()
+        self.trava = threading.Lock()
+        self.ordem = itertools.count()
+        self.versao = None
+        self.pendentes = {}
+        self.feitas = set()
+        self.thread = threading.Thread(target=self.executar, name='aquecimento-dashboard', daemon=True)
+        self.thread.start()
+
+    def nova_versao(self, versao):
+        """Registra a versão atual dos dados; True se ela mudou (caches antigos devem ser descartados)"""
+
+        with self.trava:
+            if versao == self.versao:
+                return False
+            self.versao = versao
+            self.pendentes.clear()
+            self.feitas.clear()
+            return True
+
+    def agendar(self, chave, tarefa, prioridade=PRIORIDADE_TODAS):
+        """Agenda a tarefa se ela ainda não rodou nem está na fila com prioridade igual ou maior"""
+
+        with self.trava:
+            if chave in self.feitas or self.pendentes.get(chave, prioridade + 1) <= prioridade:
+                return False
+            self.pendentes[chave] = prioridade
+        self.fila.put((prioridade, next(self.ordem), chave, tarefa))
+        return True
+
+    def executar(self):
+        while True:
+            try:
+                prioridade, _, chave, tarefa = self.fila.get(timeout=AQUECIMENTO['intervalo'])
+            except queue.Empty:
+                # Fila vazia: confere se o ETL gravou uma nova versão dos dados
+                if self.verificar:
+                    try:
+                        self.verificar()
+                    except Exception as e:
+                        logger.warning(f"Falha ao verificar a versão dos dados: {type(e).__name__}: {e}")
+                continue
+            with self.trava:
+                # Entrada repetida (a chave foi adiantada) ou de uma versão já substituída
+                if chave in self.feitas or self.pendentes.get(chave) != prioridade:
+                    continue
+                del self.pendentes[chave]
+                self.feitas.add(chave)
+
+            inicio = time.perf_counter()
+            try:
+                tarefa()
+            except Exception as e:
+                with self.trava:
+                    self.feitas.discard(chave)
+                logger.warning(json.dumps(
+                    {'evento': 'aquecimento', 'chave': chave, 'erro': f'{type(e).__name__}: {e}'},
+                    ensure_ascii=False, default=str
+                ))
+                continue
+            logger.info(json.dumps(
+                {'evento': 'aquecimento', 'chave': chave, 'prioridade': prioridade,
+                 'tempo_ms': (time.perf_counter() - inicio) * 1000},
+                ensure_ascii=False, default=str
+            ))
+
+def vizinhas(paginas, atual, distancia=None):
+    """Páginas ao redor da atual nas pills, das mais próximas para as mais distantes"""
+
+    distancia = AQUECIMENTO['vizinhas'] if distancia is None else distancia
+    posicao = paginas.index(atual)
+    proximas = []
+    for passo in range(1, distancia + 1):
+        for indice in (posicao + passo, posicao - passo):
+            if 0 <= indice < len(paginas):
+                proximas.append(paginas[indice])
+    return proximas
@@ -0,0 +1,137 @@
+"""
+Instrumentação de renderização do dashboard
+Mede tempo, linhas processadas e delta de memória de cada carga, filtro, página e seção,
+grava logs estruturados e mostra os números da última execução em um painel de debug
+"""
+
+import os
+import json
+import time
+import logging
+import cProfile
+import functools
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+
+import pandas as pd
+import streamlit as st
+
+from config.settings import LOGGING, INSTRUMENTACAO
+
+logging.basicConfig(level=LOGGING['level'], format=LOGGING['format'])
+logger = logging.getLogger('dashboard.render')
+
+# Chave da sessão onde ficam as medições da execução atual
+CHAVE_MEDICOES = '_medicoes_render'
+
+def _medicoes():
+    """Lista de medições da execução atual (uma por rerun do Streamlit)"""
+    if CHAVE_MEDICOES not in st.session_state:
+        st.session_state[CHAVE_MEDICOES] = {'itens': [], 'nivel': 0}
+    return st.session_state[CHAVE_MEDICOES]
+
+def iniciar_execucao():
+    """Zera as medições no início de cada rerun e liga o tracemalloc se configurado"""
+    st.session_state[CHAVE_MEDICOES] = {'itens': [], 'nivel': 0}
+    if INSTRUMENTACAO['ativa'] and INSTRUMENTACAO['memoria'] and not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+def contar_linhas(*valores):
+    """Linhas do primeiro DataFrame encontrado entre os valores"""
+    for valor in valores:
+        if isinstance(valor, pd.DataFrame):
+            return len(valor)
+    return None
+
+@contextmanager
+def medir(nome, linhas=None):
+    """
+    Mede o bloco: tempo de parede, linhas (se informadas ou definidas via medicao['linhas'])
+    e delta de memória do tracemalloc
+    """
+
+    if not INSTRUMENTACAO['ativa']:
+        yield {}
+        return
+
+    estado = _medicoes()
+    medicao = {'secao': nome, 'nivel': estado['nivel'], 'linhas': linhas}
+    estado['itens'].append(medicao)
+    estado['nivel'] += 1
+
+    memoria_inicial = tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else None
+    inicio = time.perf_counter()
+    try:
+        yield medicao
+    finally:
+        medicao['tempo_ms'] = (time.perf_counter() - inicio) * 1000
+        if memoria_inicial is not None:
+            medicao['memoria_kb'] = (tracemalloc.get_traced_memory()[0] - memoria_inicial) / 1024
+        estado['nivel'] -= 1
+
+        logger.info(json.dumps({'evento': 'render', **medicao}, ensure_ascii=False, default=str))
+
+def instrumentado(nome=None):
+    """
+    Decorator que mede cada chamada da função
+    As linhas vêm do primeiro DataFrame recebido ou, se não houver, do DataFrame retornado
+    """
+
+    def decorador(funcao):
+        rotulo = nome or f'{funcao.__module__}.{funcao.__name__}'
+
+        @functools.wraps(funcao)
+        def wrapper(*args, **kwargs):
+            with medir(rotulo, contar_linhas(*args, *kwargs.values())) as medicao:
+                resultado = funcao(*args, **kwargs)
+                if medicao.get('linhas') is None and 'secao' in medicao:
+                    medicao['linhas'] = contar_linhas(resultado)
+                return resultado
+
+        return wrapper
+
+    return decorador
+
+@contextmanager
+def perfil_execucao():
+    """Se o cProfile estiver ligado nas configurações, grava um .prof para cada rerun"""
+
+    if not INSTRUMENTACAO['cprofile']:
+        yield
+        return
+
+    perfil = cProfile.Profile()
+    perfil.enable()
+    try:
+        yield
+    finally:
+        perfil.disable()
+        os.makedirs(INSTRUMENTACAO['cprofile_dir'], exist_ok=True)
+        arquivo = os.path.join(
+            INSTRUMENTACAO['cprofile_dir'], f"rerun_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}.prof"
+        )
+        perfil.dump_stats(arquivo)
+        logger.info(json.dumps({'evento': 'cprofile', 'arquivo': arquivo}, ensure_ascii=False))
+
+def render_painel_debug():
+    """Painel recolhível com as medições da execução atual"""
+
+    if not (INSTRUMENTACAO['ativa'] and INSTRUMENTACAO['painel_debug']):
+        return
+
+    itens = _medicoes()['itens']
+    if not itens:
+        return
+
+    with st.expander("🛠️ Debug - Tempos de Renderização", expanded=False):
+        tabela = pd.DataFrame([{
+            'Seção': ' ' * item['nivel'] + item['secao'],
+            'Tempo (ms)': round(item.get('tempo_ms', 0), 1),
+            'Linhas': item['linhas'],
+            'Memória (KB)': round(item['memoria_kb'], 1) if 'memoria_kb' in item else None,
+        } for item in itens])
+
+        total = sum(item.get('tempo_ms', 0) for item in itens if item['nivel'] == 0)
+        st.caption(f"Tempo total medido nesta execução: {total:,.1f} ms")
+        st.dataframe(tabela, use_container_width=True, hide_index=True)
@@ -1,22 +1,23 @@
 import streamlit as st
-import sqlite3
-import pandas as pd
 import os
 import sys
+import sqlite3
 
 # Adiciona o diretório raiz ao path para importar módulos
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 
-# Importa as páginas do dashboard
-from pages import (
-    overview,
-    causas_principais,
-    analise_demografica,
-    analise_geografica,
-    analise_temporal,
-    gestao_recursos,
-    recomendacoes
-)
+# Registro das páginas do dashboard (cada uma é importada só quando é aberta)
+from pages import PAGINAS, carregar_pagina, paginas_importadas
+from config.settings import DATABASE, PARTICIONAMENTO, AQUECIMENTO
+from config.motor import PoolConexoes, executar_consulta, versao_dados
+from config.particoes import executar_consulta_particionada, resumos_particionados
+from config.busca import buscar, conectar_busca
+from config.fluxos import carregar_fluxos
+from config.taxas import ler_taxas
+from config.amostragem import amostra_estratificada
+from config.compactacao import compactar_dados
+from instrumentacao import instrumentado, iniciar_execucao, perfil_execucao, render_painel_debug
+from aquecimento import Aquecimento, PRIORIDADE_VIZINHAS, vizinhas
 
 # Configuração da página
 st.set_page_config(
@@ -26,73 +27,158 @@ st.set_page_config(
     initial_sidebar_state="collapsed"
 )
 
-# Função para conectar ao banco de dados
+# Pool de conexões com o banco de dados (o mesmo usado pelo serviço HTTP)
 @st.cache_resource
-def get_database_connection():
-    """Conecta ao banco de dados SQLite"""
-    db_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'database', 'internacoes_datasus.db')
-    return sqlite3.connect(db_path, check_same_thread=False)
+def get_database_pool():
+    """
+    Conexões do motor configurado em DATABASE['engine'] (SQLite ou DuckDB), uma por sessão ativa
+    O pool reabre as conexões quando a versão dos dados muda (nova carga ou cópia analítica)
+    """
+    return PoolConexoes()
 
 # Função para carregar dados principais
+@instrumentado('load_main_data')
 @st.cache_data
-def load_main_data():
-    """Carrega dados principais do banco normalizado com descrições legíveis"""
-    conn = get_database_connection()
-    query = """
-        SELECT 
-            i.id as internacao_id,
-            i.numero_aih,
-            i.ano_competencia,
-            i.mes_competencia,
-            i.data_internacao,
-            i.data_saida,
-            i.dias_permanencia,
-            i.dias_uti_total,
-            i.gestacao_risco,
-            
-            -- Dados do paciente
-            p.idade_anos,
-            s.descricao as sexo,
-            p.codigo_municipio_residencia,
-            
-            -- Dados clínicos com descrições
-            cid.descricao as diagnostico_principal,
-            cid.capitulo as capitulo_cid,
-            cid.sensivel_atencao_basica,
-            ci.descricao as carater_internacao,
-            
-            -- Dados do estabelecimento
-            e.codigo_cnes,
-            esp.descricao as especialidade,
-            comp.descricao as complexidade,
-            tg.descricao as tipo_gestao,
-            
-            -- Valores financeiros
-            vf.valor_total,
-            vf.valor_servicos_hospitalares,
-            vf.valor_servicos_profissionais,
-            vf.valor_uti,
-            vf.valor_em_dolares
-            
-        FROM internacoes i
-        LEFT JOIN pacientes p ON i.paciente_id = p.id
-        LEFT JOIN sexo s ON p.codigo_sexo = s.codigo
-        LEFT JOIN cid_diagnosticos cid ON i.codigo_diagnostico_principal = cid.codigo
-        LEFT JOIN carater_internacao ci ON i.codigo_carater_internacao = ci.codigo
-        LEFT JOIN estabelecimentos e ON i.estabelecimento_id = e.id
-        LEFT JOIN especialidades esp ON e.codigo_especialidade = esp.codigo
-        LEFT JOIN complexidade comp ON e.codigo_complexidade = comp.codigo
-        LEFT JOIN tipos_gestao tg ON e.codigo_tipo_gestao = tg.codigo
-        LEFT JOIN valores_financeiros vf ON i.id = vf.internacao_id
-        
-        WHERE i.codigo_diagnostico_principal IS NOT NULL
-        AND p.idade_anos IS NOT NULL
-        AND vf.valor_total IS NOT NULL
-        AND vf.valor_total > 0
+def load_main_data(competencias=None, versao=None):
+    """
+    Carrega dados principais do banco normalizado com descrições legíveis
+    Com o particionamento ativo, lê só as partições das competências pedidas
+    A versão dos dados entra na chave do cache: uma nova carga do ETL não reaproveita o antigo
+    A cópia em cache é compactada (categorias compartilhadas e inteiros reduzidos)
     """
-    df = pd.read_sql_query(query, conn)
-    conn.close()
-    return df
+    if PARTICIONAMENTO['ativo'] and DATABASE['engine'] == 'sqlite':
+        return compactar_dados(executar_consulta_particionada('dashboard_dados_principais', competencias), versao)
+    with get_database_pool().conexao() as conn:
+        return compactar_dados(executar_consulta('dashboard_dados_principais', conn), versao)
+
+# Amostra estratificada por competência para os gráficos de pontos, guardada junto com a carga
+@instrumentado('load_amostra')
+@st.cache_data
+def load_amostra(competencias=None, versao=None):
+    """Amostra da base principal com orçamento de GRAFICOS['pontos'], pesos por competência"""
+    return amostra_estratificada(load_main_data.__wrapped__(competencias, versao), ['ano_competencia', 'mes_competencia'])
+
+@st.cache_resource
+def get_busca_connection():
+    """Conecta ao índice de busca do pacote de referências"""
+    return conectar_busca()
+
+# Busca de CIDs, procedimentos e municípios pela descrição
+def render_busca():
+    rotulos = {'cid': 'CID-10', 'procedimento': 'Procedimento', 'municipio': 'Município'}
+
+    with st.expander("🔎 Buscar CID, procedimento ou município", expanded=False):
+        termo = st.text_input(
+            "Descrição ou código",
+            placeholder="Ex.: pneumonia, parto cesariano, J18, Curitiba",
+            key='busca_termo'
+        )
+        if not termo:
+            return
+
+        try:
+            resultados = buscar(termo, limite=50, conn=get_busca_connection())
+        except FileNotFoundError as e:
+            st.warning(str(e))
+            return
+
+        if resultados.empty:
+            st.info("Nenhuma descrição encontrada")
+            return
+
+        resultados['tipo'] = resultados['tipo'].map(rotulos)
+        st.dataframe(
+            resultados.rename(columns={
+                'tipo': 'Tipo', 'codigo': 'Código', 'descricao': 'Descrição', 'detalhe': 'Detalhe'
+            }),
+            hide_index=True,
+            use_container_width=True
+        )
+
+# Resumos aproximados (top-10 e distribuições) das partições do período
+@instrumentado('load_resumos')
+@st.cache_data
+def load_resumos(competencias=None, versao=None):
+    """Mescla os resumos das partições; None se não houver partições ou resumos"""
+    try:
+        resumos = resumos_particionados(competencias)
+    except FileNotFoundError:
+        return None
+    return resumos if any(resumo.total for resumo in resumos.values()) else None
+
+# Matrizes de fluxo residência x internação (origem-destino)
+@instrumentado('load_fluxos')
+@st.cache_data
+def load_fluxos(versao=None):
+    """Carrega as matrizes esparsas de fluxo; None se o banco não tiver os fluxos ou faltar o scipy"""
+    try:
+        return carregar_fluxos()
+    except (FileNotFoundError, ImportError):
+        return None
+
+@instrumentado('load_taxas')
+@st.cache_data
+def load_taxas(versao=None):
+    """Carrega as taxas por 10 mil habitantes de todos os períodos; None se não foram calculadas"""
+    try:
+        return ler_taxas()
+    except (FileNotFoundError, sqlite3.OperationalError):
+        return None
+
+# Aquecimento dos caches: uma thread por servidor carrega os dados das páginas em segundo plano
+@st.cache_resource
+def get_aquecimento():
+    return Aquecimento(verificar=lambda: aquecer_versao(versao_dados()))
+
+# Funções de carga cacheadas, sem a instrumentação (que depende da sessão do Streamlit)
+CARGAS = [load_main_data, load_amostra, load_resumos, load_fluxos, load_taxas]
+
+def carregar_dados_pagina(rotulo, versao):
+    """
+    Importa o módulo da página e deixa no cache os dados dela e as agregações com os filtros padrão
+    (chamadas com os mesmos argumentos que a renderização usa, para caírem na mesma chave)
+    """
+    pagina = carregar_pagina(rotulo)
+    data = load_main_data.__wrapped__(None, versao)
+    if rotulo == "📊 Visão Geral":
+        amostra = load_amostra.__wrapped__(None, versao)
+        resumos = load_resumos.__wrapped__(None, versao) if PARTICIONAMENTO['ativo'] else None
+        pagina.agregados.__wrapped__(data, resumos, amostra, pagina.FILTROS_PADRAO, None, versao)
+    elif rotulo == "🗺️ Análise Geográfica":
+        fluxos = load_fluxos.__wrapped__(versao)
+        load_taxas.__wrapped__(versao)
+        if fluxos is not None:
+            pagina.resumo_fluxos.__wrapped__(fluxos, versao)
+    elif rotulo == "💡 Recomendações":
+        load_taxas.__wrapped__(versao)
+        pagina.reinternacoes.__wrapped__(data, versao)
+
+def aquecer_versao(versao):
+    """
+    Se a versão dos dados mudou (primeira execução do servidor ou nova carga do ETL), descarta
+    os caches da versão anterior e agenda a pré-carga de todas as páginas
+    """
+    aquecimento = get_aquecimento()
+    if aquecimento.nova_versao(versao):
+        for carga in CARGAS:
+            carga.__wrapped__.clear()
+        for pagina in paginas_importadas():
+            for agregacao in getattr(pagina, 'AGREGACOES', []):
+                agregacao.__wrapped__.clear()
+        for rotulo in PAGINAS:
+            aquecimento.agendar((versao, rotulo), lambda rotulo=rotulo: carregar_dados_pagina(rotulo, versao))
+
+def aquecer(selected_page, versao):
+    """Agenda a pré-carga da versão atual e adianta na fila as vizinhas da página aberta"""
+    if not AQUECIMENTO['ativo']:
+        return
+
+    aquecer_versao(versao)
+    aquecimento = get_aquecimento()
+    for rotulo in vizinhas(list(PAGINAS), selected_page):
+        aquecimento.agendar(
+            (versao, rotulo), lambda rotulo=rotulo: carregar_dados_pagina(rotulo, versao), PRIORIDADE_VIZINHAS
+        )
 
 # Função de navegação com pills
 def navigation():
@@ -108,18 +194,12 @@ def navigation():
         *"Como gestor de UBS, quero entender as causas mais comuns de internações evitáveis para planejar melhor os recursos da unidade."*
         """)
     
+    render_busca()
+    
     st.markdown("---")
     
     # Navegação com pills
-    pages = [
-        "📊 Visão Geral",
-        "🔍 Causas Principais", 
-        "👥 Análise Demográfica",
-        "🗺️ Análise Geográfica",
-        "📈 Análise Temporal",
-        "💰 Gestão de Recursos",
-        "💡 Recomendações"
-    ]
+    pages = list(PAGINAS)
     
     # Inicializa o estado da sessão se não existir
     if 'selected_page' not in st.session_state:
@@ -142,34 +222,46 @@ def navigation():
 
 # Função principal
 def main():
-    # Navegação com pills
-    selected_page = navigation()
+    iniciar_execucao()
     
-    st.markdown("---")
-    
-    # Carrega dados principais
-    try:
-        data = load_main_data()
+    with perfil_execucao():
+        # Navegação com pills
+        selected_page = navigation()
         
-        # Roteamento das páginas
-        if selected_page == "📊 Visão Geral":
-            overview.render(data)
-        elif selected_page == "🔍 Causas Principais":
-            causas_principais.render(data)
-        elif selected_page == "👥 Análise Demográfica":
-            analise_demografica.render(data)
-        elif selected_page == "🗺️ Análise Geográfica":
-            analise_geografica.render(data)
-        elif selected_page == "📈 Análise Temporal":
-            analise_temporal.render(data)
-        elif selected_page == "💰 Gestão de Recursos":
-            gestao_recursos.render(data)
-        elif selected_page == "💡 Recomendações":
-            recomendacoes.render(data)
+        st.markdown("---")
+        
+        # Carrega dados principais (particionado: só as competências do filtro de período da Visão Geral)
+        try:
+            versao = versao_dados()
+            aquecer(selected_page, versao)
+
+            pagina = carregar_pagina(selected_page)
+            competencias = None
+            if PARTICIONAMENTO['ativo'] and selected_page == "📊 Visão Geral":
+                competencias = pagina.competencias_do_periodo(st.session_state.get('overview_periodo', 'Todos'))
+            data = load_main_data(competencias, versao)
             
-    except Exception as e:
-        st.error(f"Erro ao carregar dados: {str(e)}")
-        st.info("Certifique-se de que o banco de dados foi criado executando o script `scripts/create_database.py`")
+            # Roteamento das páginas
+            if selected_page == "📊 Visão Geral":
+                pagina.render(
+                    data,
+                    load_resumos(competencias, versao) if PARTICIONAMENTO['ativo'] else None,
+                    load_amostra(competencias, versao),
+                    competencias,
+                    versao
+                )
+            elif selected_page == "🗺️ Análise Geográfica":
+                pagina.render(data, load_fluxos(versao), load_taxas(versao), versao)
+            elif selected_page == "💡 Recomendações":
+                pagina.render(data, load_taxas(versao), versao)
+            else:
+                pagina.render(data)
+                
+        except Exception as e:
+            st.error(f"Erro ao carregar dados: {str(e)}")
+            st.info("Certifique-se de que o banco de dados foi criado executando o script `scripts/create_database.py`")
+    
+    render_painel_debug()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1 +1,25 @@
-# Módulo para as páginas do dashboard
\ No newline at end of file
+# Módulo para as páginas do dashboard
+# Cada página só é importada quando é aberta (junto com o plotly, se ela usar), para que a
+# partida do dashboard não pague a importação das sete páginas
+
+import sys
+import importlib
+
+# Rótulo da pill de navegação -> módulo da página
+PAGINAS = {
+    "📊 Visão Geral": 'overview',
+    "🔍 Causas Principais": 'causas_principais',
+    "👥 Análise Demográfica": 'analise_demografica',
+    "🗺️ Análise Geográfica": 'analise_geografica',
+    "📈 Análise Temporal": 'analise_temporal',
+    "💰 Gestão de Recursos": 'gestao_recursos',
+    "💡 Recomendações": 'recomendacoes',
+}
+
+def carregar_pagina(rotulo):
+    """Módulo da página do rótulo, importado na primeira vez que ela é aberta"""
+    return importlib.import_module(f'{__name__}.{PAGINAS[rotulo]}')
+
+def paginas_importadas():
+    """Módulos das páginas já importados (só eles podem ter agregações em cache)"""
+    return [sys.modules[nome] for nome in (f'{__name__}.{modulo}' for modulo in PAGINAS.values()) if nome in sys.modules]
@@ -1,8 +1,10 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
 
+from config.compactacao import contagens
+from instrumentacao import instrumentado
+
+@instrumentado('analise_demografica.render')
 def render(data):
     """
     Página de Análise Demográfica
@@ -57,7 +59,7 @@ def render(data):
     
     with col1:
         st.markdown("**Distribuição por Sexo**")
-        sexo_dist = data['sexo'].value_counts()
+        sexo_dist = contagens(data['sexo'])
         sexo_labels = {1: 'Masculino', 3: 'Feminino'}
         sexo_dist.index = sexo_dist.index.map(sexo_labels)
         st.bar_chart(sexo_dist)
@@ -84,7 +86,7 @@ def render(data):
     st.markdown("### Dados Disponíveis para Análise:")
     st.write(f"- Idade mínima: {data['idade'].min():.0f} anos")
     st.write(f"- Idade máxima: {data['idade'].max():.0f} anos")
-    st.write(f"- Distribuição por sexo: {data['sexo'].value_counts().to_dict()}")
+    st.write(f"- Distribuição por sexo: {contagens(data['sexo']).to_dict()}")
     
     st.markdown("### Amostra dos Dados:")
     st.dataframe(data[['idade', 'sexo', 'val_tot', 'dias_perm', 'diag_princ']].head(10))
\ No newline at end of file
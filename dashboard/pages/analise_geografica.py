@@ -1,9 +1,112 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
+import numpy as np
 
-def render(data):
+from config.fluxos import destinos_residentes, principais_entradas, principais_saidas
+from config.taxas import TODOS
+from instrumentacao import instrumentado
+
+@instrumentado('analise_geografica.render_taxas')
+def render_taxas(taxas):
+    """Municípios com maior taxa de internação padronizada por idade e sexo, por período"""
+    st.markdown("### 📏 Internações por 10 mil Habitantes")
+    
+    if taxas is None:
+        st.info("Taxas por habitante indisponíveis; execute `scripts/taxas_populacionais.py` com as estimativas populacionais")
+        return
+    
+    periodos = sorted(taxas['periodo'].unique(), key=lambda periodo: (periodo != TODOS, periodo))
+    periodo = st.selectbox(
+        "Período",
+        periodos,
+        format_func=lambda periodo: "Todo o período" if periodo == TODOS else periodo,
+        key="geografica_periodo_taxas"
+    )
+    
+    municipios = taxas[(taxas['periodo'] == periodo) & (taxas['cid'] == TODOS)]
+    st.dataframe(
+        municipios.nlargest(15, 'taxa_padronizada')[[
+            'codigo_municipio', 'municipio', 'internacoes', 'populacao',
+            'taxa_bruta', 'taxa_padronizada', 'custo_padronizado'
+        ]].rename(columns={
+            'codigo_municipio': 'Código',
+            'municipio': 'Município',
+            'internacoes': 'Internações',
+            'populacao': 'População',
+            'taxa_bruta': 'Taxa Bruta',
+            'taxa_padronizada': 'Taxa Padronizada',
+            'custo_padronizado': 'Custo Padronizado (R$)'
+        }).round(2),
+        hide_index=True,
+        use_container_width=True
+    )
+    st.caption("Taxas por 10 mil habitantes, padronizadas por idade e sexo pelo método direto")
+
+@instrumentado('analise_geografica.resumo_fluxos')
+@st.cache_data
+def resumo_fluxos(_fluxos, versao=None):
+    """
+    Municípios de residência com internações (dos mais frequentes para os menos), internações
+    de residentes por município e maiores entradas e saídas, em cache pela versão dos dados
+    """
+    residentes = np.asarray(_fluxos['internacoes'].sum(axis=1)).ravel()
+    municipios = np.flatnonzero(residentes)
+    return {
+        'municipios': municipios[np.argsort(residentes[municipios])[::-1]],
+        'residentes': residentes,
+        'entradas': principais_entradas(_fluxos),
+        'saidas': principais_saidas(_fluxos),
+    }
+
+# Agregações em cache da página (descartadas pelo dashboard quando a versão dos dados muda)
+AGREGACOES = [resumo_fluxos]
+
+@instrumentado('analise_geografica.render_fluxos')
+def render_fluxos(fluxos, versao=None):
+    """Fluxo de pacientes: onde os residentes se internam e maiores entradas e saídas"""
+    st.markdown("### 🔀 Fluxo de Pacientes")
+    
+    if fluxos is None:
+        st.info("Fluxos entre municípios indisponíveis; recarregue o banco com `scripts/create_database.py` (requer scipy)")
+        return
+    
+    resumo = resumo_fluxos(fluxos, versao)
+    residentes = resumo['residentes']
+    municipios = resumo['municipios']
+    
+    municipio = st.selectbox(
+        "Município de residência",
+        municipios.tolist(),
+        format_func=lambda codigo: f"{codigo:06d} ({int(residentes[codigo]):,} internações)",
+        key="geografica_municipio_fluxo"
+    )
+    
+    if municipio is not None:
+        st.markdown("**Onde os residentes se internam**")
+        st.dataframe(
+            destinos_residentes(fluxos, municipio).rename(columns={
+                'municipio_movimento': 'Município de Internação',
+                'internacoes': 'Internações',
+                'valor_total': 'Valor Total',
+                'permanencia_media': 'Permanência Média',
+                'percentual': '% dos Residentes'
+            }).round(2),
+            hide_index=True,
+            use_container_width=True
+        )
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.markdown("**Maiores Entradas (pacientes de outros municípios)**")
+        st.dataframe(resumo['entradas'], hide_index=True, use_container_width=True)
+    
+    with col2:
+        st.markdown("**Maiores Saídas (residentes internados fora)**")
+        st.dataframe(resumo['saidas'], hide_index=True, use_container_width=True)
+
+@instrumentado('analise_geografica.render')
+def render(data, fluxos=None, taxas=None, versao=None):
     """
     Página de Análise Geográfica
     
@@ -19,6 +122,12 @@ def render(data):
     st.title("🗺️ Análise Geográfica")
     st.markdown("---")
     
+    render_taxas(taxas)
+    st.markdown("---")
+    
+    render_fluxos(fluxos, versao)
+    st.markdown("---")
+    
     # Placeholder para desenvolvimento
     st.info("🚧 **Área de Desenvolvimento - Análise Geográfica**")
     st.markdown("""
@@ -1,8 +1,9 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
 
+from instrumentacao import instrumentado
+
+@instrumentado('analise_temporal.render')
 def render(data):
     """
     Página de Análise Temporal
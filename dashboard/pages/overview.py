@@ -1,22 +1,62 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
-import plotly.graph_objects as go
-from datetime import datetime
 import numpy as np
 
+from config.settings import GRAFICOS
+from config.amostragem import histograma, estimar_media
+from config.compactacao import contagens
+from instrumentacao import instrumentado
+
+# Períodos do filtro e a competência (ano, mês) de cada um
+PERIODOS = {
+    'Janeiro 2025': (2025, 1),
+    'Fevereiro 2025': (2025, 2),
+    'Março 2025': (2025, 3),
+}
+
+# Filtros da página ao abri-la (mesma ordem de render_filters, para a mesma chave de cache)
+FILTROS_PADRAO = {'periodo': 'Todos', 'faixa_etaria': 'Todas', 'sexo': 'Todos', 'tipo_internacao': 'Todos'}
+
+def competencias_do_periodo(periodo):
+    """Competências do período selecionado, ou None para todas"""
+    return (PERIODOS[periodo],) if periodo in PERIODOS else None
+
+def contagens_top(data, coluna, resumos=None, n=10):
+    """Os n valores mais frequentes da coluna; com os resumos das partições, vem do Space-Saving"""
+    if resumos and coluna in resumos:
+        return resumos[coluna].top(n)
+    return contagens(data[coluna]).head(n)
+
+def faixas_histograma(data, coluna, nbins, resumos=None):
+    """
+    Faixas do histograma da coluna calculadas no servidor: (frequências, limites)
+    Com os resumos das partições, usa as faixas estimadas pelo KLL
+    """
+    if resumos and coluna in resumos:
+        return resumos[coluna].histograma(nbins)
+    return histograma(data[coluna], nbins)
+
+def figura_histograma(faixas, coluna, title):
+    """Histograma com as faixas já calculadas (só nbins barras vão para o Plotly)"""
+    frequencias, limites = faixas
+    fig = px.bar(
+        x=(limites[:-1] + limites[1:]) / 2,
+        y=frequencias,
+        labels={'x': coluna, 'y': 'count'},
+        title=title
+    )
+    fig.update_traces(width=np.diff(limites))
+    return fig
+
 def apply_filters(data, filters):
     """Aplica filtros aos dados"""
     filtered_data = data.copy()
     
     # Filtro por período
-    if filters['periodo'] != 'Todos':
-        if filters['periodo'] == 'Janeiro 2025':
-            filtered_data = filtered_data[(filtered_data['ano_competencia'] == 2025) & (filtered_data['mes_competencia'] == 1)]
-        elif filters['periodo'] == 'Fevereiro 2025':
-            filtered_data = filtered_data[(filtered_data['ano_competencia'] == 2025) & (filtered_data['mes_competencia'] == 2)]
-        elif filters['periodo'] == 'Março 2025':
-            filtered_data = filtered_data[(filtered_data['ano_competencia'] == 2025) & (filtered_data['mes_competencia'] == 3)]
+    if filters['periodo'] in PERIODOS:
+        ano, mes = PERIODOS[filters['periodo']]
+        filtered_data = filtered_data[(filtered_data['ano_competencia'] == ano) & (filtered_data['mes_competencia'] == mes)]
     
     # Filtro por faixa etária
     if filters['faixa_etaria'] != 'Todas':
@@ -43,6 +83,63 @@ def apply_filters(data, filters):
     
     return filtered_data
 
+@instrumentado('overview.agregados')
+@st.cache_data
+def agregados(_data, _resumos, _amostra, filtros, competencias=None, versao=None):
+    """
+    Filtros aplicados e todas as agregações da Visão Geral, em cache por filtros e versão dos dados
+    A base, os resumos e a amostra ficam fora da chave: são os das competências e da versão informadas
+    """
+    data = apply_filters(_data, filtros)
+    amostra = apply_filters(_amostra, filtros) if _amostra is not None else None
+    
+    # Os resumos das partições não separam faixa etária, sexo nem tipo de internação
+    resumos = _resumos
+    if any(filtros[filtro] not in ('Todos', 'Todas') for filtro in ('faixa_etaria', 'sexo', 'tipo_internacao')):
+        resumos = None
+    
+    total = len(data)
+    data_temp = data.assign(
+        periodo=data['ano_competencia'].astype(str) + '-' + data['mes_competencia'].astype(str).str.zfill(2),
+        faixa_etaria=pd.cut(data['idade_anos'], bins=[0, 18, 60, 100], labels=['0-18', '19-59', '60+'])
+    )
+    
+    return {
+        'linhas_base': len(_data),
+        'usa_resumos': bool(resumos),
+        'kpis': {
+            'total_internacoes': total,
+            'valor_total': data['valor_total'].sum(),
+            'media_permanencia': data['dias_permanencia'].mean(),
+            'idade_media': data['idade_anos'].mean(),
+            'custo_medio': data['valor_total'].mean(),
+            'custo_dia': (data['valor_total'] / data['dias_permanencia']).mean(),
+            'perc_urgencia': (data['carater_internacao'] == 'Urgência').sum() / total * 100 if total > 0 else 0,
+            'perc_idosos': (data['idade_anos'] >= 60).sum() / total * 100 if total > 0 else 0,
+        },
+        'top_causas': contagens_top(data, 'diagnostico_principal', resumos),
+        'total_causas': resumos['diagnostico_principal'].total if resumos else total,
+        'causa_principal': contagens(data['diagnostico_principal']).index[0] if total > 0 else "N/A",
+        'internacoes_tempo': data_temp.groupby('periodo').size().reset_index(name='internacoes'),
+        'valores_tempo': data_temp.groupby('periodo')['valor_total'].sum().reset_index(name='valor_total'),
+        'hist_valor': faixas_histograma(data, 'valor_total', 30, resumos),
+        'custos_cid': data.groupby('diagnostico_principal', observed=True)['valor_total'].sum().sort_values(ascending=False).head(10),
+        'amostra': amostra,
+        'estimativa_custo': estimar_media(amostra, 'valor_total') if amostra is not None and not amostra.empty else None,
+        'hist_idade': faixas_histograma(data, 'idade_anos', 20, resumos),
+        'sexo_counts': contagens(data['sexo']),
+        'tipo_counts': contagens(data['carater_internacao']),
+        'custo_tipo': data.groupby('carater_internacao', observed=True)['valor_total'].mean(),
+        'hist_permanencia': faixas_histograma(data, 'dias_permanencia', 30, resumos),
+        'perm_idade': data_temp.groupby('faixa_etaria', observed=True)['dias_permanencia'].mean(),
+        'top_munic': contagens_top(data, 'codigo_municipio_residencia', resumos),
+        'custo_munic': data.groupby('codigo_municipio_residencia', observed=True)['valor_total'].sum().sort_values(ascending=False).head(10),
+    }
+
+# Agregações em cache da página (descartadas pelo dashboard quando a versão dos dados muda)
+AGREGACOES = [agregados]
+
+@instrumentado('overview.render_filters')
 def render_filters():
     """Renderiza os filtros da página"""
     st.markdown("### 🔍 Filtros")
@@ -52,7 +149,7 @@ def render_filters():
     with col1:
         periodo = st.selectbox(
             "Período",
-            ["Todos", "Janeiro 2025", "Fevereiro 2025", "Março 2025"],
+            ["Todos", *PERIODOS],
             key="overview_periodo"
         )
     
@@ -84,6 +181,7 @@ def render_filters():
         'tipo_internacao': tipo_internacao
     }
 
+@instrumentado('overview.render_options_selector')
 def render_options_selector():
     """Renderiza seletor de opções de visualização"""
     st.markdown("### 📊 Escolha as Informações para Visualizar")
@@ -110,44 +208,42 @@ def render_options_selector():
     
     return selected_options
 
-def render_kpis(data):
+@instrumentado('overview.render_kpis')
+def render_kpis(agregados):
     """Renderiza KPIs principais"""
     st.markdown("### 📈 Métricas Principais")
+    kpis = agregados['kpis']
     
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
-        total_internacoes = len(data)
         st.metric(
             "Total de Internações",
-            f"{total_internacoes:,}",
+            f"{kpis['total_internacoes']:,}",
             delta=None,
             help="Número total de internações registradas"
         )
     
     with col2:
-        valor_total = data['valor_total'].sum()
         st.metric(
             "Valor Total",
-            f"R$ {valor_total:,.2f}",
+            f"R$ {kpis['valor_total']:,.2f}",
             delta=None,
             help="Valor total gasto com internações"
         )
     
     with col3:
-        media_permanencia = data['dias_permanencia'].mean()
         st.metric(
             "Média de Permanência",
-            f"{media_permanencia:.1f} dias",
+            f"{kpis['media_permanencia']:.1f} dias",
             delta=None,
             help="Tempo médio de permanência hospitalar"
         )
     
     with col4:
-        idade_media = data['idade_anos'].mean()
         st.metric(
             "Idade Média",
-            f"{idade_media:.1f} anos",
+            f"{kpis['idade_media']:.1f} anos",
             delta=None,
             help="Idade média dos pacientes internados"
         )
@@ -156,45 +252,41 @@ def render_kpis(data):
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
-        custo_medio = data['valor_total'].mean()
         st.metric(
             "Custo Médio/Internação",
-            f"R$ {custo_medio:.2f}",
+            f"R$ {kpis['custo_medio']:.2f}",
             help="Custo médio por internação"
         )
     
     with col2:
-        custo_dia = (data['valor_total'] / data['dias_permanencia']).mean()
         st.metric(
             "Custo Médio/Dia",
-            f"R$ {custo_dia:.2f}",
+            f"R$ {kpis['custo_dia']:.2f}",
             help="Custo médio por dia de internação"
         )
     
     with col3:
-        internacoes_urgencia = len(data[data['carater_internacao'] == 'Urgência'])
-        perc_urgencia = (internacoes_urgencia / len(data)) * 100 if len(data) > 0 else 0
         st.metric(
             "% Urgência",
-            f"{perc_urgencia:.1f}%",
+            f"{kpis['perc_urgencia']:.1f}%",
             help="Percentual de internações de urgência"
         )
     
     with col4:
-        idosos = len(data[data['idade_anos'] >= 60])
-        perc_idosos = (idosos / len(data)) * 100 if len(data) > 0 else 0
         st.metric(
             "% Idosos (60+)",
-            f"{perc_idosos:.1f}%",
+            f"{kpis['perc_idosos']:.1f}%",
             help="Percentual de pacientes idosos"
         )
 
-def render_principais_causas(data):
+@instrumentado('overview.render_principais_causas')
+def render_principais_causas(agregados):
     """Renderiza gráfico de principais causas"""
     st.markdown("### 🥧 Distribuição por Principais Causas")
     
     # Top 10 causas mais comuns
-    top_causas = data['diagnostico_principal'].value_counts().head(10)
+    top_causas = agregados['top_causas']
+    total = agregados['total_causas']
     
     col1, col2 = st.columns([2, 1])
     
@@ -214,21 +306,18 @@ def render_principais_causas(data):
         df_causas = pd.DataFrame({
             'Diagnóstico': top_causas.index,
             'Casos': top_causas.values,
-            'Percentual': (top_causas.values / len(data) * 100).round(1)
+            'Percentual': (top_causas.values / total * 100).round(1)
         })
         st.dataframe(df_causas, use_container_width=True)
 
-def render_analise_temporal(data):
+@instrumentado('overview.render_analise_temporal')
+def render_analise_temporal(agregados):
     """Renderiza análise temporal"""
     st.markdown("### 📊 Análise Temporal de Internações")
     
-    # Preparar dados temporais
-    data_temp = data.copy()
-    data_temp['periodo'] = data_temp['ano_competencia'].astype(str) + '-' + data_temp['mes_competencia'].astype(str).str.zfill(2)
-    
-    # Agrupar por período
-    internacoes_tempo = data_temp.groupby('periodo').size().reset_index(name='internacoes')
-    valores_tempo = data_temp.groupby('periodo')['valor_total'].sum().reset_index(name='valor_total')
+    # Internações e valores agrupados por período
+    internacoes_tempo = agregados['internacoes_tempo']
+    valores_tempo = agregados['valores_tempo']
     
     col1, col2 = st.columns(2)
     
@@ -256,26 +345,22 @@ def render_analise_temporal(data):
         fig.update_layout(height=300)
         st.plotly_chart(fig, use_container_width=True)
 
-def render_analise_custos(data):
-    """Renderiza análise de custos"""
+@instrumentado('overview.render_analise_custos')
+def render_analise_custos(agregados):
+    """Renderiza análise de custos; o gráfico de pontos usa a amostra estratificada, se houver"""
     st.markdown("### 💰 Análise de Custos e Valores")
     
     col1, col2 = st.columns(2)
     
     with col1:
         # Distribuição de custos
-        fig = px.histogram(
-            data,
-            x='valor_total',
-            nbins=30,
-            title="Distribuição de Custos das Internações"
-        )
+        fig = figura_histograma(agregados['hist_valor'], 'valor_total', "Distribuição de Custos das Internações")
         fig.update_layout(height=300)
         st.plotly_chart(fig, use_container_width=True)
     
     with col2:
         # Top 10 diagnósticos mais caros
-        custos_cid = data.groupby('diagnostico_principal')['valor_total'].sum().sort_values(ascending=False).head(10)
+        custos_cid = agregados['custos_cid']
         
         fig = px.bar(
             x=custos_cid.values,
@@ -285,8 +370,30 @@ def render_analise_custos(data):
         )
         fig.update_layout(height=300)
         st.plotly_chart(fig, use_container_width=True)
+    
+    # Custo x permanência: pontos da amostra (orçamento em GRAFICOS['pontos']), nunca a base inteira
+    amostra = agregados['amostra']
+    if agregados['estimativa_custo'] is not None:
+        fig = px.scatter(
+            amostra,
+            x='dias_permanencia',
+            y='valor_total',
+            opacity=0.4,
+            labels={'dias_permanencia': 'Dias de permanência', 'valor_total': 'Valor total (R$)'},
+            title="Custo x Tempo de Permanência"
+        )
+        fig.update_layout(height=350)
+        st.plotly_chart(fig, use_container_width=True)
+        
+        media, inferior, superior = agregados['estimativa_custo']
+        st.caption(
+            f"Amostra de {len(amostra):,} de {agregados['kpis']['total_internacoes']:,} internações, estratificada por competência; "
+            f"custo médio estimado pela amostra: R$ {media:,.2f} "
+            f"(IC {GRAFICOS['confianca']:.0%}: R$ {inferior:,.2f} a R$ {superior:,.2f})"
+        )
 
-def render_perfil_demografico(data):
+@instrumentado('overview.render_perfil_demografico')
+def render_perfil_demografico(agregados):
     """Renderiza perfil demográfico"""
     st.markdown("### 👥 Perfil Demográfico dos Pacientes")
     
@@ -294,18 +401,13 @@ def render_perfil_demografico(data):
     
     with col1:
         # Distribuição por idade
-        fig = px.histogram(
-            data,
-            x='idade_anos',
-            nbins=20,
-            title="Distribuição por Idade"
-        )
+        fig = figura_histograma(agregados['hist_idade'], 'idade_anos', "Distribuição por Idade")
         fig.update_layout(height=300)
         st.plotly_chart(fig, use_container_width=True)
     
     with col2:
         # Distribuição por sexo
-        sexo_counts = data['sexo'].value_counts()
+        sexo_counts = agregados['sexo_counts']
         
         fig = px.pie(
             values=sexo_counts.values,
@@ -315,7 +417,8 @@ def render_perfil_demografico(data):
         fig.update_layout(height=300)
         st.plotly_chart(fig, use_container_width=True)
 
-def render_tipo_internacao(data):
+@instrumentado('overview.render_tipo_internacao')
+def render_tipo_internacao(agregados):
     """Renderiza análise por tipo de internação"""
     st.markdown("### 🏥 Análise por Tipo de Internação")
     
@@ -323,7 +426,7 @@ def render_tipo_internacao(data):
     
     with col1:
         # Distribuição por tipo
-        tipo_counts = data['carater_internacao'].value_counts()
+        tipo_counts = agregados['tipo_counts']
         
         fig = px.bar(
             x=tipo_counts.index,
@@ -335,7 +438,7 @@ def render_tipo_internacao(data):
     
     with col2:
         # Custo médio por tipo
-        custo_tipo = data.groupby('carater_internacao')['valor_total'].mean()
+        custo_tipo = agregados['custo_tipo']
         
         fig = px.bar(
             x=custo_tipo.index,
@@ -345,7 +448,8 @@ def render_tipo_internacao(data):
         fig.update_layout(height=300)
         st.plotly_chart(fig, use_container_width=True)
 
-def render_tempo_permanencia(data):
+@instrumentado('overview.render_tempo_permanencia')
+def render_tempo_permanencia(agregados):
     """Renderiza análise de tempo de permanência"""
     st.markdown("### ⏱️ Tempo de Permanência")
     
@@ -353,23 +457,13 @@ def render_tempo_permanencia(data):
     
     with col1:
         # Distribuição de permanência
-        fig = px.histogram(
-            data,
-            x='dias_permanencia',
-            nbins=30,
-            title="Distribuição de Tempo de Permanência"
-        )
+        fig = figura_histograma(agregados['hist_permanencia'], 'dias_permanencia', "Distribuição de Tempo de Permanência")
         fig.update_layout(height=300)
         st.plotly_chart(fig, use_container_width=True)
     
     with col2:
         # Permanência por faixa etária
-        data_temp = data.copy()
-        data_temp['faixa_etaria'] = pd.cut(data_temp['idade_anos'], 
-                                          bins=[0, 18, 60, 100], 
-                                          labels=['0-18', '19-59', '60+'])
-        
-        perm_idade = data_temp.groupby('faixa_etaria')['dias_permanencia'].mean()
+        perm_idade = agregados['perm_idade']
         
         fig = px.bar(
             x=perm_idade.index,
@@ -379,7 +473,8 @@ def render_tempo_permanencia(data):
         fig.update_layout(height=300)
         st.plotly_chart(fig, use_container_width=True)
 
-def render_top_municipios(data):
+@instrumentado('overview.render_top_municipios')
+def render_top_municipios(agregados):
     """Renderiza top municípios"""
     st.markdown("### 🗺️ Top Municípios por Internações")
     
@@ -387,7 +482,7 @@ def render_top_municipios(data):
     
     with col1:
         # Top 10 municípios por quantidade
-        top_munic = data['codigo_municipio_residencia'].value_counts().head(10)
+        top_munic = agregados['top_munic']
         
         fig = px.bar(
             x=top_munic.values,
@@ -400,7 +495,7 @@ def render_top_municipios(data):
     
     with col2:
         # Top 10 municípios por custo
-        custo_munic = data.groupby('codigo_municipio_residencia')['valor_total'].sum().sort_values(ascending=False).head(10)
+        custo_munic = agregados['custo_munic']
         
         fig = px.bar(
             x=custo_munic.values,
@@ -411,7 +506,8 @@ def render_top_municipios(data):
         fig.update_layout(height=300)
         st.plotly_chart(fig, use_container_width=True)
 
-def render_insights_alertas(data):
+@instrumentado('overview.render_insights_alertas')
+def render_insights_alertas(agregados):
     """Renderiza insights e alertas"""
     st.markdown("### ⚡ Insights e Alertas Importantes")
     
@@ -420,17 +516,14 @@ def render_insights_alertas(data):
     with col1:
         st.markdown("#### 🔍 Insights Principais")
         
-        # Calcular insights
-        total_internacoes = len(data)
-        valor_total = data['valor_total'].sum()
-        causa_principal = data['diagnostico_principal'].value_counts().index[0] if len(data) > 0 else "N/A"
-        perc_urgencia = (len(data[data['carater_internacao'] == 'Urgência']) / len(data)) * 100 if len(data) > 0 else 0
+        kpis = agregados['kpis']
+        perc_urgencia = kpis['perc_urgencia']
         
         st.info(f"""
         **Resumo Executivo:**
-        - Total de {total_internacoes:,} internações registradas
-        - Investimento total de R$ {valor_total:,.2f}
-        - Principal causa: {causa_principal}
+        - Total de {kpis['total_internacoes']:,} internações registradas
+        - Investimento total de R$ {kpis['valor_total']:,.2f}
+        - Principal causa: {agregados['causa_principal']}
         - {perc_urgencia:.1f}% das internações são de urgência
         """)
     
@@ -443,12 +536,10 @@ def render_insights_alertas(data):
         if perc_urgencia > 70:
             alertas.append("⚠️ Alto percentual de internações de urgência")
         
-        custo_medio = data['valor_total'].mean()
-        if custo_medio > 1000:
+        if kpis['custo_medio'] > 1000:
             alertas.append("💰 Custo médio por internação elevado")
         
-        idosos_perc = (len(data[data['idade_anos'] >= 60]) / len(data)) * 100 if len(data) > 0 else 0
-        if idosos_perc > 40:
+        if kpis['perc_idosos'] > 40:
             alertas.append("👴 Alto percentual de pacientes idosos")
         
         if alertas:
@@ -457,8 +548,14 @@ def render_insights_alertas(data):
         else:
             st.success("✅ Nenhum alerta crítico identificado")
 
-def render(data):
-    """Renderiza a página de Visão Geral"""
+@instrumentado('overview.render')
+def render(data, resumos=None, amostra=None, competencias=None, versao=None):
+    """
+    Renderiza a página de Visão Geral
+    'resumos' são os resumos aproximados das partições do período; valem só sem os demais filtros
+    'amostra' é a amostra estratificada da base para os gráficos de pontos (recebe os mesmos filtros)
+    As agregações ficam em cache por filtros, competências carregadas e versão dos dados
+    """
     
     st.markdown("## 📊 Visão Geral")
     
@@ -467,50 +564,52 @@ def render(data):
     
     st.markdown("---")
     
-    # Renderizar filtros
+    # Renderizar filtros e agregar os dados filtrados
     filters = render_filters()
-    
-    # Aplicar filtros aos dados
-    filtered_data = apply_filters(data, filters)
+    resultado = agregados(data, resumos, amostra, filters, competencias, versao)
     
     # Mostrar informações sobre filtros aplicados
-    if len(filtered_data) < len(data):
-        st.info(f"📊 Mostrando {len(filtered_data):,} de {len(data):,} registros (filtros aplicados)")
+    total = resultado['kpis']['total_internacoes']
+    if total < resultado['linhas_base']:
+        st.info(f"📊 Mostrando {total:,} de {resultado['linhas_base']:,} registros (filtros aplicados)")
+    
+    if resultado['usa_resumos']:
+        st.caption("Rankings e distribuições calculados a partir dos resumos aproximados das partições")
     
     st.markdown("---")
     
     # Renderizar visualizações selecionadas
     if "📈 Métricas Principais (KPIs)" in selected_options:
-        render_kpis(filtered_data)
+        render_kpis(resultado)
         st.markdown("---")
     
     if "🥧 Distribuição por Principais Causas" in selected_options:
-        render_principais_causas(filtered_data)
+        render_principais_causas(resultado)
         st.markdown("---")
     
     if "📊 Análise Temporal de Internações" in selected_options:
-        render_analise_temporal(filtered_data)
+        render_analise_temporal(resultado)
         st.markdown("---")
     
     if "💰 Análise de Custos e Valores" in selected_options:
-        render_analise_custos(filtered_data)
+        render_analise_custos(resultado)
         st.markdown("---")
     
     if "👥 Perfil Demográfico dos Pacientes" in selected_options:
-        render_perfil_demografico(filtered_data)
+        render_perfil_demografico(resultado)
         st.markdown("---")
     
     if "🏥 Análise por Tipo de Internação" in selected_options:
-        render_tipo_internacao(filtered_data)
+        render_tipo_internacao(resultado)
         st.markdown("---")
     
     if "⏱️ Tempo de Permanência" in selected_options:
-        render_tempo_permanencia(filtered_data)
+        render_tempo_permanencia(resultado)
         st.markdown("---")
     
     if "🗺️ Top Municípios por Internações" in selected_options:
-        render_top_municipios(filtered_data)
+        render_top_municipios(resultado)
         st.markdown("---")
     
     if "⚡ Insights e Alertas Importantes" in selected_options:
-        render_insights_alertas(filtered_data)
\ No newline at end of file
+        render_insights_alertas(resultado)
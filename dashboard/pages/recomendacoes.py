@@ -1,9 +1,95 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
 
-def render(data):
+from config.taxas import TODOS
+from instrumentacao import instrumentado
+
+# Mínimo de internações para um diagnóstico ou município entrar no ranking de reinternação
+MINIMO_INTERNACOES_TAXA = 30
+
+def taxas_reinternacao(data, coluna, minimo=MINIMO_INTERNACOES_TAXA):
+    """Internações, reinternações seguintes e taxa (%) por valor da coluna, maiores taxas primeiro"""
+    taxas = data.groupby(coluna, observed=True)['gerou_reinternacao'].agg(internacoes='size', reinternacoes='sum')
+    taxas = taxas[taxas['internacoes'] >= minimo]
+    taxas['taxa'] = (taxas['reinternacoes'] / taxas['internacoes'] * 100).round(1)
+    return taxas.sort_values('taxa', ascending=False)
+
+@instrumentado('recomendacoes.reinternacoes')
+@st.cache_data
+def reinternacoes(_data, versao=None):
+    """
+    Totais e maiores taxas de reinternação da base, em cache pela versão dos dados
+    None se as reinternações ainda não foram calculadas
+    """
+    if 'reinternacao' not in _data.columns or not _data['reinternacao'].notna().any():
+        return None
+    
+    marcadas = _data['reinternacao'].fillna(0).astype(bool)
+    return {
+        'total': int(marcadas.sum()),
+        'taxa': marcadas.mean() * 100,
+        'diagnosticos': taxas_reinternacao(_data, 'diagnostico_principal').head(10),
+        'municipios': taxas_reinternacao(_data, 'codigo_municipio_residencia').head(10),
+    }
+
+# Agregações em cache da página (descartadas pelo dashboard quando a versão dos dados muda)
+AGREGACOES = [reinternacoes]
+
+@instrumentado('recomendacoes.render_reinternacoes')
+def render_reinternacoes(data, versao=None):
+    """Indicador de reinternações em até 30 dias, por diagnóstico e município de residência"""
+    st.markdown("### 🔁 Reinternações em até 30 dias")
+    
+    resultado = reinternacoes(data, versao)
+    if resultado is None:
+        st.info("Reinternações ainda não calculadas; execute `scripts/reinternacoes.py`")
+        return
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.metric("Reinternações", f"{resultado['total']:,}")
+    
+    with col2:
+        st.metric("Taxa de Reinternação", f"{resultado['taxa']:.1f}%")
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.markdown("**Diagnósticos com Maior Taxa**")
+        st.dataframe(resultado['diagnosticos'], use_container_width=True)
+    
+    with col2:
+        st.markdown("**Municípios com Maior Taxa**")
+        st.dataframe(resultado['municipios'], use_container_width=True)
+
+@instrumentado('recomendacoes.render_taxas_diagnosticos')
+def render_taxas_diagnosticos(taxas, minimo=MINIMO_INTERNACOES_TAXA):
+    """Combinações município x diagnóstico com maior taxa padronizada no período inteiro"""
+    st.markdown("### 📏 Diagnósticos com Maior Taxa por Habitante")
+    
+    if taxas is None:
+        st.info("Taxas por habitante indisponíveis; execute `scripts/taxas_populacionais.py` com as estimativas populacionais")
+        return
+    
+    celulas = taxas[(taxas['periodo'] == TODOS) & (taxas['cid'] != TODOS) & (taxas['internacoes'] >= minimo)]
+    st.dataframe(
+        celulas.nlargest(10, 'taxa_padronizada')[[
+            'cid', 'codigo_municipio', 'municipio', 'internacoes', 'taxa_padronizada', 'custo_padronizado'
+        ]].rename(columns={
+            'cid': 'CID',
+            'codigo_municipio': 'Código',
+            'municipio': 'Município',
+            'internacoes': 'Internações',
+            'taxa_padronizada': 'Taxa Padronizada',
+            'custo_padronizado': 'Custo Padronizado (R$)'
+        }).round(2),
+        hide_index=True,
+        use_container_width=True
+    )
+
+@instrumentado('recomendacoes.render')
+def render(data, taxas=None, versao=None):
     """
     Página de Recomendações
     
@@ -19,6 +105,12 @@ def render(data):
     st.title("💡 Recomendações para Gestão")
     st.markdown("---")
     
+    render_reinternacoes(data, versao)
+    st.markdown("---")
+    
+    render_taxas_diagnosticos(taxas)
+    st.markdown("---")
+    
     # Placeholder para desenvolvimento
     st.info("🚧 **Área de Desenvolvimento - Recomendações**")
     st.markdown("""
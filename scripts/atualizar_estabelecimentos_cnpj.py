@@ -1,10 +1,16 @@
 import sqlite3
 import os
+import sys
 import requests
 import json
 import time
 import re
 
+# Adiciona o diretório raiz ao path para importar as consultas registradas
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.consultas import CONSULTAS
+
 def limpar_cnpj(cnpj_bruto):
     """
     Limpa e formata CNPJ removendo decimais e caracteres especiais
@@ -154,7 +160,8 @@ def atualizar_estabelecimentos_database():
         print(f"   Esperado em: {db_path}")
         return False
     
-    conn = sqlite3.connect(db_path)
+    # Timeout maior: as etapas de enriquecimento podem rodar em paralelo (scripts/pipeline.py)
+    conn = sqlite3.connect(db_path, timeout=60)
     cursor = conn.cursor()
     
     try:
@@ -188,6 +195,10 @@ def atualizar_estabelecimentos_database():
         atualizados_fallback = 0
         nao_encontrados = 0
         
+        # Atualizações acumuladas e gravadas de uma vez no final, sem segurar o lock
+        # de escrita do banco durante as consultas às APIs
+        atualizacoes = []
+        
         # Processar todos os CNPJs
         cnpjs_para_processar = cnpjs_brutos
         print(f"   Processando todos os {len(cnpjs_para_processar)} CNPJs únicos...")
@@ -235,17 +246,19 @@ def atualizar_estabelecimentos_database():
                     nao_encontrados += 1
                     print(f"   ⚠️ Não encontrado, usando nome padrão")
             
-            # Atualizar no banco
-            cursor.execute('''
-                UPDATE estabelecimentos 
-                SET nome_estabelecimento = ?, tipo_estabelecimento = ?
-                WHERE cnpj_hospital = ?
-            ''', (nome_encontrado, tipo_encontrado, cnpj_bruto))
+            atualizacoes.append((nome_encontrado, tipo_encontrado, cnpj_bruto))
             
             # Pausa entre requisições para não sobrecarregar APIs
             if fonte != 'Local' and fonte != 'Padrão':
                 time.sleep(1)
         
+        # Atualizar no banco
+        cursor.executemany('''
+            UPDATE estabelecimentos 
+            SET nome_estabelecimento = ?, tipo_estabelecimento = ?
+            WHERE cnpj_hospital = ?
+        ''', atualizacoes)
+        
         conn.commit()
         
         print(f"\n✅ Atualização concluída:")
@@ -255,16 +268,7 @@ def atualizar_estabelecimentos_database():
         print(f"   - Total processado: {len(cnpjs_para_processar)}")
         
         # Verificar resultados
-        cursor.execute('''
-            SELECT 
-                tipo_estabelecimento,
-                COUNT(DISTINCT cnpj_hospital) as estabelecimentos,
-                COUNT(DISTINCT i.id) as internacoes
-            FROM estabelecimentos e
-            LEFT JOIN internacoes i ON e.id = i.estabelecimento_id
-            GROUP BY tipo_estabelecimento
-            ORDER BY COUNT(DISTINCT i.id) DESC
-        ''')
+        cursor.execute(CONSULTAS['relatorio_estabelecimentos_tipos'])
         
         print(f"\n📊 Estabelecimentos por tipo:")
         for tipo, estabelecimentos, internacoes in cursor.fetchall():
@@ -273,15 +277,7 @@ def atualizar_estabelecimentos_database():
         
         # Top 10 estabelecimentos
         print(f"\n🏆 Top 10 estabelecimentos:")
-        cursor.execute('''
-            SELECT e.nome_estabelecimento, COUNT(i.id) as internacoes
-            FROM estabelecimentos e
-            LEFT JOIN internacoes i ON e.id = i.estabelecimento_id
-            WHERE e.nome_estabelecimento IS NOT NULL
-            GROUP BY e.cnpj_hospital, e.nome_estabelecimento
-            ORDER BY COUNT(i.id) DESC
-            LIMIT 10
-        ''')
+        cursor.execute(CONSULTAS['relatorio_estabelecimentos_top'])
         
         for nome, internacoes in cursor.fetchall():
             if internacoes > 0:
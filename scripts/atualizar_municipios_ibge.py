@@ -1,8 +1,14 @@
 import sqlite3
 import os
+import sys
 import requests
 import json
 
+# Adiciona o diretório raiz ao path para importar as consultas registradas
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.consultas import CONSULTAS
+
 def get_municipios_fallback():
     """
     Lista de fallback com os principais municípios do Paraná
@@ -154,7 +160,8 @@ def atualizar_municipios_database():
             print("❌ Falha total: nem API nem fallback funcionaram")
             return False
     
-    conn = sqlite3.connect(db_path)
+    # Timeout maior: as etapas de enriquecimento podem rodar em paralelo (scripts/pipeline.py)
+    conn = sqlite3.connect(db_path, timeout=60)
     cursor = conn.cursor()
     
     try:
@@ -236,20 +243,7 @@ def atualizar_municipios_database():
         print(f"   - Não identificados: {nao_encontrados}")
         
         # Verificar resultados
-        cursor.execute('''
-            SELECT 
-                CASE 
-                    WHEN nome = 'Outros Estados' THEN 'Outros Estados'
-                    WHEN nome = 'Município Não Identificado' THEN 'Não Identificado'
-                    ELSE 'Paraná'
-                END as categoria,
-                COUNT(DISTINCT m.codigo) as municipios,
-                COUNT(DISTINCT p.id) as pacientes
-            FROM municipios m
-            LEFT JOIN pacientes p ON m.codigo = p.codigo_municipio_residencia
-            GROUP BY categoria
-            ORDER BY COUNT(DISTINCT p.id) DESC
-        ''')
+        cursor.execute(CONSULTAS['relatorio_municipios_categorias'])
         
         print(f"\n📊 Distribuição final:")
         for categoria, municipios, pacientes in cursor.fetchall():
@@ -257,15 +251,7 @@ def atualizar_municipios_database():
         
         # Top 10 municípios do Paraná
         print(f"\n🏆 Top 10 municípios do Paraná:")
-        cursor.execute('''
-            SELECT m.nome, COUNT(p.id) as pacientes
-            FROM municipios m
-            LEFT JOIN pacientes p ON m.codigo = p.codigo_municipio_residencia
-            WHERE m.regiao_saude = 'Paraná'
-            GROUP BY m.codigo, m.nome
-            ORDER BY COUNT(p.id) DESC
-            LIMIT 10
-        ''')
+        cursor.execute(CONSULTAS['relatorio_municipios_top'])
         
         for nome, pacientes in cursor.fetchall():
             print(f"   - {nome}: {pacientes:,} pacientes")
@@ -1,7 +1,15 @@
 import sqlite3
 import os
+import sys
 import requests
 import json
+import pandas as pd
+import numpy as np
+
+# Adiciona o diretório raiz ao path para importar as consultas registradas
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.consultas import CONSULTAS
 
 def get_procedimentos_fallback():
     """
@@ -56,10 +64,67 @@ def get_procedimentos_fallback():
     
     return procedimentos_sus
 
+# Layout de tb_procedimento.txt (SIGTAP): campo, início, fim (fatia Python) e tipo
+LAYOUT_TB_PROCEDIMENTO = [
+    ('codigo', 0, 10, 'texto'),
+    ('nome', 10, 260, 'texto'),
+    ('complexidade', 260, 261, 'texto'),
+    ('sexo', 261, 262, 'texto'),
+    ('qt_maxima_execucao', 262, 266, 'inteiro'),
+    ('qt_dias_permanencia', 266, 270, 'inteiro'),
+    ('qt_pontos', 270, 274, 'inteiro'),
+    ('idade_minima_meses', 274, 278, 'inteiro'),
+    ('idade_maxima_meses', 278, 282, 'inteiro'),
+    ('valor_sh', 282, 292, 'valor'),
+    ('valor_sa', 292, 302, 'valor'),
+    ('valor_sp', 302, 312, 'valor'),
+    ('codigo_financiamento', 312, 314, 'texto'),
+    ('codigo_rubrica', 314, 320, 'texto'),
+    ('qt_tempo_permanencia', 320, 324, 'inteiro'),
+    ('competencia', 324, 330, 'texto'),
+]
+
+TAMANHO_REGISTRO_PROCEDIMENTO = 330
+
+# Tabela única de tradução: remove acentos e troca caracteres cp1252 soltos
+TABELA_ACENTOS = str.maketrans(
+    'ÀÁÂÃÄÇÈÉÊËÌÍÎÏÒÓÔÕÖÙÚÛÜàáâãäçèéêëìíîïòóôõöùúûü\x93\x94\x96\xa0',
+    'AAAAACEEEEIIIIOOOOOUUUUaaaaaceeeeiiiiooooouuuu""- '
+)
+
+def ler_tb_procedimento(arquivo_path):
+    """
+    Lê o arquivo tb_procedimento.txt do SIGTAP (largura fixa) em um DataFrame tipado
+    O arquivo é decodificado uma única vez e todos os campos são fatiados por coluna
+    """
+    
+    with open(arquivo_path, 'rb') as file:
+        texto = file.read().decode('latin-1').translate(TABELA_ACENTOS)
+    
+    linhas = pd.Series(texto.splitlines(), dtype=object)
+    linhas = linhas[linhas.str.len() == TAMANHO_REGISTRO_PROCEDIMENTO]
+    
+    colunas = {}
+    for campo, inicio, fim, tipo in LAYOUT_TB_PROCEDIMENTO:
+        fatia = linhas.str.slice(inicio, fim)
+        if tipo == 'inteiro':
+            colunas[campo] = pd.to_numeric(fatia, errors='coerce').astype('Int64')
+        elif tipo == 'valor':
+            # Valores monetários com 2 casas decimais implícitas
+            colunas[campo] = pd.to_numeric(fatia, errors='coerce') / 100
+        else:
+            colunas[campo] = fatia.str.strip()
+    
+    procedimentos = pd.DataFrame(colunas)
+    procedimentos['nome'] = procedimentos['nome'].str.replace(r'\s+', ' ', regex=True)
+    procedimentos = procedimentos[procedimentos['codigo'].str.fullmatch(r'\d{10}') & (procedimentos['nome'] != '')]
+    
+    return procedimentos.drop_duplicates('codigo', keep='last').set_index('codigo')
+
 def carregar_procedimentos_arquivo():
     """
     Carrega procedimentos do arquivo TXT fornecido pelo usuário
-    Formato: código de 10 dígitos seguido da descrição
+    Formato: layout de largura fixa do SIGTAP (ver LAYOUT_TB_PROCEDIMENTO)
     """
     
     arquivo_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data', 'raw', 'tb_procedimento.txt')
@@ -70,127 +135,197 @@ def carregar_procedimentos_arquivo():
         print(f"❌ Arquivo não encontrado: {arquivo_path}")
         return {}
     
-    procedimentos_dict = {}
-    linhas_processadas = 0
-    linhas_erro = 0
-    
     try:
-        with open(arquivo_path, 'r', encoding='latin-1') as file:
-            for linha_num, linha in enumerate(file, 1):
-                try:
-                    linha = linha.strip()
-                    if not linha:
-                        continue
-                    
-                    # Extrair código (primeiros 10 caracteres)
-                    codigo = linha[:10]
-                    
-                    # Extrair descrição (começando do caractere 10 até antes dos dados finais)
-                    # A descrição vai até aproximadamente a posição 300, depois vêm dados numéricos
-                    descricao_completa = linha[10:300].strip()
-                    
-                    # Limpar a descrição removendo espaços extras
-                    palavras = descricao_completa.split()
-                    
-                    # Filtrar palavras: manter apenas as que contêm letras (remover códigos numéricos)
-                    palavras_filtradas = []
-                    for palavra in palavras:
-                        # Parar se encontrar códigos longos (mais que 3 dígitos seguidos)
-                        if len(palavra) > 3 and palavra.isdigit():
-                            break
-                        # Parar se encontrar padrões como "2I00010001"
-                        if len(palavra) > 5 and any(c.isdigit() for c in palavra) and any(c.isalpha() for c in palavra):
-                            # Se mais da metade são números, provavelmente é código
-                            num_digits = sum(1 for c in palavra if c.isdigit())
-                            if num_digits > len(palavra) / 2:
-                                break
-                        # Manter palavra se contém principalmente letras
-                        if any(c.isalpha() for c in palavra):
-                            palavras_filtradas.append(palavra)
-                    
-                    # Pegar no máximo as primeiras 15 palavras válidas
-                    descricao = ' '.join(palavras_filtradas[:15])
-                    
-                    # Remover caracteres especiais e normalizar
-                    descricao = descricao.replace('À', 'A').replace('Ã', 'A').replace('Á', 'A')
-                    descricao = descricao.replace('É', 'E').replace('Ê', 'E')
-                    descricao = descricao.replace('Í', 'I').replace('Î', 'I')
-                    descricao = descricao.replace('Ó', 'O').replace('Ô', 'O').replace('Õ', 'O')
-                    descricao = descricao.replace('Ú', 'U').replace('Ü', 'U')
-                    descricao = descricao.replace('Ç', 'C')
-                    descricao = descricao.replace('ì', 'i').replace('í', 'i')
-                    descricao = descricao.replace('ã', 'a').replace('à', 'a').replace('á', 'a')
-                    descricao = descricao.replace('é', 'e').replace('ê', 'e')
-                    descricao = descricao.replace('ó', 'o').replace('ô', 'o').replace('õ', 'o')
-                    descricao = descricao.replace('ú', 'u').replace('ü', 'u')
-                    descricao = descricao.replace('ç', 'c')
-                    
-                    # Limpar espaços extras e caracteres especiais no final
-                    descricao = ' '.join(descricao.split())
-                    
-                    if len(codigo) == 10 and descricao:
-                        # Classificar procedimento por código
-                        grupo = classificar_procedimento_por_codigo(codigo)
-                        
-                        procedimentos_dict[codigo] = {
-                            'nome': descricao.title(),
-                            'grupo': grupo
-                        }
-                        
-                        linhas_processadas += 1
-                        
-                        # Mostrar primeiros 10 procedimentos
-                        if linhas_processadas <= 10:
-                            print(f"   {codigo}: {descricao.title()}")
-                    else:
-                        linhas_erro += 1
-                        
-                except Exception as e:
-                    linhas_erro += 1
-                    if linhas_erro <= 5:
-                        print(f"   ⚠️ Erro na linha {linha_num}: {e}")
-    
+        procedimentos = ler_tb_procedimento(arquivo_path)
     except Exception as e:
         print(f"❌ Erro ao ler arquivo: {e}")
         return {}
     
-    print(f"✅ {linhas_processadas} procedimentos carregados com sucesso")
-    if linhas_erro > 0:
-        print(f"   ⚠️ {linhas_erro} linhas com erro")
+    nomes = procedimentos['nome'].str.title()
+    
+    # Mostrar primeiros 10 procedimentos
+    for codigo, nome in nomes.head(10).items():
+        print(f"   {codigo}: {nome}")
+    
+    grupos = classificar_codigos(nomes.index)['grupo_procedimento'].to_numpy()
+    
+    procedimentos_dict = {
+        codigo: {'nome': nome, 'grupo': grupo}
+        for codigo, nome, grupo in zip(nomes.index, nomes, grupos)
+    }
+    
+    print(f"✅ {len(procedimentos_dict)} procedimentos carregados com sucesso")
     
     return procedimentos_dict
 
+# Hierarquia SIGTAP: grupos (2 dígitos) e subgrupos (4 dígitos) do código de procedimento.
+# Formas de organização (6 dígitos) são lidas de tb_forma_organizacao.txt quando disponível.
+HIERARQUIA_SIGTAP = {
+    '01': 'Ações de promoção e prevenção em saúde',
+    '0101': 'Ações coletivas/individuais em saúde',
+    '0102': 'Vigilância em saúde',
+    '02': 'Procedimentos com finalidade diagnóstica',
+    '0201': 'Coleta de material',
+    '0202': 'Diagnóstico em laboratório clínico',
+    '0203': 'Diagnóstico por anatomia patológica e citopatologia',
+    '0204': 'Diagnóstico por radiologia',
+    '0205': 'Diagnóstico por ultrassonografia',
+    '0206': 'Diagnóstico por tomografia',
+    '0207': 'Diagnóstico por ressonância magnética',
+    '0208': 'Diagnóstico por medicina nuclear in vivo',
+    '0209': 'Diagnóstico por endoscopia',
+    '0210': 'Diagnóstico por radiologia intervencionista',
+    '0211': 'Métodos diagnósticos em especialidades',
+    '0212': 'Diagnóstico e procedimentos especiais em hemoterapia',
+    '0213': 'Diagnóstico em vigilância epidemiológica e ambiental',
+    '0214': 'Diagnóstico por teste rápido',
+    '03': 'Procedimentos clínicos',
+    '0301': 'Consultas / Atendimentos / Acompanhamentos',
+    '0302': 'Fisioterapia',
+    '0303': 'Tratamentos clínicos (outras especialidades)',
+    '0304': 'Tratamento em oncologia',
+    '0305': 'Tratamento em nefrologia',
+    '0306': 'Hemoterapia',
+    '0307': 'Tratamentos odontológicos',
+    '0308': 'Tratamento de lesões, envenenamentos e outros, decorrentes de causas externas',
+    '0309': 'Terapias especializadas',
+    '0310': 'Parto e nascimento',
+    '04': 'Procedimentos cirúrgicos',
+    '0401': 'Pequenas cirurgias e cirurgias de pele, tecido subcutâneo e mucosa',
+    '0402': 'Cirurgia de glândulas endócrinas',
+    '0403': 'Cirurgia do sistema nervoso central e periférico',
+    '0404': 'Cirurgia das vias aéreas superiores, da face, da cabeça e do pescoço',
+    '0405': 'Cirurgia do aparelho da visão',
+    '0406': 'Cirurgia do aparelho circulatório',
+    '0407': 'Cirurgia do aparelho digestivo, órgãos anexos e parede abdominal',
+    '0408': 'Cirurgia do sistema osteomuscular',
+    '0409': 'Cirurgia do aparelho geniturinário',
+    '0410': 'Cirurgia de mama',
+    '0411': 'Cirurgia obstétrica',
+    '0412': 'Cirurgia torácica',
+    '0413': 'Cirurgia reparadora',
+    '0414': 'Cirurgia bucomaxilofacial',
+    '0415': 'Outras cirurgias',
+    '0416': 'Cirurgia em oncologia',
+    '0417': 'Anestesiologia',
+    '0418': 'Cirurgia em nefrologia',
+    '05': 'Transplantes de órgãos, tecidos e células',
+    '0501': 'Coleta e exames para fins de doação de órgãos, tecidos e células e de transplante',
+    '0502': 'Avaliação de morte encefálica',
+    '0503': 'Ações relacionadas à doação de órgãos e tecidos para transplante',
+    '0504': 'Processamento de tecidos para transplante',
+    '0505': 'Transplante de órgãos, tecidos e células',
+    '0506': 'Acompanhamento e intercorrências no pré e pós-transplante',
+    '06': 'Medicamentos',
+    '0601': 'Medicamentos de dispensação excepcional',
+    '0602': 'Medicamentos estratégicos',
+    '0603': 'Medicamentos de âmbito hospitalar e urgência',
+    '0604': 'Componente especializado da assistência farmacêutica',
+    '07': 'Órteses, próteses e materiais especiais',
+    '0701': 'Órteses, próteses e materiais especiais não relacionados ao ato cirúrgico',
+    '0702': 'Órteses, próteses e materiais especiais relacionados ao ato cirúrgico',
+    '08': 'Ações complementares da atenção à saúde',
+    '0801': 'Ações relacionadas ao estabelecimento',
+    '0802': 'Ações relacionadas ao atendimento',
+    '0803': 'Autorização / Regulação',
+}
+
+# Arquivos do SIGTAP com a hierarquia completa: tamanho do prefixo de cada nível
+ARQUIVOS_HIERARQUIA_SIGTAP = {
+    'tb_grupo.txt': 2,
+    'tb_sub_grupo.txt': 4,
+    'tb_forma_organizacao.txt': 6,
+}
+
+NIVEIS_SIGTAP = {2: 'grupo', 4: 'subgrupo', 6: 'forma_organizacao'}
+
+_tabela_faixas = None
+
+def carregar_hierarquia_sigtap():
+    """
+    Monta a hierarquia grupo/subgrupo/forma de organização do SIGTAP
+    Usa HIERARQUIA_SIGTAP como base e completa com os arquivos tb_*.txt do SIGTAP, se existirem
+    """
+    
+    raw_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data', 'raw')
+    hierarquia = dict(HIERARQUIA_SIGTAP)
+    
+    for nome_arquivo, tamanho_prefixo in ARQUIVOS_HIERARQUIA_SIGTAP.items():
+        arquivo_path = os.path.join(raw_dir, nome_arquivo)
+        if not os.path.exists(arquivo_path):
+            continue
+        
+        with open(arquivo_path, 'rb') as file:
+            texto = file.read().decode('latin-1').translate(TABELA_ACENTOS)
+        
+        for linha in texto.splitlines():
+            prefixo = linha[:tamanho_prefixo]
+            nome = ' '.join(linha[tamanho_prefixo:tamanho_prefixo + 100].split())
+            if prefixo.isdigit() and nome:
+                hierarquia[prefixo] = nome.capitalize()
+    
+    return hierarquia
+
+def montar_tabela_faixas(hierarquia):
+    """
+    Converte a hierarquia em faixas ordenadas de códigos numéricos por nível
+    Cada prefixo de n dígitos cobre o intervalo [prefixo * 10^(10-n), (prefixo + 1) * 10^(10-n))
+    """
+    
+    tabela = {}
+    for tamanho_prefixo, nivel in NIVEIS_SIGTAP.items():
+        prefixos = sorted(p for p in hierarquia if len(p) == tamanho_prefixo)
+        escala = 10 ** (10 - tamanho_prefixo)
+        inicio = np.array([int(p) for p in prefixos], dtype=np.int64) * escala
+        tabela[nivel] = {
+            'inicio': inicio,
+            'fim': inicio + escala,
+            'nomes': np.array([hierarquia[p] for p in prefixos] + [None], dtype=object),
+        }
+    return tabela
+
+def classificar_codigos(codigos, tabela=None):
+    """
+    Classifica uma coluna inteira de códigos SIGTAP com uma busca binária vetorizada por nível
+    Retorna um DataFrame com grupo, subgrupo, forma_organizacao e grupo_procedimento: o subgrupo
+    ou, sem ele, o grupo (a forma de organização detalha demais para agrupar os relatórios)
+    """
+    
+    global _tabela_faixas
+    if tabela is None:
+        if _tabela_faixas is None:
+            _tabela_faixas = montar_tabela_faixas(carregar_hierarquia_sigtap())
+        tabela = _tabela_faixas
+    
+    codigos = pd.Series(codigos, dtype=object)
+    # Códigos gravados sem o zero à esquerda (ex.: '303140151') voltam a ter 10 dígitos
+    texto = codigos.astype(str).str.strip().str.zfill(10)
+    valores = pd.to_numeric(texto.where(texto.str.fullmatch(r'\d{10}')), errors='coerce')
+    numeros = valores.fillna(-1).to_numpy(dtype=np.int64)
+    
+    resultado = pd.DataFrame(index=codigos.index)
+    for nivel, faixas in tabela.items():
+        if len(faixas['inicio']) == 0:
+            resultado[nivel] = None
+            continue
+        posicao = np.searchsorted(faixas['inicio'], numeros, side='right') - 1
+        dentro = (posicao >= 0) & (numeros < faixas['fim'][posicao.clip(0)])
+        # Índice -1 aponta para o None ao final de 'nomes'
+        resultado[nivel] = faixas['nomes'][np.where(dentro, posicao, -1)]
+    
+    resultado['grupo_procedimento'] = (
+        resultado['subgrupo']
+        .fillna(resultado['grupo'])
+        .fillna('Outros Procedimentos')
+    )
+    return resultado
+
 def classificar_procedimento_por_codigo(codigo):
     """
     Classifica procedimento baseado no padrão do código SUS
     """
     
-    if codigo.startswith('201'):
-        return 'Transplantes'
-    elif codigo.startswith('209'):
-        return 'Quimioterapia/Oncologia'
-    elif codigo.startswith('211'):
-        return 'Radioterapia'
-    elif codigo.startswith('301'):
-        return 'Consultas e Atendimentos'
-    elif codigo.startswith('303'):
-        return 'Procedimentos Clínicos'
-    elif codigo.startswith('304'):
-        return 'Exames e Diagnósticos'
-    elif codigo.startswith('310'):
-        return 'Obstetrícia e Parto'
-    elif codigo.startswith('401'):
-        return 'Vigilância em Saúde'
-    elif codigo.startswith('404'):
-        return 'Fisioterapia'
-    elif codigo.startswith('407'):
-        return 'Terapias'
-    elif codigo.startswith('411'):
-        return 'Cirurgias Oftalmológicas'
-    elif codigo.startswith('415'):
-        return 'Cirurgias Ortopédicas'
-    else:
-        return 'Outros Procedimentos'
+    return classificar_codigos([codigo])['grupo_procedimento'].iloc[0]
 
 def atualizar_procedimentos_database():
     """
@@ -214,7 +349,8 @@ def atualizar_procedimentos_database():
     else:
         procedimentos_conhecidos = procedimentos_arquivo
     
-    conn = sqlite3.connect(db_path)
+    # Timeout maior: as etapas de enriquecimento podem rodar em paralelo (scripts/pipeline.py)
+    conn = sqlite3.connect(db_path, timeout=60)
     cursor = conn.cursor()
     
     try:
@@ -231,11 +367,15 @@ def atualizar_procedimentos_database():
         
         print(f"\n📊 Códigos únicos de procedimentos: {len(codigos_banco)}")
         
+        # Classificar todos os códigos do banco de uma vez pela hierarquia SIGTAP
+        grupos_banco = classificar_codigos(codigos_banco)['grupo_procedimento'].to_numpy()
+        
         # Atualizar descrições dos procedimentos
         atualizados = 0
         nao_encontrados = 0
+        registros = []
         
-        for codigo_banco in codigos_banco:
+        for codigo_banco, grupo_hierarquia in zip(codigos_banco, grupos_banco):
             nome_atualizado = None
             grupo_atualizado = None
             
@@ -257,15 +397,17 @@ def atualizar_procedimentos_database():
             else:
                 # Classificar por padrão do código
                 nome_atualizado = f'Procedimento {codigo_banco}'
-                grupo_atualizado = classificar_procedimento_por_codigo(codigo_banco)
+                grupo_atualizado = grupo_hierarquia
                 nao_encontrados += 1
             
-            # Atualizar no banco
-            cursor.execute('''
-                UPDATE procedimentos 
-                SET descricao = ?, grupo_procedimento = ?
-                WHERE codigo = ?
-            ''', (nome_atualizado, grupo_atualizado, codigo_banco))
+            registros.append((nome_atualizado, grupo_atualizado, codigo_banco))
+        
+        # Atualizar no banco
+        cursor.executemany('''
+            UPDATE procedimentos 
+            SET descricao = ?, grupo_procedimento = ?
+            WHERE codigo = ?
+        ''', registros)
         
         conn.commit()
         
@@ -275,15 +417,7 @@ def atualizar_procedimentos_database():
         print(f"   - Total de códigos únicos processados: {len(codigos_banco)}")
         
         # Verificar resultados por grupo
-        cursor.execute('''
-            SELECT 
-                grupo_procedimento,
-                COUNT(*) as quantidade
-            FROM procedimentos
-            GROUP BY grupo_procedimento
-            ORDER BY COUNT(*) DESC
-            LIMIT 10
-        ''')
+        cursor.execute(CONSULTAS['relatorio_procedimentos_grupos'])
         
         print(f"\n📊 Procedimentos por grupo:")
         for grupo, quantidade in cursor.fetchall():
@@ -291,17 +425,7 @@ def atualizar_procedimentos_database():
         
         # Top 10 procedimentos mais frequentes
         print(f"\n🏆 Top 10 procedimentos mais frequentes:")
-        cursor.execute('''
-            SELECT 
-                p.descricao,
-                COUNT(i.id) as frequencia
-            FROM procedimentos p
-            JOIN internacoes i ON p.codigo = i.codigo_procedimento_solicitado
-            WHERE p.descricao NOT LIKE 'Procedimento %'
-            GROUP BY p.codigo, p.descricao
-            ORDER BY COUNT(i.id) DESC
-            LIMIT 10
-        ''')
+        cursor.execute(CONSULTAS['relatorio_procedimentos_top'])
         
         for descricao, frequencia in cursor.fetchall():
             print(f"   - {descricao}: {frequencia:,} casos")
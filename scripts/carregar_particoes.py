@@ -0,0 +1,129 @@
+"""
+Carga particionada por competência
+Separa os dados consolidados por competência (e UF, se configurado) e recria só a partição de
+cada competência presente: carregar ou remover um mês não toca nos demais
+"""
+
+import sqlite3
+import os
+import sys
+import argparse
+
+import pandas as pd
+
+# Adiciona o diretório raiz ao path para importar as configurações
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.settings import PARTICIONAMENTO
+from config.particoes import (
+    caminho_particao, chave_particao, listar_particoes, LINHAS_POR_PARTICAO
+)
+from config.resumos import atualizar_resumos_banco
+from create_database import create_database_structure, populate_database, carregar_dados_consolidados
+from deduplicar_aih import registrar_carga
+
+# Tabelas com AUTOINCREMENT cujos ids precisam ser únicos entre partições
+TABELAS_FATO = ['pacientes', 'estabelecimentos', 'internacoes', 'valores_financeiros']
+
+def definir_sequencias(db_path, base):
+    """Faz os ids das tabelas de fato da partição começarem em 'base'"""
+    conn = sqlite3.connect(db_path)
+    conn.executemany(
+        'INSERT INTO sqlite_sequence (name, seq) VALUES (?, ?)',
+        [(tabela, base) for tabela in TABELAS_FATO]
+    )
+    conn.commit()
+    conn.close()
+
+def uf_dos_registros(df):
+    """UF de cada registro pelo nome do arquivo RD de origem (RDPR2501 → PR)"""
+    origem = df['ARQUIVO_ORIGEM'] if 'ARQUIVO_ORIGEM' in df.columns else pd.Series('', index=df.index)
+    return origem.astype(str).str.extract(r'^RD([A-Z]{2})', expand=False).fillna(PARTICIONAMENTO['uf_padrao'])
+
+def carregar_particao(df, ano, mes=None, uf=None):
+    """
+    Recria a partição da competência com os registros informados
+    A partição nova é montada em um arquivo temporário e só então substitui a anterior
+    """
+
+    path = caminho_particao(ano, mes, uf)
+    temporario = path + '.tmp'
+    if os.path.exists(temporario):
+        os.remove(temporario)
+
+    create_database_structure(temporario)
+    definir_sequencias(temporario, chave_particao(ano, mes, uf) * LINHAS_POR_PARTICAO)
+    total = populate_database(df.reset_index(drop=True), temporario)
+    atualizar_resumos_banco(temporario)
+
+    os.replace(temporario, path)
+    print(f"✅ Partição {os.path.basename(path)}: {total:,} registros")
+    return total
+
+def carregar_particoes(df=None):
+    """Carrega cada competência dos dados consolidados na sua partição"""
+
+    consolidado = df is None
+    if consolidado:
+        df = carregar_dados_consolidados()
+
+    os.makedirs(PARTICIONAMENTO['dir'], exist_ok=True)
+
+    chaves = [df['ANO_CMPT']]
+    chaves.append(df['MES_CMPT'] if PARTICIONAMENTO['granularidade'] == 'mes' else pd.Series(None, index=df.index))
+    chaves.append(uf_dos_registros(df) if PARTICIONAMENTO['por_uf'] else pd.Series(None, index=df.index))
+
+    total, recriadas = 0, set()
+    for (ano, mes, uf), grupo in df.groupby(chaves, sort=True, dropna=False):
+        ano, mes, uf = int(ano), None if pd.isna(mes) else int(mes), None if pd.isna(uf) else uf
+        total += carregar_particao(grupo, ano, mes, uf)
+        recriadas.add(caminho_particao(ano, mes, uf))
+
+    # As chaves só passam a valer para as próximas cargas depois que todas as partições foram gravadas
+    if consolidado:
+        registrar_carga(recriadas=recriadas)
+    return total
+
+def resumir_particoes():
+    """Recalcula os resumos de todas as partições (ex.: partições carregadas antes dos resumos)"""
+
+    for particao in listar_particoes():
+        atualizar_resumos_banco(particao['path'])
+        print(f"✅ Resumos atualizados: {os.path.basename(particao['path'])}")
+
+def remover_competencia(ano, mes=None, uf=None):
+    """Remove a partição da competência; as demais não são tocadas"""
+
+    path = caminho_particao(ano, mes, uf)
+    if not os.path.exists(path):
+        print(f"⚠️ Partição não encontrada: {path}")
+        return False
+
+    os.remove(path)
+    print(f"✅ Partição removida: {os.path.basename(path)}")
+    return True
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Carga e manutenção das partições por competência')
+    subparsers = parser.add_subparsers(dest='comando', required=True)
+    subparsers.add_parser('carregar', help='Carrega os dados consolidados nas partições')
+    remover = subparsers.add_parser('remover', help='Remove a partição de uma competência')
+    remover.add_argument('--ano', type=int, required=True)
+    remover.add_argument('--mes', type=int)
+    remover.add_argument('--uf')
+    subparsers.add_parser('listar', help='Lista as partições existentes')
+    subparsers.add_parser('resumir', help='Recalcula os resumos aproximados de todas as partições')
+    args = parser.parse_args()
+
+    if args.comando == 'carregar':
+        carregar_particoes()
+    elif args.comando == 'remover':
+        if not remover_competencia(args.ano, args.mes, args.uf):
+            sys.exit(1)
+    elif args.comando == 'resumir':
+        resumir_particoes()
+    else:
+        for particao in listar_particoes():
+            competencia = f"{particao['ano']}-{particao['mes']:02d}" if particao['mes'] else str(particao['ano'])
+            tamanho = os.path.getsize(particao['path']) / (1024 * 1024)
+            print(f"{particao['uf'] or '--'}  {competencia}  {tamanho:8.1f} MB  {particao['path']}")
@@ -1,14 +1,35 @@
 import os
 import csv
 
+from leitor_dbc import ler_lotes_rd, listar_arquivos_rd
+
+def linhas_rd(arquivo_path):
+    """Gera as linhas de um arquivo RD (.dbc/.dbf) a partir dos lotes de colunas"""
+
+    cabecalho = None
+    for lote in ler_lotes_rd(arquivo_path):
+        if cabecalho is None:
+            cabecalho = list(lote)
+            yield list(cabecalho)
+        for linha in zip(*(lote[campo].tolist() for campo in cabecalho)):
+            yield list(linha)
+
+def linhas_csv(arquivo_path):
+    """Gera as linhas de um CSV já convertido"""
+
+    with open(arquivo_path, 'r', encoding='utf-8') as infile:
+        yield from csv.reader(infile)
+
 def consolidar_csvs_simples():
     """
-    Consolida todos os 3 arquivos CSV usando Python padrão
+    Consolida todos os 3 arquivos RD usando Python padrão
+    Lê direto os .dbc/.dbf do DATASUS em data/raw/dbc; sem eles, usa os CSVs convertidos
     """
     
     # Caminhos
     base_dir = os.path.dirname(os.path.dirname(__file__))
     raw_dir = os.path.join(base_dir, 'data', 'raw', 'csv')
+    dbc_dir = os.path.join(base_dir, 'data', 'raw', 'dbc')
     processed_dir = os.path.join(base_dir, 'data', 'processed')
     output_file = os.path.join(processed_dir, 'dados_completos_internacoes_pr_2025.csv')
     
@@ -19,7 +40,13 @@ def consolidar_csvs_simples():
         'RDPR2503.csv'   # Março
     ]
     
-    print("Consolidando todos os 3 arquivos CSV...")
+    # Arquivos originais do DATASUS têm prioridade sobre os CSVs convertidos
+    arquivos_rd = {
+        os.path.splitext(os.path.basename(caminho))[0].upper(): caminho
+        for caminho in listar_arquivos_rd(dbc_dir)
+    }
+    
+    print("Consolidando todos os 3 arquivos...")
     
     header_written = False
     total_records = 0
@@ -30,45 +57,45 @@ def consolidar_csvs_simples():
         
         for i, csv_file in enumerate(csv_files, 1):
             csv_path = os.path.join(raw_dir, csv_file)
+            rd_path = arquivos_rd.get(os.path.splitext(csv_file)[0].upper())
             
-            if os.path.exists(csv_path):
-                print(f"Processando {csv_file}...")
+            if rd_path or os.path.exists(csv_path):
+                print(f"Processando {os.path.basename(rd_path or csv_path)}...")
                 
-                with open(csv_path, 'r', encoding='utf-8') as infile:
-                    reader = csv.reader(infile)
-                    
-                    # Ler header
-                    header = next(reader)
-                    
-                    # Adicionar coluna ARQUIVO_ORIGEM ao header se necessário
-                    if 'ARQUIVO_ORIGEM' not in header:
-                        header.append('ARQUIVO_ORIGEM')
-                    
-                    # Escrever header apenas uma vez
-                    if not header_written:
-                        writer = csv.writer(outfile)
-                        writer.writerow(header)
-                        header_written = True
+                reader = linhas_rd(rd_path) if rd_path else linhas_csv(csv_path)
+                
+                # Ler header
+                header = next(reader)
+                
+                # Adicionar coluna ARQUIVO_ORIGEM ao header se necessário
+                if 'ARQUIVO_ORIGEM' not in header:
+                    header.append('ARQUIVO_ORIGEM')
+                
+                # Escrever header apenas uma vez
+                if not header_written:
+                    writer = csv.writer(outfile)
+                    writer.writerow(header)
+                    header_written = True
+                
+                # Processar dados
+                file_records = 0
+                for row in reader:
+                    # Adicionar nome do arquivo de origem
+                    if len(row) == len(header) - 1:  # Se não tem ARQUIVO_ORIGEM
+                        row.append(csv_file)
+                    elif len(row) == len(header):  # Se já tem ARQUIVO_ORIGEM
+                        row[-1] = csv_file  # Sobrescrever
                     
-                    # Processar dados
-                    file_records = 0
-                    for row in reader:
-                        # Adicionar nome do arquivo de origem
-                        if len(row) == len(header) - 1:  # Se não tem ARQUIVO_ORIGEM
-                            row.append(csv_file)
-                        elif len(row) == len(header):  # Se já tem ARQUIVO_ORIGEM
-                            row[-1] = csv_file  # Sobrescrever
-                        
-                        writer.writerow(row)
-                        file_records += 1
-                        total_records += 1
-                        
-                        # Contar por mês (assumindo que MES_CMPT é a 3ª coluna)
-                        if len(row) >= 3:
-                            month = row[2].strip('"')
-                            month_counts[month] = month_counts.get(month, 0) + 1
+                    writer.writerow(row)
+                    file_records += 1
+                    total_records += 1
                     
-                    print(f"  - {file_records:,} registros processados")
+                    # Contar por mês (assumindo que MES_CMPT é a 3ª coluna)
+                    if len(row) >= 3:
+                        month = str(row[2]).strip('"')
+                        month_counts[month] = month_counts.get(month, 0) + 1
+                
+                print(f"  - {file_records:,} registros processados")
             else:
                 print(f"Arquivo não encontrado: {csv_path}")
     
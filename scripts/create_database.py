@@ -1,8 +1,17 @@
 import sqlite3
 import pandas as pd
 import os
+import sys
 from datetime import datetime
 
+# Adiciona o diretório raiz ao path para importar as configurações
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from leitor_dbc import ler_dataframe_rd, listar_arquivos_rd
+from pacote_referencias import compilar_pacote_referencias, inserir_dimensoes_resolvidas
+from indices_consultas import criar_indices_recomendados
+from config.fluxos import ESTRUTURA_FLUXOS, calcular_fluxos
+
 def create_lookup_tables(cursor):
     """Cria tabelas de apoio com códigos e descrições"""
     
@@ -181,13 +190,13 @@ def populate_lookup_tables(cursor):
     ]
     cursor.executemany('INSERT INTO tipos_financiamento VALUES (?, ?)', financiamento_data)
 
-def create_database_structure():
+def create_database_structure(db_path=None):
     """
     Cria a estrutura do banco de dados SQLite normalizada para internações hospitalares
     """
     
     # Caminho para o banco de dados
-    db_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'database', 'internacoes_datasus.db')
+    db_path = db_path or os.path.join(os.path.dirname(os.path.dirname(__file__)), 'database', 'internacoes_datasus.db')
     
     # Conecta ao banco de dados
     conn = sqlite3.connect(db_path)
@@ -198,7 +207,7 @@ def create_database_structure():
         'internacoes', 'pacientes', 'estabelecimentos', 'valores_financeiros',
         'cid_diagnosticos', 'sexo', 'carater_internacao', 'complexidade',
         'municipios', 'procedimentos', 'especialidades', 'natureza_juridica',
-        'tipos_gestao', 'tipos_financiamento', 'metadata'
+        'tipos_gestao', 'tipos_financiamento', 'metadata', 'fluxos_municipios'
     ]
     
     for table in tables_to_drop:
@@ -282,6 +291,11 @@ def create_database_structure():
             diarias_acompanhante INTEGER,
             quantidade_diarias INTEGER,
             
+            -- Reinternação (NULL até scripts/reinternacoes.py calcular)
+            reinternacao BOOLEAN,
+            dias_desde_alta_anterior INTEGER,
+            gerou_reinternacao BOOLEAN,
+            
             -- Controle
             sequencia_registro TEXT,
             codigo_remessa TEXT,
@@ -349,13 +363,19 @@ def create_database_structure():
         'CREATE INDEX idx_pacientes_idade ON pacientes(idade_anos)',
         'CREATE INDEX idx_pacientes_sexo ON pacientes(codigo_sexo)',
         'CREATE INDEX idx_pacientes_municipio ON pacientes(codigo_municipio_residencia)',
-        'CREATE INDEX idx_valores_total ON valores_financeiros(valor_total)',
         'CREATE INDEX idx_estabelecimentos_cnes ON estabelecimentos(codigo_cnes)'
     ]
     
     for index in indices:
         cursor.execute(index)
     
+    # Índices compostos e de cobertura das consultas do dashboard são criados depois da carga
+    # (scripts/indices_consultas.py)
+    
+    # Matriz origem-destino (residência x movimento) por competência, em triplas COO
+    # preenchidas depois da carga (config/fluxos.py)
+    cursor.execute(ESTRUTURA_FLUXOS)
+    
     # Tabela de metadados
     cursor.execute('''
         CREATE TABLE metadata (
@@ -364,7 +384,9 @@ def create_database_structure():
             total_registros INTEGER,
             ultima_atualizacao TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
             fonte_dados TEXT,
-            versao_estrutura TEXT DEFAULT '2.0'
+            versao_estrutura TEXT DEFAULT '2.0',
+            duracao_segundos REAL,
+            memoria_pico_mb REAL
         )
     ''')
     
@@ -375,18 +397,45 @@ def create_database_structure():
     
     return db_path
 
-def populate_database():
+def carregar_arquivos_rd():
+    """Lê os arquivos RD (.dbc/.dbf) de data/raw/dbc em um único DataFrame"""
+    
+    dbc_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data', 'raw', 'dbc')
+    
+    dataframes = []
+    for arquivo_path in listar_arquivos_rd(dbc_dir):
+        print(f"Carregando dados de {os.path.basename(arquivo_path)}...")
+        df = ler_dataframe_rd(arquivo_path)
+        df['ARQUIVO_ORIGEM'] = os.path.splitext(os.path.basename(arquivo_path))[0].upper() + '.csv'
+        dataframes.append(df)
+    
+    if not dataframes:
+        raise FileNotFoundError(f"Nenhum CSV consolidado nem arquivo RD encontrado em {dbc_dir}")
+    
+    return pd.concat(dataframes, ignore_index=True)
+
+def carregar_dados_consolidados():
+    """Carrega o CSV consolidado; sem ele, lê direto os arquivos RD do DATASUS"""
+    
+    csv_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data', 'processed', 'dados_completos_internacoes_pr_2025.csv')
+    
+    if os.path.exists(csv_path):
+        print("Carregando dados do CSV...")
+        return pd.read_csv(csv_path)
+    return carregar_arquivos_rd()
+
+def populate_database(df=None, db_path=None):
     """
     Popula o banco de dados normalizado com os dados do CSV processado
+    Recebe df e db_path para carregar um recorte em outro banco (ex.: uma partição por competência)
     """
     
     # Caminhos
     csv_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data', 'processed', 'dados_completos_internacoes_pr_2025.csv')
-    db_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'database', 'internacoes_datasus.db')
+    db_path = db_path or os.path.join(os.path.dirname(os.path.dirname(__file__)), 'database', 'internacoes_datasus.db')
     
-    # Carrega o CSV
-    print("Carregando dados do CSV...")
-    df = pd.read_csv(csv_path)
+    if df is None:
+        df = carregar_dados_consolidados()
     
     # Conecta ao banco
     conn = sqlite3.connect(db_path)
@@ -552,54 +601,17 @@ def populate_database():
             print(f"Erro ao inserir valores financeiros no registro {idx}: {e}")
             continue
     
-    # Atualizar CIDs que não estão na tabela de apoio
-    print("Atualizando tabela de CIDs com dados reais...")
-    cursor.execute('''
-        INSERT OR IGNORE INTO cid_diagnosticos (codigo, descricao, capitulo, grupo, sensivel_atencao_basica)
-        SELECT DISTINCT codigo_diagnostico_principal, 
-               'Diagnóstico ' || codigo_diagnostico_principal,
-               'Não classificado',
-               'Não classificado', 
-               FALSE
-        FROM internacoes 
-        WHERE codigo_diagnostico_principal IS NOT NULL 
-        AND codigo_diagnostico_principal NOT IN (SELECT codigo FROM cid_diagnosticos)
-    ''')
-    
-    # Popular tabela de procedimentos com dados reais
-    print("Populando tabela de procedimentos...")
-    cursor.execute('''
-        INSERT OR IGNORE INTO procedimentos (codigo, descricao, grupo_procedimento)
-        SELECT DISTINCT codigo_procedimento_solicitado, 
-               'Procedimento ' || codigo_procedimento_solicitado,
-               'Não classificado'
-        FROM internacoes 
-        WHERE codigo_procedimento_solicitado IS NOT NULL 
-        AND codigo_procedimento_solicitado != ''
-    ''')
+    # CIDs, procedimentos e municípios resolvidos pelo pacote de referências em uma única passada
+    print("Populando tabelas de CIDs, procedimentos e municípios...")
+    inserir_dimensoes_resolvidas(conn)
     
-    # Popular tabela de municípios com dados reais (códigos únicos dos pacientes)
-    print("Populando tabela de municípios...")
-    cursor.execute('''
-        INSERT OR IGNORE INTO municipios (codigo, nome, regiao_saude)
-        SELECT DISTINCT codigo_municipio_residencia, 
-               'Município ' || codigo_municipio_residencia,
-               'Paraná'
-        FROM pacientes 
-        WHERE codigo_municipio_residencia IS NOT NULL 
-        AND codigo_municipio_residencia != ''
-    ''')
+    # Índices das consultas do dashboard, criados com as tabelas já carregadas
+    print("Criando índices das consultas do dashboard...")
+    criar_indices_recomendados(conn)
     
-    # Adicionar também municípios de movimento dos estabelecimentos
-    cursor.execute('''
-        INSERT OR IGNORE INTO municipios (codigo, nome, regiao_saude)
-        SELECT DISTINCT codigo_municipio_movimento, 
-               'Município ' || codigo_municipio_movimento,
-               'Paraná'
-        FROM estabelecimentos 
-        WHERE codigo_municipio_movimento IS NOT NULL 
-        AND codigo_municipio_movimento != ''
-    ''')
+    # Fluxos residência x movimento por competência
+    print("Calculando fluxos entre municípios...")
+    calcular_fluxos(conn)
     
     # Atualizar metadados
     print("Atualizando metadados...")
@@ -623,6 +635,9 @@ def populate_database():
     return len(df)
 
 if __name__ == "__main__":
+    # Compila o pacote de referências (só recompila se as fontes mudaram)
+    compilar_pacote_referencias()
+    
     # Cria a estrutura do banco
     db_path = create_database_structure()
     
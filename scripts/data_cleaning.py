@@ -7,26 +7,27 @@ Processa dados de internações de janeiro, fevereiro e março de 2025
 import pandas as pd
 import numpy as np
 import os
+import sys
 from datetime import datetime
 
+# Adiciona o diretório raiz ao path para importar a deduplicação de AIHs
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.deduplicacao import deduplicar
+
 def analyze_missing_data(df, filename):
     """Analisa dados faltantes em um DataFrame"""
     print(f"\n--- Análise de dados faltantes: {filename} ---")
     print(f"Total de linhas: {len(df)}")
     print(f"Total de colunas: {len(df.columns)}")
     
-    # Calcula percentual de dados faltantes por coluna
-    missing_stats = []
-    for col in df.columns:
-        missing_count = df[col].isna().sum() + (df[col] == '').sum() + (df[col] == '0').sum()
-        missing_percent = (missing_count / len(df)) * 100
-        missing_stats.append({
-            'coluna': col,
-            'faltantes': missing_count,
-            'percentual': missing_percent
-        })
-    
-    missing_df = pd.DataFrame(missing_stats)
+    # Calcula percentual de dados faltantes por coluna (uma máscara para o DataFrame inteiro)
+    missing_count = (df.isna() | df.isin(['', '0'])).sum()
+    missing_df = pd.DataFrame({
+        'coluna': df.columns,
+        'faltantes': missing_count.to_numpy(),
+        'percentual': (missing_count / len(df) * 100).to_numpy()
+    })
     missing_df = missing_df.sort_values('percentual', ascending=False)
     
     print("\nTop 10 colunas com mais dados faltantes:")
@@ -81,11 +82,7 @@ def clean_data(df, filename):
     
     df = df.drop(index=rows_to_remove)
     
-    # Remove linhas duplicadas
-    duplicated_rows = df.duplicated().sum()
-    if duplicated_rows > 0:
-        print(f"Removendo {duplicated_rows} linhas duplicadas")
-        df = df.drop_duplicates()
+    # Duplicatas (N_AIH + SEQUENCIA) são removidas uma única vez, após combinar os arquivos
     
     # Tratamento específico para colunas importantes
     # Converte colunas numéricas que deveriam ser números
@@ -163,9 +160,9 @@ def main():
         
         combined_df = pd.concat(all_dataframes, ignore_index=True)
         
-        # Remove duplicatas finais
+        # Remove AIHs repetidas pela chave N_AIH + SEQUENCIA (vale a competência mais recente)
         original_combined = len(combined_df)
-        combined_df = combined_df.drop_duplicates()
+        combined_df, _, _ = deduplicar(combined_df)
         final_combined = len(combined_df)
         
         print(f"Total de registros após combinação: {original_combined}")
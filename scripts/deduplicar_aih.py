@@ -0,0 +1,93 @@
+"""
+Deduplicação das AIHs do CSV consolidado
+Mantém uma linha por N_AIH + SEQUENCIA (a da competência mais recente). Na carga particionada,
+que só recria as partições das competências presentes, também descarta as reapresentações já
+superadas por uma carga anterior; as chaves são registradas pela carga, depois que ela der certo,
+e a versão de uma competência anterior que a carga superou sai da partição antiga.
+No banco único a carga recria tudo a partir do CSV atual, então só vale a deduplicação no arquivo
+"""
+
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+
+# Adiciona o diretório raiz ao path para importar a deduplicação
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.settings import FILES, PARTICIONAMENTO
+from config.deduplicacao import ChavesVistas, TAMANHO_LOTE, chaves_csv, deduplicar_csv
+from config.particoes import podar_particoes, remover_aihs
+
+def deduplicar_consolidado(csv_path=None, tamanho_lote=TAMANHO_LOTE, esquecer=False):
+    """Etapa do pipeline: deduplica o CSV consolidado no próprio arquivo"""
+
+    csv_path = csv_path or FILES['csv_completo']
+    if not os.path.exists(csv_path):
+        print(f"❌ CSV consolidado não encontrado: {csv_path}")
+        return False
+
+    if esquecer and os.path.exists(FILES['aihs_vistas']):
+        os.remove(FILES['aihs_vistas'])
+
+    print("=== DEDUPLICAÇÃO DE AIHs ===")
+    inicio = time.perf_counter()
+    vistas = None
+    if PARTICIONAMENTO['ativo']:
+        vistas = ChavesVistas()
+        print(f"Chaves de cargas anteriores: {len(vistas):,}")
+
+    registros, duplicadas, superadas = deduplicar_csv(csv_path, vistas, tamanho_lote)
+    print(f"✅ {registros:,} registros verificados ({time.perf_counter() - inicio:.1f}s)")
+    print(f"   - Reapresentações no arquivo removidas (vale a competência mais recente): {duplicadas:,}")
+    print(f"   - AIHs já carregadas em competência mais recente removidas: {superadas:,}")
+    print(f"   - Registros mantidos: {registros - duplicadas - superadas:,}")
+    return True
+
+def remover_reapresentadas(vistas, hashes, comps, recriadas=()):
+    """
+    Remove das partições das competências anteriores as AIHs que a carga trouxe numa competência
+    mais recente ("a mais recente vence" também entre cargas); as partições recriadas pela carga
+    já estão só com os dados atuais. Retorna o número de internações removidas
+    """
+
+    anteriores = vistas.competencia_vista(hashes)
+    reapresentadas = (anteriores > 0) & (anteriores < comps)
+
+    removidas = 0
+    for competencia in np.unique(anteriores[reapresentadas]):
+        chaves = hashes[reapresentadas & (anteriores == competencia)]
+        for particao in podar_particoes([(int(competencia) // 100, int(competencia) % 100)]):
+            if particao['path'] not in recriadas:
+                removidas += remover_aihs(particao['path'], chaves)
+    return removidas
+
+def registrar_carga(csv_path=None, tamanho_lote=TAMANHO_LOTE, recriadas=()):
+    """
+    Registra as chaves do CSV consolidado entre as carregadas, depois de tirar das partições
+    antigas as versões superadas; chamada após a carga particionada
+    """
+
+    csv_path = csv_path or FILES['csv_completo']
+    if not os.path.exists(csv_path):
+        return False
+
+    hashes, comps = chaves_csv(csv_path, tamanho_lote)
+    vistas = ChavesVistas()
+    removidas = remover_reapresentadas(vistas, hashes, comps, recriadas)
+    vistas.registrar(hashes, comps)
+    print(f"✅ {len(hashes):,} chaves registradas ({len(vistas):,} AIHs carregadas no total)")
+    print(f"   - Versões anteriores removidas de partições de outras competências: {removidas:,}")
+    return True
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Deduplica as AIHs do CSV consolidado por N_AIH + SEQUENCIA')
+    parser.add_argument('--csv', help='CSV a deduplicar (padrão: o consolidado em data/processed)')
+    parser.add_argument('--lote', type=int, default=TAMANHO_LOTE, help='Linhas lidas por lote')
+    parser.add_argument('--esquecer', action='store_true', help='Descarta as chaves das cargas anteriores')
+    args = parser.parse_args()
+
+    if not deduplicar_consolidado(args.csv, args.lote, args.esquecer):
+        sys.exit(1)
@@ -0,0 +1,169 @@
+"""
+Exporta o banco SQLite para a cópia analítica lida pelo motor DuckDB
+Gera database/internacoes_datasus.duckdb (ou um <tabela>.parquet por tabela) com o mesmo schema,
+lendo cada tabela direto do SQLite para não carregar tabelas inteiras na memória
+"""
+
+import sqlite3
+import os
+import sys
+import time
+import shutil
+import argparse
+
+import pandas as pd
+
+# Adiciona o diretório raiz ao path para importar as configurações
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.settings import DATABASE
+from config.motor import importar_duckdb
+
+TAMANHO_LOTE = 200_000
+
+def tipo_duckdb(tipo_sqlite):
+    """
+    Tipo DuckDB equivalente à afinidade da coluna no SQLite
+    Datas ficam como texto, como o dashboard já as recebe do SQLite
+    """
+
+    tipo = (tipo_sqlite or '').upper()
+    if tipo.startswith('BOOL'):
+        return 'BOOLEAN'
+    if 'INT' in tipo:
+        return 'BIGINT'
+    if any(parte in tipo for parte in ('REAL', 'FLOA', 'DOUB', 'DECIMAL', 'NUMERIC')):
+        return 'DOUBLE'
+    return 'VARCHAR'
+
+def colunas_tabela(conn, tabela):
+    """Lista (nome, tipo DuckDB, cast SQLite) das colunas da tabela"""
+    casts = {'BIGINT': 'INTEGER', 'BOOLEAN': 'INTEGER', 'DOUBLE': 'REAL', 'VARCHAR': 'TEXT'}
+    colunas = []
+    for row in conn.execute(f'PRAGMA table_info({tabela})'):
+        tipo = tipo_duckdb(row[2])
+        colunas.append((row[1], tipo, casts[tipo]))
+    return colunas
+
+def copiar_tabela(origem, destino, tabela):
+    """Copia uma tabela do SQLite para o DuckDB em lotes; retorna o número de linhas"""
+
+    colunas = colunas_tabela(origem, tabela)
+    destino.execute(f"CREATE TABLE {tabela} ({', '.join(f'{nome} {tipo}' for nome, tipo, _ in colunas)})")
+
+    # O cast no SQLite deixa cada coluna com um único tipo em todos os lotes
+    # (o SQLite aceita texto em coluna INTEGER e vice-versa)
+    selecao = ', '.join(f'CAST({nome} AS {cast}) AS {nome}' for nome, _, cast in colunas)
+
+    total = 0
+    for lote in pd.read_sql_query(f'SELECT {selecao} FROM {tabela}', origem, chunksize=TAMANHO_LOTE):
+        destino.register('lote', lote)
+        destino.execute(f'INSERT INTO {tabela} SELECT * FROM lote')
+        destino.unregister('lote')
+        total += len(lote)
+    return total
+
+def carregar_extensao_sqlite(duckdb, destino):
+    """Carrega a extensão sqlite do DuckDB (sqlite_scan); False se ela não puder ser instalada"""
+    try:
+        destino.execute('INSTALL sqlite')
+        destino.execute('LOAD sqlite')
+    except duckdb.Error as e:
+        print(f"⚠️ Extensão sqlite do DuckDB indisponível ({e}); copiando em lotes")
+        return False
+    # Lê tudo como texto: o SQLite aceita texto em coluna INTEGER e vice-versa,
+    # e o TRY_CAST da seleção deixa cada coluna com um único tipo
+    destino.execute('SET sqlite_all_varchar = true')
+    return True
+
+def selecao_sqlite_scan(origem, sqlite_path, tabela):
+    """SELECT que o DuckDB lê direto do arquivo SQLite, já com os tipos da cópia analítica"""
+    caminho = sqlite_path.replace("'", "''")
+    selecao = ', '.join(f'TRY_CAST({nome} AS {tipo}) AS {nome}' for nome, tipo, _ in colunas_tabela(origem, tabela))
+    return f"SELECT {selecao} FROM sqlite_scan('{caminho}', '{tabela}')"
+
+def exportar_analitico(formato='duckdb', sqlite_path=None, destino_path=None):
+    """
+    Exporta todas as tabelas do banco SQLite para o formato analítico
+    Cada tabela vai direto do arquivo SQLite para o destino (sqlite_scan + CREATE TABLE AS ou
+    COPY ... TO parquet), sem passar inteira pela memória; sem a extensão sqlite do DuckDB, copia
+    em lotes para um arquivo DuckDB. O arquivo novo só substitui o anterior no fim, para não
+    interromper o dashboard
+    """
+
+    duckdb = importar_duckdb()
+    sqlite_path = sqlite_path or DATABASE['path']
+    destino_path = destino_path or (DATABASE['duckdb_path'] if formato == 'duckdb' else DATABASE['parquet_dir'])
+
+    if not os.path.exists(sqlite_path):
+        print("Banco de dados não encontrado!")
+        return False
+
+    origem = sqlite3.connect(f'file:{sqlite_path}?mode=ro', uri=True)
+    tabelas = [
+        row[0] for row in origem.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%' ORDER BY name"
+        )
+    ]
+
+    temporario = destino_path + '.tmp'
+    intermediario = temporario + '.duckdb'
+    for caminho in (temporario, intermediario):
+        if os.path.isdir(caminho):
+            shutil.rmtree(caminho)
+        elif os.path.exists(caminho):
+            os.remove(caminho)
+    if formato == 'parquet':
+        os.makedirs(temporario)
+
+    destino = duckdb.connect(temporario if formato == 'duckdb' else ':memory:')
+    direto = carregar_extensao_sqlite(duckdb, destino)
+    if not direto and formato == 'parquet':
+        # Os lotes vão para um DuckDB em disco, de onde cada tabela é copiada para Parquet
+        destino.close()
+        destino = duckdb.connect(intermediario)
+
+    print(f"Exportando {len(tabelas)} tabelas para {formato}...")
+    inicio = time.perf_counter()
+    for tabela in tabelas:
+        parquet = os.path.join(temporario, f'{tabela}.parquet').replace("'", "''")
+        if direto and formato == 'parquet':
+            linhas = destino.execute(
+                f"COPY ({selecao_sqlite_scan(origem, sqlite_path, tabela)}) TO '{parquet}' "
+                "(FORMAT parquet, COMPRESSION zstd)"
+            ).fetchone()[0]
+        elif direto:
+            destino.execute(f'CREATE TABLE {tabela} AS {selecao_sqlite_scan(origem, sqlite_path, tabela)}')
+            linhas = destino.execute(f'SELECT COUNT(*) FROM {tabela}').fetchone()[0]
+        else:
+            linhas = copiar_tabela(origem, destino, tabela)
+            if formato == 'parquet':
+                destino.execute(f"COPY {tabela} TO '{parquet}' (FORMAT parquet, COMPRESSION zstd)")
+                destino.execute(f'DROP TABLE {tabela}')
+        print(f"   - {tabela}: {linhas:,} linhas")
+    origem.close()
+    destino.close()
+
+    if os.path.exists(intermediario):
+        os.remove(intermediario)
+    if os.path.isdir(destino_path):
+        shutil.rmtree(destino_path)
+    os.replace(temporario, destino_path)
+
+    print(f"✅ Cópia analítica gerada em {time.perf_counter() - inicio:.1f}s: {destino_path}")
+    return True
+
+def exportar_se_configurado():
+    """Etapa do pipeline: só exporta quando o dashboard usa o motor DuckDB"""
+    if DATABASE['engine'] != 'duckdb':
+        print("Motor configurado é o SQLite, cópia analítica não necessária")
+        return True
+    return exportar_analitico()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Exporta o banco SQLite para o motor DuckDB')
+    parser.add_argument('--formato', choices=['duckdb', 'parquet'], default='duckdb')
+    args = parser.parse_args()
+
+    if not exportar_analitico(args.formato):
+        sys.exit(1)
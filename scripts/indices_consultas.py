@@ -0,0 +1,198 @@
+"""
+Recomendador de índices a partir das consultas registradas do dashboard
+Lê as consultas 'dashboard_*' de config/consultas.py e, para cada tabela, monta um índice
+composto com as colunas de junção, igualdade, agrupamento e intervalo, completado com as
+demais colunas lidas (índice de cobertura). Os índices são criados depois da carga
+"""
+
+import sqlite3
+import os
+import re
+import sys
+
+# Adiciona o diretório raiz ao path para importar as consultas registradas
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.consultas import CONSULTAS
+
+# Acima disso o índice fica só com as colunas de busca, sem cobertura
+LIMITE_COLUNAS_INDICE = 8
+
+# Índices de bancos antigos que os recomendados substituem. idx_valores_total levava o
+# otimizador a conduzir as consultas por valor_total > 0, que seleciona quase todas as linhas
+INDICES_SUBSTITUIDOS = {'idx_valores_total': 'valores_financeiros(valor_total)'}
+
+PALAVRAS_CHAVE = r'(?!(?:LEFT|INNER|CROSS|JOIN|ON|WHERE|GROUP|ORDER|LIMIT)\b)'
+PADRAO_TABELA = re.compile(rf'\b(FROM|JOIN)\s+(\w+)(?:\s+(?:AS\s+)?{PALAVRAS_CHAVE}(\w+))?', re.I)
+PADRAO_JUNCAO = re.compile(
+    rf'\bJOIN\s+(\w+)(?:\s+(?:AS\s+)?{PALAVRAS_CHAVE}(\w+))?\s+ON\s+(\w+)\.(\w+)\s*=\s*(\w+)\.(\w+)', re.I
+)
+PADRAO_COLUNA = re.compile(r'\b(\w+)\.(\w+)\b')
+PADRAO_IGUALDADE = re.compile(r'\b(\w+)\.(\w+)\s*(?:=(?!\s*\w+\.)|IN\s*\()', re.I)
+PADRAO_INTERVALO = re.compile(r'\b(\w+)\.(\w+)\s*(?:>=|<=|>|<|BETWEEN\b)', re.I)
+PADRAO_WHERE = re.compile(r'\bWHERE\b(.*?)(?=\bGROUP\s+BY\b|\bORDER\s+BY\b|\bLIMIT\b|$)', re.I | re.S)
+PADRAO_GROUP_BY = re.compile(r'\bGROUP\s+BY\b(.*?)(?=\bHAVING\b|\bORDER\s+BY\b|\bLIMIT\b|$)', re.I | re.S)
+
+def sem_comentarios(sql):
+    """Remove os comentários de linha, que podem citar colunas"""
+    return re.sub(r'--[^\n]*', '', sql)
+
+def colunas_rowid(conn, tabela):
+    """Colunas INTEGER PRIMARY KEY (alias do rowid, já presente em todo índice)"""
+    return {
+        row[1] for row in conn.execute(f'PRAGMA table_info({tabela})')
+        if row[5] == 1 and row[2].upper() == 'INTEGER'
+    }
+
+def indices_existentes(conn, tabela):
+    """Lista (único, colunas) de cada índice da tabela, inclusive os automáticos de UNIQUE"""
+    indices = []
+    for row in conn.execute(f'PRAGMA index_list({tabela})'):
+        colunas = [info[2] for info in conn.execute(f'PRAGMA index_info({row[1]})')]
+        indices.append((bool(row[2]), colunas))
+    return indices
+
+def acessos_consulta(sql):
+    """
+    Colunas usadas por tabela em uma consulta: junção, igualdade, intervalo, agrupamento e leitura
+    Também indica qual tabela conduz a consulta (a do FROM)
+    """
+
+    sql = sem_comentarios(sql)
+    aliases = {}
+    conducao = None
+    for clausula, tabela, alias in PADRAO_TABELA.findall(sql):
+        alias = alias or tabela
+        aliases[alias] = tabela
+        if clausula.upper() == 'FROM' and conducao is None:
+            conducao = alias
+
+    acessos = {
+        alias: {'juncao': [], 'igualdade': [], 'intervalo': [], 'agrupamento': [], 'leitura': []}
+        for alias in aliases
+    }
+
+    def adicionar(alias, tipo, coluna):
+        if alias in acessos and coluna not in acessos[alias][tipo]:
+            acessos[alias][tipo].append(coluna)
+
+    for tabela, alias_juncao, alias_a, coluna_a, alias_b, coluna_b in PADRAO_JUNCAO.findall(sql):
+        alias_juncao = alias_juncao or tabela
+        if alias_a == alias_juncao:
+            adicionar(alias_a, 'juncao', coluna_a)
+        elif alias_b == alias_juncao:
+            adicionar(alias_b, 'juncao', coluna_b)
+
+    where = PADRAO_WHERE.search(sql)
+    if where:
+        for alias, coluna in PADRAO_IGUALDADE.findall(where.group(1)):
+            adicionar(alias, 'igualdade', coluna)
+        for alias, coluna in PADRAO_INTERVALO.findall(where.group(1)):
+            adicionar(alias, 'intervalo', coluna)
+
+    group_by = PADRAO_GROUP_BY.search(sql)
+    if group_by:
+        for alias, coluna in PADRAO_COLUNA.findall(group_by.group(1)):
+            adicionar(alias, 'agrupamento', coluna)
+
+    for alias, coluna in PADRAO_COLUNA.findall(sql):
+        adicionar(alias, 'leitura', coluna)
+
+    return {aliases[alias]: (alias == conducao, uso) for alias, uso in acessos.items()}
+
+def indice_para_tabela(conn, tabela, conduz, uso):
+    """Colunas do índice recomendado para uma tabela da consulta, ou None se não precisar"""
+
+    rowid = colunas_rowid(conn, tabela)
+
+    # Tabelas acessadas pela chave primária já têm o melhor caminho
+    if not conduz and (not uso['juncao'] or set(uso['juncao']) <= rowid):
+        return None
+
+    # Na tabela que conduz, só intervalo não compensa: os filtros do dashboard (valor_total > 0,
+    # idade IS NOT NULL) selecionam quase todas as linhas e a varredura sequencial é mais rápida
+    if conduz and not (uso['igualdade'] or uso['agrupamento']):
+        return None
+
+    busca = []
+    for coluna in uso['juncao'] + uso['igualdade'] + uso['agrupamento'] + uso['intervalo']:
+        if coluna not in busca and coluna not in rowid:
+            busca.append(coluna)
+    if not busca:
+        return None
+
+    cobertura = [coluna for coluna in uso['leitura'] if coluna not in busca and coluna not in rowid]
+    colunas = busca + cobertura if len(busca) + len(cobertura) <= LIMITE_COLUNAS_INDICE else busca
+
+    for unico, existentes in indices_existentes(conn, tabela):
+        if existentes[:len(busca)] != busca:
+            continue
+        # Busca por índice único devolve uma linha só; cobertura não compensa
+        if unico or set(colunas) <= set(existentes):
+            return None
+
+    return {'tabela': tabela, 'busca': busca, 'colunas': colunas}
+
+def recomendar_indices(conn, consultas=None):
+    """
+    Índices recomendados para as consultas do dashboard, sem repetição
+    Um índice cujas colunas são prefixo de outro recomendado para a mesma tabela é descartado
+    """
+
+    consultas = consultas or {nome: sql for nome, sql in CONSULTAS.items() if nome.startswith('dashboard_')}
+
+    candidatos = []
+    for nome, sql in consultas.items():
+        for tabela, (conduz, uso) in acessos_consulta(sql).items():
+            indice = indice_para_tabela(conn, tabela, conduz, uso)
+            if indice:
+                candidatos.append({**indice, 'consultas': [nome]})
+
+    recomendados = []
+    for candidato in sorted(candidatos, key=lambda c: len(c['colunas']), reverse=True):
+        maior = next((
+            r for r in recomendados
+            if r['tabela'] == candidato['tabela'] and r['colunas'][:len(candidato['colunas'])] == candidato['colunas']
+        ), None)
+        if maior:
+            maior['consultas'].extend(c for c in candidato['consultas'] if c not in maior['consultas'])
+            continue
+        sufixo = '_cobertura' if len(candidato['colunas']) > len(candidato['busca']) else ''
+        candidato['nome'] = f"idx_{candidato['tabela']}_{'_'.join(candidato['busca'])}{sufixo}"
+        recomendados.append(candidato)
+
+    return recomendados
+
+def criar_indices_recomendados(conn, consultas=None):
+    """Cria os índices recomendados (depois da carga, para não pesar nos INSERTs)"""
+
+    cursor = conn.cursor()
+    for nome in INDICES_SUBSTITUIDOS:
+        cursor.execute(f'DROP INDEX IF EXISTS {nome}')
+
+    recomendados = recomendar_indices(conn, consultas)
+
+    for indice in recomendados:
+        cursor.execute(
+            f"CREATE INDEX IF NOT EXISTS {indice['nome']} ON {indice['tabela']}({', '.join(indice['colunas'])})"
+        )
+
+    conn.commit()
+
+    print(f"✅ Índices das consultas do dashboard: {len(recomendados)}")
+    for indice in recomendados:
+        print(f"   - {indice['nome']} ({', '.join(indice['colunas'])})")
+
+    return recomendados
+
+if __name__ == "__main__":
+    db_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'database', 'internacoes_datasus.db')
+
+    if not os.path.exists(db_path):
+        print("Banco de dados não encontrado!")
+        sys.exit(1)
+
+    conn = sqlite3.connect(db_path)
+    criar_indices_recomendados(conn)
+    conn.execute('ANALYZE')
+    conn.close()
@@ -0,0 +1,364 @@
+"""
+Leitor nativo dos arquivos RD do DATASUS (.dbc e .dbf)
+O .dbc é um DBF cujos registros foram comprimidos com o PKWare DCL implode ("blast");
+os registros são descomprimidos em streaming e decodificados em lotes de colunas NumPy,
+sem passar por um CSV intermediário
+"""
+
+import os
+import glob
+
+import numpy as np
+
+# Tabelas do PKWare DCL em formato compacto: cada byte é (repetições - 1) << 4 | comprimento do código
+LITLEN_BLAST = [
+    11, 124, 8, 7, 28, 7, 188, 13, 76, 4, 10, 8, 12, 10, 12, 10, 8, 23, 8,
+    9, 7, 6, 7, 8, 7, 6, 55, 8, 23, 24, 12, 11, 7, 9, 11, 12, 6, 7, 22, 5,
+    7, 24, 6, 11, 9, 6, 7, 22, 7, 11, 38, 7, 9, 8, 25, 11, 8, 11, 9, 12,
+    8, 12, 5, 38, 5, 38, 5, 11, 7, 5, 6, 21, 6, 10, 53, 8, 7, 24, 10, 27,
+    44, 253, 253, 253, 252, 252, 252, 13, 12, 45, 12, 45, 12, 61, 12, 45,
+    44, 173
+]
+LENLEN_BLAST = [2, 35, 36, 53, 38, 23]
+DISTLEN_BLAST = [2, 20, 53, 230, 247, 151, 248]
+
+# Base e bits extras dos 16 códigos de comprimento
+BASE_COMPRIMENTO = [3, 2, 4, 5, 6, 7, 8, 9, 10, 12, 16, 24, 40, 72, 136, 264]
+EXTRA_COMPRIMENTO = [0, 0, 0, 0, 0, 0, 0, 0, 1, 2, 3, 4, 5, 6, 7, 8]
+
+# Comprimento que sinaliza o fim do stream
+FIM_BLAST = 519
+
+# Maior distância possível (dicionário de 4 KB); é o que precisa ficar em memória da saída
+JANELA_BLAST = 4096
+
+def montar_tabela_huffman(compacto):
+    """
+    Monta a tabela de decodificação indexada pelos próximos bits do stream
+    Os códigos do blast são canônicos, lidos do bit mais significativo e com os bits invertidos
+    Cada entrada guarda (símbolo << 4) | comprimento do código
+    """
+
+    comprimentos = []
+    for byte in compacto:
+        comprimentos.extend([byte & 15] * ((byte >> 4) + 1))
+
+    max_bits = max(comprimentos)
+    contagem = [0] * (max_bits + 1)
+    for comprimento in comprimentos:
+        contagem[comprimento] += 1
+    contagem[0] = 0
+
+    # Primeiro código de cada comprimento
+    proximo = [0] * (max_bits + 1)
+    codigo = 0
+    for bits in range(1, max_bits + 1):
+        codigo = (codigo + contagem[bits - 1]) << 1
+        proximo[bits] = codigo
+
+    tabela = [0] * (1 << max_bits)
+    for simbolo, comprimento in enumerate(comprimentos):
+        if comprimento == 0:
+            continue
+        codigo = proximo[comprimento]
+        proximo[comprimento] += 1
+
+        # Bits na ordem em que chegam no stream (LSB primeiro), já invertidos
+        valor = 0
+        for i in range(comprimento):
+            valor |= (((codigo >> (comprimento - 1 - i)) & 1) ^ 1) << i
+
+        entrada = (simbolo << 4) | comprimento
+        for sufixo in range(1 << (max_bits - comprimento)):
+            tabela[valor | (sufixo << comprimento)] = entrada
+
+    return tabela, (1 << max_bits) - 1
+
+TABELA_LITERAIS = montar_tabela_huffman(LITLEN_BLAST)
+TABELA_COMPRIMENTOS = montar_tabela_huffman(LENLEN_BLAST)
+TABELA_DISTANCIAS = montar_tabela_huffman(DISTLEN_BLAST)
+
+def descomprimir_blast(entrada, tamanho_bloco=1 << 16):
+    """
+    Descomprime um stream PKWare DCL implode lido de 'entrada' (arquivo binário)
+    Gera blocos de bytes à medida que a saída cresce, mantendo só a janela de 4 KB
+    """
+
+    littab, litmask = TABELA_LITERAIS
+    lentab, lenmask = TABELA_COMPRIMENTOS
+    disttab, distmask = TABELA_DISTANCIAS
+
+    dados = entrada.read(tamanho_bloco)
+    pos = 0
+    bitbuf = 0
+    bitcnt = 0
+    esgotado = False
+
+    saida = bytearray()
+    limite = tamanho_bloco + JANELA_BLAST
+
+    # Cabeçalho: literais codificados (0/1) e log2(dicionário) - 6 (4, 5 ou 6)
+    if len(dados) < 2:
+        raise ValueError("Stream blast truncado")
+    literais_codificados = dados[0]
+    bits_dicionario = dados[1]
+    if literais_codificados > 1:
+        raise ValueError(f"Cabeçalho blast inválido: literais = {literais_codificados}")
+    if bits_dicionario < 4 or bits_dicionario > 6:
+        raise ValueError(f"Cabeçalho blast inválido: dicionário = {bits_dicionario}")
+    pos = 2
+    mascara_dicionario = (1 << bits_dicionario) - 1
+
+    while True:
+        # Garante bits para o maior símbolo possível (1 + 7 + 8 + 8 + 6 = 30 bits)
+        if bitcnt < 32:
+            if pos + 4 <= len(dados):
+                bitbuf |= int.from_bytes(dados[pos:pos + 4], 'little') << bitcnt
+                pos += 4
+                bitcnt += 32
+            else:
+                while bitcnt < 32:
+                    if pos >= len(dados):
+                        dados = entrada.read(tamanho_bloco)
+                        pos = 0
+                        if not dados:
+                            # Bits de preenchimento só para o último símbolo; consumi-los indica stream truncado
+                            if esgotado:
+                                raise ValueError("Stream blast truncado")
+                            dados = bytes(8)
+                            esgotado = True
+                    bitbuf |= dados[pos] << bitcnt
+                    pos += 1
+                    bitcnt += 8
+
+        if bitbuf & 1:
+            bitbuf >>= 1
+
+            # Comprimento da cópia
+            entrada_tabela = lentab[bitbuf & lenmask]
+            simbolo = entrada_tabela >> 4
+            bitbuf >>= entrada_tabela & 15
+            extra = EXTRA_COMPRIMENTO[simbolo]
+            comprimento = BASE_COMPRIMENTO[simbolo] + (bitbuf & ((1 << extra) - 1))
+            bitbuf >>= extra
+            bitcnt -= 1 + (entrada_tabela & 15) + extra
+
+            if comprimento == FIM_BLAST:
+                break
+
+            # Distância da cópia (comprimento 2 usa só 2 bits extras)
+            entrada_tabela = disttab[bitbuf & distmask]
+            bitbuf >>= entrada_tabela & 15
+            if comprimento == 2:
+                distancia = ((entrada_tabela >> 4) << 2) + (bitbuf & 3) + 1
+                bitbuf >>= 2
+                bitcnt -= (entrada_tabela & 15) + 2
+            else:
+                distancia = ((entrada_tabela >> 4) << bits_dicionario) + (bitbuf & mascara_dicionario) + 1
+                bitbuf >>= bits_dicionario
+                bitcnt -= (entrada_tabela & 15) + bits_dicionario
+
+            if distancia > len(saida):
+                raise ValueError("Stream blast inválido: distância antes do início da saída")
+
+            inicio = len(saida) - distancia
+            if comprimento <= distancia:
+                saida += saida[inicio:inicio + comprimento]
+            else:
+                # Cópia sobreposta: repete o padrão dos últimos 'distancia' bytes
+                padrao = saida[inicio:]
+                saida += (padrao * (comprimento // distancia + 1))[:comprimento]
+        else:
+            bitbuf >>= 1
+            if literais_codificados:
+                entrada_tabela = littab[bitbuf & litmask]
+                saida.append(entrada_tabela >> 4)
+                bitbuf >>= entrada_tabela & 15
+                bitcnt -= 1 + (entrada_tabela & 15)
+            else:
+                saida.append(bitbuf & 255)
+                bitbuf >>= 8
+                bitcnt -= 9
+
+        if len(saida) >= limite:
+            yield bytes(saida[:-JANELA_BLAST])
+            del saida[:-JANELA_BLAST]
+
+    if saida:
+        yield bytes(saida)
+
+def ler_cabecalho_dbf(cabecalho):
+    """Lê o cabeçalho DBF (número de registros, tamanhos e descritores de campo)"""
+
+    if len(cabecalho) < 32:
+        raise ValueError("Cabeçalho DBF incompleto")
+
+    registros = int.from_bytes(cabecalho[4:8], 'little')
+    tamanho_cabecalho = int.from_bytes(cabecalho[8:10], 'little')
+    tamanho_registro = int.from_bytes(cabecalho[10:12], 'little')
+
+    campos = []
+    # O primeiro byte de cada registro é o marcador de exclusão
+    deslocamento = 1
+    for inicio in range(32, tamanho_cabecalho - 1, 32):
+        descritor = cabecalho[inicio:inicio + 32]
+        if len(descritor) < 32 or descritor[0] == 0x0D:
+            break
+
+        campos.append({
+            'nome': descritor[:11].split(b'\x00')[0].decode('ascii').strip(),
+            'tipo': chr(descritor[11]),
+            'tamanho': descritor[16],
+            'decimais': descritor[17],
+            'deslocamento': deslocamento,
+        })
+        deslocamento += descritor[16]
+
+    return {
+        'registros': registros,
+        'tamanho_cabecalho': tamanho_cabecalho,
+        'tamanho_registro': tamanho_registro,
+        'campos': campos,
+    }
+
+def converter_campo(bruto, campo, encoding='latin-1'):
+    """Converte a coluna de bytes de largura fixa de um campo DBF para o tipo NumPy correspondente"""
+
+    tipo = campo['tipo']
+
+    if tipo in ('N', 'F'):
+        texto = np.char.strip(bruto)
+        vazios = texto == b''
+        if campo['decimais'] > 0 or tipo == 'F':
+            texto[vazios] = b'nan'
+            return texto.astype(np.float64)
+        # Campos inteiros do SIH vêm sempre preenchidos; em branco vira 0
+        texto[vazios] = b'0'
+        return texto.astype(np.int64)
+
+    if tipo == 'D':
+        # AAAAMMDD -> AAAA-MM-DD para o datetime64 do NumPy
+        digitos = np.frombuffer(bruto.tobytes(), dtype=np.uint8).reshape(-1, campo['tamanho'])
+        iso = np.full((len(bruto), 10), ord('-'), dtype=np.uint8)
+        iso[:, 0:4] = digitos[:, 0:4]
+        iso[:, 5:7] = digitos[:, 4:6]
+        iso[:, 8:10] = digitos[:, 6:8]
+        iso = iso.view('S10').ravel()
+        iso[np.char.strip(bruto) == b''] = b'NaT'
+        return iso.astype('datetime64[D]')
+
+    if tipo == 'L':
+        return np.isin(np.char.strip(bruto), [b'T', b't', b'Y', b'y'])
+
+    return np.char.strip(np.char.decode(bruto, encoding))
+
+def decodificar_lote(bloco, cabecalho, colunas=None, encoding='latin-1'):
+    """Decodifica um bloco de registros DBF em um dicionário {campo: np.ndarray}"""
+
+    tamanho_registro = cabecalho['tamanho_registro']
+    matriz = np.frombuffer(bloco, dtype=np.uint8).reshape(-1, tamanho_registro)
+
+    # Descarta registros marcados como excluídos
+    validos = matriz[:, 0] != ord('*')
+    if not validos.all():
+        matriz = matriz[validos]
+
+    lote = {}
+    for campo in cabecalho['campos']:
+        if colunas is not None and campo['nome'] not in colunas:
+            continue
+
+        inicio = campo['deslocamento']
+        fim = inicio + campo['tamanho']
+        bruto = np.ascontiguousarray(matriz[:, inicio:fim]).view(f"S{campo['tamanho']}").ravel()
+        lote[campo['nome']] = converter_campo(bruto, campo, encoding)
+
+    return lote
+
+def abrir_registros(arquivo_path):
+    """
+    Abre um .dbc ou .dbf e retorna o cabeçalho e um gerador com os bytes dos registros
+    No .dbc o cabeçalho DBF fica sem compressão, seguido de 4 bytes de CRC e do stream blast
+    """
+
+    arquivo = open(arquivo_path, 'rb')
+
+    inicio = arquivo.read(32)
+    tamanho_cabecalho = int.from_bytes(inicio[8:10], 'little')
+    if tamanho_cabecalho < 32:
+        arquivo.close()
+        raise ValueError(f"Cabeçalho inválido em {arquivo_path}: {tamanho_cabecalho} bytes")
+
+    cabecalho = ler_cabecalho_dbf(inicio + arquivo.read(tamanho_cabecalho - 32))
+
+    def blocos():
+        try:
+            if arquivo_path.lower().endswith('.dbc'):
+                arquivo.seek(tamanho_cabecalho + 4)
+                yield from descomprimir_blast(arquivo)
+            else:
+                arquivo.seek(tamanho_cabecalho)
+                yield from iter(lambda: arquivo.read(1 << 20), b'')
+        finally:
+            arquivo.close()
+
+    return cabecalho, blocos()
+
+def ler_lotes_rd(arquivo_path, tamanho_lote=100_000, colunas=None, encoding='latin-1'):
+    """
+    Lê um arquivo RD (.dbc ou .dbf) em lotes de até 'tamanho_lote' registros
+    Cada lote é um dicionário {campo: np.ndarray}; 'colunas' restringe os campos decodificados
+    """
+
+    cabecalho, blocos = abrir_registros(arquivo_path)
+    tamanho_registro = cabecalho['tamanho_registro']
+    bytes_lote = tamanho_lote * tamanho_registro
+
+    # O cabeçalho manda no número de registros (descarta o marcador de fim 0x1A)
+    restantes = cabecalho['registros'] * tamanho_registro
+    pendente = bytearray()
+
+    for bloco in blocos:
+        pendente += bloco[:restantes]
+        restantes -= min(len(bloco), restantes)
+
+        while len(pendente) >= bytes_lote:
+            yield decodificar_lote(bytes(pendente[:bytes_lote]), cabecalho, colunas, encoding)
+            del pendente[:bytes_lote]
+
+        if restantes == 0:
+            blocos.close()
+            break
+
+    completos = len(pendente) - len(pendente) % tamanho_registro
+    if completos:
+        yield decodificar_lote(bytes(pendente[:completos]), cabecalho, colunas, encoding)
+
+def ler_dataframe_rd(arquivo_path, colunas=None, encoding='latin-1'):
+    """Lê um arquivo RD inteiro em um DataFrame"""
+
+    import pandas as pd
+
+    lotes = [pd.DataFrame(lote) for lote in ler_lotes_rd(arquivo_path, colunas=colunas, encoding=encoding)]
+    if not lotes:
+        cabecalho, blocos = abrir_registros(arquivo_path)
+        blocos.close()
+        return pd.DataFrame(columns=[
+            c['nome'] for c in cabecalho['campos'] if colunas is None or c['nome'] in colunas
+        ])
+
+    return pd.concat(lotes, ignore_index=True)
+
+def listar_arquivos_rd(diretorio, prefixo='RDPR'):
+    """Lista os arquivos RD (.dbc/.dbf) do diretório; se houver os dois, o .dbf descomprimido é preferido"""
+
+    arquivos = {}
+    for caminho in sorted(glob.glob(os.path.join(diretorio, f'{prefixo}*'))):
+        nome, extensao = os.path.splitext(os.path.basename(caminho))
+        extensao = extensao.lower()
+        if extensao not in ('.dbc', '.dbf'):
+            continue
+        if nome.upper() not in arquivos or extensao == '.dbf':
+            arquivos[nome.upper()] = caminho
+
+    return [arquivos[nome] for nome in sorted(arquivos)]
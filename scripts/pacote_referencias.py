@@ -0,0 +1,370 @@
+import sqlite3
+import os
+import sys
+import re
+import hashlib
+import argparse
+from datetime import datetime
+
+# Adiciona o diretório raiz ao path para importar as consultas registradas
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.consultas import CONSULTAS
+from config.settings import FILES
+
+from processar_cid10_completo import processar_arquivo_cid10
+from atualizar_municipios_ibge import buscar_municipios_ibge, get_municipios_fallback
+from atualizar_procedimentos_sus import ler_tb_procedimento, classificar_codigos
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Versão do layout do pacote: mudar quando as tabelas abaixo mudarem de estrutura
+VERSAO_PACOTE = '2'
+
+FONTES_PACOTE = {
+    'cid10': os.path.join(BASE_DIR, 'docs', 'cid10_ultimaversaodisponivel_2012.txt'),
+    'dtb': os.path.join(BASE_DIR, 'docs', 'RELATORIO_DTB_BRASIL_2024_MUNICIPIOS.txt'),
+    'sigtap': os.path.join(BASE_DIR, 'data', 'raw', 'tb_procedimento.txt'),
+}
+
+# Siglas das UFs pelo código IBGE (2 primeiros dígitos do código do município)
+UFS_IBGE = {
+    '11': 'RO', '12': 'AC', '13': 'AM', '14': 'RR', '15': 'PA', '16': 'AP', '17': 'TO',
+    '21': 'MA', '22': 'PI', '23': 'CE', '24': 'RN', '25': 'PB', '26': 'PE', '27': 'AL',
+    '28': 'SE', '29': 'BA', '31': 'MG', '32': 'ES', '33': 'RJ', '35': 'SP', '41': 'PR',
+    '42': 'SC', '43': 'RS', '50': 'MS', '51': 'MT', '52': 'GO', '53': 'DF',
+}
+
+# Tabelas do pacote (todas com chave primária e sem rowid)
+TABELAS_PACOTE = {
+    'cid10': '''
+        codigo TEXT PRIMARY KEY,
+        descricao TEXT,
+        capitulo TEXT,
+        grupo TEXT,
+        sensivel_atencao_basica BOOLEAN
+    ''',
+    'municipios': '''
+        codigo6 TEXT PRIMARY KEY,
+        codigo7 TEXT,
+        nome TEXT,
+        uf TEXT
+    ''',
+    'procedimentos': '''
+        codigo TEXT PRIMARY KEY,
+        descricao TEXT,
+        grupo TEXT,
+        subgrupo TEXT,
+        forma_organizacao TEXT,
+        grupo_procedimento TEXT,
+        complexidade TEXT,
+        sexo TEXT,
+        idade_minima_meses INTEGER,
+        idade_maxima_meses INTEGER,
+        valor_sh REAL,
+        valor_sa REAL,
+        valor_sp REAL,
+        competencia TEXT
+    ''',
+}
+
+# Índice de busca textual (FTS5) sobre as descrições das três referências
+# remove_diacritics faz 'cesárea' e 'cesarea' caírem no mesmo token; o índice de prefixos
+# atende a busca enquanto o usuário digita ('pneum*')
+TABELA_BUSCA = '''
+    CREATE VIRTUAL TABLE busca USING fts5(
+        tipo UNINDEXED,
+        codigo,
+        descricao,
+        detalhe,
+        tokenize = 'unicode61 remove_diacritics 2',
+        prefix = '2 3'
+    )
+'''
+
+def get_pacote_path():
+    """Retorna o caminho do pacote de referências"""
+    return FILES['referencias']
+
+def calcular_assinatura_fontes():
+    """
+    Calcula a assinatura (SHA-1) dos arquivos de origem e da versão do layout
+    O pacote só precisa ser recompilado quando essa assinatura muda
+    """
+
+    assinatura = hashlib.sha1(VERSAO_PACOTE.encode())
+    for nome, caminho in sorted(FONTES_PACOTE.items()):
+        assinatura.update(nome.encode())
+        if os.path.exists(caminho):
+            with open(caminho, 'rb') as f:
+                assinatura.update(f.read())
+    return assinatura.hexdigest()
+
+def ler_codigos_dtb(arquivo_path):
+    """
+    Extrai os códigos completos (7 dígitos) dos municípios do relatório DTB do IBGE
+    O relatório é exportado coluna a coluna; a coluna 'Código Município Completo' é a única confiável
+    """
+
+    with open(arquivo_path, 'rb') as f:
+        texto = f.read().decode('utf-16')
+
+    # Pares 'Município' (5 dígitos) e código completo, que podem estar separados por uma quebra de página
+    pares = re.findall(r'(?<!\d)(\d{5})\t+(?:"DTB_Munic[^\n]*\n)?(\d{7})(?!\d)', texto)
+    return sorted({completo for codigo, completo in pares if completo[2:] == codigo})
+
+def montar_municipios_referencia():
+    """
+    Combina os códigos da DTB com os nomes da API do IBGE (ou da lista local)
+    Retorna os registros e a origem dos nomes ('api' ou 'local')
+    """
+
+    codigos_dtb = []
+    if os.path.exists(FONTES_PACOTE['dtb']):
+        codigos_dtb = ler_codigos_dtb(FONTES_PACOTE['dtb'])
+
+    print(f"📂 DTB: {len(codigos_dtb)} códigos de município")
+
+    municipios_ibge = buscar_municipios_ibge()
+    origem = 'api'
+    if not municipios_ibge:
+        print("🔄 API do IBGE falhou, usando lista local...")
+        municipios_ibge = get_municipios_fallback()
+        origem = 'local'
+
+    registros = {}
+    for codigo in codigos_dtb:
+        info = municipios_ibge.get(codigo, {})
+        registros[codigo] = (codigo[:6], codigo, info.get('nome'), UFS_IBGE.get(codigo[:2], info.get('uf')))
+
+    # Municípios da API que não constam no relatório DTB
+    for codigo, info in municipios_ibge.items():
+        if codigo not in registros and len(codigo) == 7:
+            registros[codigo] = (codigo[:6], codigo, info['nome'], info['uf'])
+
+    return list(registros.values()), origem
+
+def compilar_pacote_referencias(pacote_path=None, forcar=False):
+    """
+    Compila CID-10, municípios (DTB/IBGE) e procedimentos (SIGTAP) em um único SQLite indexado
+    Retorna o caminho do pacote; não recompila se as fontes não mudaram e os nomes dos
+    municípios vieram da API do IBGE (com a lista local, tenta de novo a cada execução)
+    """
+
+    pacote_path = pacote_path or get_pacote_path()
+    assinatura = calcular_assinatura_fontes()
+
+    if os.path.exists(pacote_path) and not forcar:
+        conn = sqlite3.connect(pacote_path)
+        try:
+            atual = dict(conn.execute("SELECT chave, valor FROM versao"))
+        except sqlite3.Error:
+            atual = {}
+        conn.close()
+        if atual.get('assinatura') == assinatura:
+            if atual.get('municipios_origem') == 'api':
+                print(f"✅ Pacote de referências já atualizado: {pacote_path}")
+                return pacote_path
+            print("⚠️ Nomes dos municípios do pacote vieram da lista local, buscando de novo na API do IBGE")
+
+    print("=== COMPILANDO PACOTE DE REFERÊNCIAS ===")
+
+    # Compila em arquivo temporário e troca no final para não deixar pacote pela metade
+    temp_path = pacote_path + '.tmp'
+    os.makedirs(os.path.dirname(pacote_path), exist_ok=True)
+    if os.path.exists(temp_path):
+        os.remove(temp_path)
+
+    conn = sqlite3.connect(temp_path)
+    cursor = conn.cursor()
+
+    cursor.execute('CREATE TABLE versao (chave TEXT PRIMARY KEY, valor TEXT)')
+
+    for nome, colunas in TABELAS_PACOTE.items():
+        cursor.execute(f'CREATE TABLE {nome} ({colunas}) WITHOUT ROWID')
+
+    # CID-10
+    cid_mapping = processar_arquivo_cid10()
+    cursor.executemany('INSERT INTO cid10 VALUES (?, ?, ?, ?, ?)', [
+        (codigo, info['descricao'], info['capitulo'], info['grupo'], info['sensivel_atencao_basica'])
+        for codigo, info in cid_mapping.items()
+    ])
+
+    # Municípios
+    municipios, municipios_origem = montar_municipios_referencia()
+    cursor.executemany('INSERT OR REPLACE INTO municipios VALUES (?, ?, ?, ?)', municipios)
+
+    # Procedimentos SIGTAP
+    total_procedimentos = 0
+    if os.path.exists(FONTES_PACOTE['sigtap']):
+        procedimentos = ler_tb_procedimento(FONTES_PACOTE['sigtap'])
+        hierarquia = classificar_codigos(procedimentos.index).set_index(procedimentos.index)
+        procedimentos = procedimentos.join(hierarquia)
+        procedimentos['descricao'] = procedimentos['nome'].str.title()
+        colunas = [
+            'descricao', 'grupo', 'subgrupo', 'forma_organizacao', 'grupo_procedimento',
+            'complexidade', 'sexo', 'idade_minima_meses', 'idade_maxima_meses',
+            'valor_sh', 'valor_sa', 'valor_sp', 'competencia'
+        ]
+        registros = procedimentos[colunas].astype(object).where(procedimentos[colunas].notna(), None)
+        cursor.executemany(
+            f'INSERT INTO procedimentos VALUES (?{", ?" * len(colunas)})',
+            registros.itertuples(index=True, name=None)
+        )
+        total_procedimentos = len(registros)
+
+    cursor.execute('CREATE INDEX idx_ref_municipios_codigo7 ON municipios(codigo7)')
+    cursor.execute('CREATE INDEX idx_ref_procedimentos_grupo ON procedimentos(grupo_procedimento)')
+
+    # Busca textual: 'detalhe' guarda o contexto mostrado no resultado (capítulo, grupo, UF)
+    cursor.execute(TABELA_BUSCA)
+    cursor.execute('''
+        INSERT INTO busca (tipo, codigo, descricao, detalhe)
+        SELECT 'cid', codigo, descricao, capitulo FROM cid10 WHERE descricao IS NOT NULL
+        UNION ALL
+        SELECT 'procedimento', codigo, descricao, grupo_procedimento FROM procedimentos WHERE descricao IS NOT NULL
+        UNION ALL
+        SELECT 'municipio', codigo6, nome, uf FROM municipios WHERE nome IS NOT NULL
+    ''')
+    total_busca = cursor.rowcount
+    cursor.execute("INSERT INTO busca (busca) VALUES ('optimize')")
+
+    cursor.executemany('INSERT INTO versao VALUES (?, ?)', [
+        ('versao_pacote', VERSAO_PACOTE),
+        ('assinatura', assinatura),
+        ('municipios_origem', municipios_origem),
+        ('compilado_em', datetime.now().isoformat(timespec='seconds')),
+    ])
+
+    conn.commit()
+    cursor.execute('ANALYZE')
+    conn.close()
+
+    os.replace(temp_path, pacote_path)
+
+    print(f"\n✅ Pacote compilado: {pacote_path}")
+    print(f"   - CID-10: {len(cid_mapping)} códigos")
+    print(f"   - Municípios: {len(municipios)} (nomes: {'API do IBGE' if municipios_origem == 'api' else 'lista local'})")
+    print(f"   - Procedimentos: {total_procedimentos}")
+    print(f"   - Busca textual: {total_busca} descrições")
+
+    return pacote_path
+
+def anexar_pacote(conn, pacote_path=None):
+    """
+    Anexa o pacote de referências à conexão como o schema 'ref'
+    Sem o pacote, anexa um 'ref' vazio em memória para que os joins resultem em placeholders
+    """
+
+    pacote_path = pacote_path or get_pacote_path()
+
+    anexados = [row[1] for row in conn.execute('PRAGMA database_list')]
+    if 'ref' in anexados:
+        return True
+
+    if os.path.exists(pacote_path):
+        conn.execute('ATTACH DATABASE ? AS ref', (pacote_path,))
+        return True
+
+    conn.execute("ATTACH DATABASE ':memory:' AS ref")
+    for nome, colunas in TABELAS_PACOTE.items():
+        conn.execute(f'CREATE TABLE ref.{nome} ({colunas}) WITHOUT ROWID')
+    return False
+
+def inserir_dimensoes_resolvidas(conn, pacote_path=None):
+    """
+    Insere as linhas de CID, procedimentos e municípios já resolvidas pelo pacote de referências
+    Cada linha é gravada uma única vez; placeholders ficam só para códigos desconhecidos
+    """
+
+    if not anexar_pacote(conn, pacote_path):
+        print("⚠️ Pacote de referências não encontrado, inserindo placeholders")
+
+    cursor = conn.cursor()
+
+    # CID-10: código exato e, se não houver, a categoria de 3 caracteres
+    cursor.execute(CONSULTAS['etl_dimensao_cid'])
+    cids = cursor.rowcount
+
+    # Procedimentos: códigos gravados sem o zero à esquerda
+    cursor.execute(CONSULTAS['etl_dimensao_procedimentos'])
+    procedimentos = cursor.rowcount
+
+    # Municípios de residência e de movimento (códigos DATASUS de 6 dígitos)
+    cursor.execute(CONSULTAS['etl_dimensao_municipios'])
+    municipios = cursor.rowcount
+
+    print(f"✅ Dimensões inseridas já resolvidas:")
+    print(f"   - CIDs: {cids}")
+    print(f"   - Procedimentos: {procedimentos}")
+    print(f"   - Municípios: {municipios}")
+
+    return cids + procedimentos + municipios
+
+def enriquecer_banco(conn, pacote_path=None):
+    """
+    Enriquece as tabelas de dimensão do banco principal com joins contra o pacote anexado
+    Usado para reaplicar um pacote novo a um banco já carregado
+    """
+
+    if not anexar_pacote(conn, pacote_path):
+        print("⚠️ Pacote de referências não encontrado, execute scripts/pacote_referencias.py")
+        return False
+
+    cursor = conn.cursor()
+
+    # CID-10: código exato e, se não houver, a categoria de 3 caracteres
+    cursor.execute('''
+        UPDATE cid_diagnosticos
+        SET descricao = r.descricao, capitulo = r.capitulo, grupo = r.grupo,
+            sensivel_atencao_basica = r.sensivel_atencao_basica
+        FROM ref.cid10 r
+        WHERE r.codigo = cid_diagnosticos.codigo
+    ''')
+    cids = cursor.rowcount
+    cursor.execute('''
+        UPDATE cid_diagnosticos
+        SET descricao = r.descricao, capitulo = r.capitulo, grupo = r.grupo,
+            sensivel_atencao_basica = r.sensivel_atencao_basica
+        FROM ref.cid10 r
+        WHERE r.codigo = substr(cid_diagnosticos.codigo, 1, 3)
+        AND cid_diagnosticos.codigo NOT IN (SELECT codigo FROM ref.cid10)
+    ''')
+    cids += cursor.rowcount
+
+    # Procedimentos: códigos gravados sem o zero à esquerda
+    cursor.execute('''
+        UPDATE procedimentos
+        SET descricao = r.descricao, grupo_procedimento = r.grupo_procedimento
+        FROM ref.procedimentos r
+        WHERE r.codigo = substr('0000000000' || procedimentos.codigo, -10)
+    ''')
+    procedimentos = cursor.rowcount
+
+    # Municípios: códigos DATASUS de 6 dígitos (sem dígito verificador)
+    cursor.execute('''
+        UPDATE municipios
+        SET nome = CASE WHEN r.uf = 'PR' THEN COALESCE(r.nome, 'Município PR ' || municipios.codigo)
+                        ELSE 'Outros Estados' END,
+            regiao_saude = CASE WHEN r.uf = 'PR' THEN 'Paraná'
+                                ELSE 'Outros Estados (' || r.uf || ')' END
+        FROM ref.municipios r
+        WHERE r.codigo6 = substr(municipios.codigo, 1, 6)
+    ''')
+    municipios = cursor.rowcount
+
+    conn.commit()
+
+    print(f"✅ Dimensões enriquecidas pelo pacote de referências:")
+    print(f"   - CIDs: {cids}")
+    print(f"   - Procedimentos: {procedimentos}")
+    print(f"   - Municípios: {municipios}")
+
+    return True
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Compila o pacote de referências (CID-10, municípios e procedimentos)')
+    parser.add_argument('--forcar', action='store_true', help='Recompila mesmo se as fontes não mudaram')
+    args = parser.parse_args()
+
+    compilar_pacote_referencias(forcar=args.forcar)
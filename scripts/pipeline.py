@@ -0,0 +1,289 @@
+"""
+Orquestrador do ETL DataSUS
+Executa as etapas como um DAG: consolidação → limpeza → carga → {CNPJ, reinternações,
+taxas} em paralelo → agregados, registrando tempo, registros e memória de cada etapa na
+tabela metadata. CID, municípios e procedimentos já saem resolvidos da carga pelo pacote de
+referências; os scripts de atualização linha a linha ficam para uso avulso
+"""
+
+import sqlite3
+import os
+import sys
+import time
+import argparse
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+# Adiciona o diretório raiz ao path para importar as configurações
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from consolidar_simples import consolidar_csvs_simples
+from data_cleaning import main as limpar_dados
+from create_database import create_database_structure, populate_database
+from atualizar_estabelecimentos_cnpj import atualizar_estabelecimentos_database
+from exportar_analitico import exportar_se_configurado
+from carregar_particoes import carregar_particoes
+from reinternacoes import atualizar_reinternacoes_database
+from taxas_populacionais import atualizar_taxas_database
+from validar_qualidade import validar_qualidade_database
+from deduplicar_aih import deduplicar_consolidado
+from config.settings import PARTICIONAMENTO
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DB_PATH = os.path.join(BASE_DIR, 'database', 'internacoes_datasus.db')
+
+def carregar_banco():
+    """Recria a estrutura do banco e carrega o CSV consolidado (ou as partições por competência)"""
+    if PARTICIONAMENTO['ativo']:
+        return carregar_particoes()
+    create_database_structure()
+    return populate_database()
+
+def atualizar_agregados():
+    """Atualiza as contagens por tabela na metadata e as estatísticas do otimizador"""
+
+    conn = sqlite3.connect(DB_PATH, timeout=60)
+    cursor = conn.cursor()
+
+    tabelas = [
+        'internacoes', 'pacientes', 'estabelecimentos', 'valores_financeiros',
+        'cid_diagnosticos', 'procedimentos', 'municipios'
+    ]
+
+    cursor.execute(
+        f"DELETE FROM metadata WHERE tabela IN ({', '.join('?' * len(tabelas))})",
+        tabelas
+    )
+    for tabela in tabelas:
+        cursor.execute(
+            f'INSERT INTO metadata (tabela, total_registros, fonte_dados) '
+            f'SELECT ?, COUNT(*), ? FROM {tabela}',
+            (tabela, DB_PATH)
+        )
+
+    conn.commit()
+    cursor.execute('ANALYZE')
+    conn.close()
+    return True
+
+# Etapas do ETL: função, dependências e onde contar os registros tocados
+ETAPAS = {
+    'consolidacao': {
+        'funcao': consolidar_csvs_simples,
+        'depende_de': [],
+        'arquivo': os.path.join(BASE_DIR, 'data', 'processed', 'dados_completos_internacoes_pr_2025.csv'),
+    },
+    'limpeza': {
+        'funcao': limpar_dados,
+        'depende_de': ['consolidacao'],
+        'arquivo': os.path.join(BASE_DIR, 'data', 'dados_limpos_internacoes_pr_2025.csv'),
+    },
+    'deduplicacao': {
+        'funcao': deduplicar_consolidado,
+        'depende_de': ['consolidacao'],
+        'arquivo': os.path.join(BASE_DIR, 'data', 'processed', 'dados_completos_internacoes_pr_2025.csv'),
+    },
+    'qualidade': {
+        'funcao': validar_qualidade_database,
+        'depende_de': ['deduplicacao'],
+        'tabela': 'qualidade_dados',
+    },
+    'carga': {
+        'funcao': carregar_banco,
+        'depende_de': ['limpeza', 'deduplicacao'],
+        'tabela': 'internacoes',
+    },
+    'cnpj': {
+        'funcao': atualizar_estabelecimentos_database,
+        'depende_de': ['carga'],
+        'tabela': 'estabelecimentos',
+    },
+    'reinternacoes': {
+        'funcao': atualizar_reinternacoes_database,
+        'depende_de': ['carga'],
+        'tabela': 'internacoes',
+    },
+    'taxas': {
+        'funcao': atualizar_taxas_database,
+        'depende_de': ['carga'],
+        'tabela': 'taxas_municipios',
+    },
+    'agregados': {
+        'funcao': atualizar_agregados,
+        'depende_de': ['cnpj', 'reinternacoes', 'taxas'],
+        'tabela': 'metadata',
+    },
+    'analitico': {
+        'funcao': exportar_se_configurado,
+        'depende_de': ['agregados'],
+    },
+}
+
+# Com o particionamento ativo, cada partição já sai com as dimensões resolvidas pelo pacote de
+# referências; as etapas que atualizam o banco único não se aplicam
+ETAPAS_PARTICIONADAS = ['consolidacao', 'deduplicacao', 'qualidade', 'limpeza', 'carga']
+
+def contar_registros(etapa):
+    """Conta os registros da tabela ou do arquivo produzido pela etapa"""
+
+    if 'tabela' in etapa and os.path.exists(DB_PATH):
+        conn = sqlite3.connect(DB_PATH, timeout=60)
+        try:
+            return conn.execute(f"SELECT COUNT(*) FROM {etapa['tabela']}").fetchone()[0]
+        except sqlite3.Error:
+            return None
+        finally:
+            conn.close()
+
+    if 'arquivo' in etapa and os.path.exists(etapa['arquivo']):
+        with open(etapa['arquivo'], 'rb') as f:
+            # Desconta a linha de cabeçalho
+            return max(sum(1 for _ in f) - 1, 0)
+
+    return None
+
+def executar_etapa(nome):
+    """
+    Executa uma etapa em um processo próprio e mede tempo, registros e pico de memória
+    Roda dentro do pool de processos, por isso recebe apenas o nome da etapa
+    """
+
+    etapa = ETAPAS[nome]
+
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    try:
+        resultado = etapa['funcao']()
+        sucesso = resultado is not False
+        erro = None
+    except Exception as e:
+        sucesso = False
+        erro = str(e)
+    duracao = time.perf_counter() - inicio
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'etapa': nome,
+        'sucesso': sucesso,
+        'erro': erro,
+        'duracao_segundos': duracao,
+        'registros': contar_registros(etapa),
+        'memoria_pico_mb': pico / (1024 * 1024),
+    }
+
+def registrar_metricas(metricas):
+    """Grava as métricas de cada etapa na tabela metadata"""
+
+    if not os.path.exists(DB_PATH):
+        print("⚠️ Banco de dados não encontrado, métricas não registradas")
+        return
+
+    conn = sqlite3.connect(DB_PATH, timeout=60)
+    cursor = conn.cursor()
+
+    # Bancos criados antes das colunas de métricas
+    cursor.execute("PRAGMA table_info(metadata)")
+    colunas = [col[1] for col in cursor.fetchall()]
+    if 'duracao_segundos' not in colunas:
+        cursor.execute('ALTER TABLE metadata ADD COLUMN duracao_segundos REAL')
+        cursor.execute('ALTER TABLE metadata ADD COLUMN memoria_pico_mb REAL')
+
+    cursor.executemany('''
+        INSERT INTO metadata (tabela, total_registros, fonte_dados, duracao_segundos, memoria_pico_mb)
+        VALUES (?, ?, ?, ?, ?)
+    ''', [
+        (f"etapa:{m['etapa']}", m['registros'], 'pipeline' if m['sucesso'] else f"pipeline (falhou: {m['erro']})",
+         m['duracao_segundos'], m['memoria_pico_mb'])
+        for m in metricas
+    ])
+
+    conn.commit()
+    conn.close()
+
+def ativar_wal():
+    """Ativa o modo WAL, que permite leituras enquanto uma etapa de enriquecimento grava"""
+    if os.path.exists(DB_PATH):
+        conn = sqlite3.connect(DB_PATH, timeout=60)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.close()
+
+def executar_pipeline(etapas=None, max_workers=4):
+    """
+    Executa as etapas respeitando as dependências; etapas independentes rodam em paralelo
+    Se 'etapas' for informado, executa só essas (as dependências fora da lista são consideradas prontas)
+    """
+
+    selecionadas = list(etapas) if etapas else list(ETAPAS_PARTICIONADAS if PARTICIONAMENTO['ativo'] else ETAPAS)
+    pendentes = set(selecionadas)
+    concluidas = set(ETAPAS) - pendentes
+    falharam = set()
+    metricas = []
+
+    # Etapas de limpeza usam caminhos relativos à raiz do projeto
+    os.chdir(BASE_DIR)
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        em_execucao = {}
+
+        while pendentes or em_execucao:
+            # Etapas cujas dependências falharam não são executadas
+            for nome in sorted(pendentes):
+                if any(dep in falharam for dep in ETAPAS[nome]['depende_de']):
+                    print(f"⏭️ Etapa '{nome}' ignorada: dependência falhou")
+                    pendentes.discard(nome)
+                    falharam.add(nome)
+
+            prontas = [
+                nome for nome in selecionadas
+                if nome in pendentes and all(dep in concluidas for dep in ETAPAS[nome]['depende_de'])
+            ]
+            if prontas:
+                ativar_wal()
+            for nome in prontas:
+                print(f"▶️ Iniciando etapa '{nome}'")
+                pendentes.discard(nome)
+                em_execucao[executor.submit(executar_etapa, nome)] = nome
+
+            if not em_execucao:
+                break
+
+            finalizadas, _ = wait(em_execucao, return_when=FIRST_COMPLETED)
+            for futuro in finalizadas:
+                nome = em_execucao.pop(futuro)
+                metrica = futuro.result()
+                metricas.append(metrica)
+
+                if metrica['sucesso']:
+                    concluidas.add(nome)
+                    print(f"✅ Etapa '{nome}' concluída em {metrica['duracao_segundos']:.1f}s "
+                          f"({metrica['registros']} registros, pico {metrica['memoria_pico_mb']:.1f} MB)")
+                else:
+                    falharam.add(nome)
+                    print(f"❌ Etapa '{nome}' falhou: {metrica['erro'] or 'retornou False'}")
+
+    registrar_metricas(metricas)
+
+    return metricas
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Executa o ETL DataSUS como um DAG de etapas')
+    parser.add_argument('--etapas', nargs='+', choices=list(ETAPAS),
+                        help='Executa apenas as etapas informadas')
+    parser.add_argument('--workers', type=int, default=4,
+                        help='Número máximo de etapas executadas em paralelo')
+    args = parser.parse_args()
+
+    print("=== PIPELINE ETL DATASUS ===")
+    print()
+
+    metricas = executar_pipeline(args.etapas, args.workers)
+
+    print("\n📊 Resumo das etapas:")
+    for m in metricas:
+        status = '✅' if m['sucesso'] else '❌'
+        print(f"   {status} {m['etapa']}: {m['duracao_segundos']:.1f}s, "
+              f"{m['registros']} registros, pico {m['memoria_pico_mb']:.1f} MB")
+
+    if not all(m['sucesso'] for m in metricas):
+        exit(1)
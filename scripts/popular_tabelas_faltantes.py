@@ -1,5 +1,13 @@
 import sqlite3
 import os
+import sys
+
+# Adiciona o diretório raiz ao path para importar as consultas registradas
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.consultas import CONSULTAS
+
+from pacote_referencias import inserir_dimensoes_resolvidas
 
 def popular_tabelas_faltantes():
     """
@@ -21,41 +29,9 @@ def popular_tabelas_faltantes():
     # Limpar tabela metadata primeiro se existir
     cursor.execute('DELETE FROM metadata')
     
-    # Popular tabela de procedimentos com dados reais
-    print("Populando tabela de procedimentos...")
-    cursor.execute('''
-        INSERT OR IGNORE INTO procedimentos (codigo, descricao, grupo_procedimento)
-        SELECT DISTINCT codigo_procedimento_solicitado, 
-               'Procedimento ' || codigo_procedimento_solicitado,
-               'Não classificado'
-        FROM internacoes 
-        WHERE codigo_procedimento_solicitado IS NOT NULL 
-        AND codigo_procedimento_solicitado != ''
-        AND codigo_procedimento_solicitado != '0'
-    ''')
-    
-    # Popular tabela de municípios com dados reais (códigos únicos dos pacientes)
-    print("Populando tabela de municípios...")
-    cursor.execute('''
-        INSERT OR IGNORE INTO municipios (codigo, nome, regiao_saude)
-        SELECT DISTINCT codigo_municipio_residencia, 
-               'Município ' || codigo_municipio_residencia,
-               'Paraná'
-        FROM pacientes 
-        WHERE codigo_municipio_residencia IS NOT NULL 
-        AND codigo_municipio_residencia != ''
-    ''')
-    
-    # Adicionar também municípios de movimento dos estabelecimentos
-    cursor.execute('''
-        INSERT OR IGNORE INTO municipios (codigo, nome, regiao_saude)
-        SELECT DISTINCT codigo_municipio_movimento, 
-               'Município ' || codigo_municipio_movimento,
-               'Paraná'
-        FROM estabelecimentos 
-        WHERE codigo_municipio_movimento IS NOT NULL 
-        AND codigo_municipio_movimento != ''
-    ''')
+    # Popular procedimentos e municípios (e CIDs faltantes) já resolvidos pelo pacote de referências
+    print("Populando tabelas de procedimentos e municípios...")
+    inserir_dimensoes_resolvidas(conn)
     
     # Atualizar metadados
     print("Atualizando metadados...")
@@ -83,26 +59,12 @@ def popular_tabelas_faltantes():
     
     # Mostrar alguns exemplos
     print("\nExemplos de procedimentos:")
-    cursor.execute('''
-        SELECT p.codigo, p.descricao, COUNT(*) as frequencia
-        FROM procedimentos p
-        JOIN internacoes i ON p.codigo = i.codigo_procedimento_solicitado
-        GROUP BY p.codigo, p.descricao
-        ORDER BY COUNT(*) DESC
-        LIMIT 5
-    ''')
+    cursor.execute(CONSULTAS['etl_exemplos_procedimentos'])
     for codigo, desc, freq in cursor.fetchall():
         print(f"   - {codigo}: {desc} ({freq:,} casos)")
     
     print("\nExemplos de municípios:")
-    cursor.execute('''
-        SELECT m.codigo, m.nome, COUNT(*) as frequencia
-        FROM municipios m
-        JOIN pacientes p ON m.codigo = p.codigo_municipio_residencia
-        GROUP BY m.codigo, m.nome
-        ORDER BY COUNT(*) DESC
-        LIMIT 5
-    ''')
+    cursor.execute(CONSULTAS['etl_exemplos_municipios'])
     for codigo, nome, freq in cursor.fetchall():
         print(f"   - {codigo}: {nome} ({freq:,} pacientes)")
     
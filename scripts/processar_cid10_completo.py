@@ -1,7 +1,13 @@
 import sqlite3
 import os
+import sys
 import re
 
+# Adiciona o diretório raiz ao path para importar as consultas registradas
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.consultas import CONSULTAS
+
 def processar_arquivo_cid10():
     """
     Processa o arquivo CID-10 completo e extrai todos os códigos e descrições
@@ -154,7 +160,8 @@ def atualizar_todos_cids_banco():
         print("Nenhum código CID-10 foi extraído!")
         return
     
-    conn = sqlite3.connect(db_path)
+    # Timeout maior: as etapas de enriquecimento podem rodar em paralelo (scripts/pipeline.py)
+    conn = sqlite3.connect(db_path, timeout=60)
     cursor = conn.cursor()
     
     print("Atualizando banco de dados...")
@@ -279,20 +286,7 @@ def atualizar_todos_cids_banco():
     
     # Mostrar alguns exemplos dos CIDs atualizados
     print(f"\nExemplos de CIDs atualizados:")
-    cursor.execute("""
-        SELECT 
-            i.codigo_diagnostico_principal,
-            cid.descricao,
-            COUNT(*) as frequencia
-        FROM internacoes i
-        LEFT JOIN cid_diagnosticos cid ON i.codigo_diagnostico_principal = cid.codigo
-        WHERE i.codigo_diagnostico_principal IS NOT NULL
-        AND cid.descricao IS NOT NULL
-        AND cid.descricao NOT LIKE 'Diagnóstico %'
-        GROUP BY i.codigo_diagnostico_principal, cid.descricao
-        ORDER BY COUNT(*) DESC
-        LIMIT 10
-    """)
+    cursor.execute(CONSULTAS['relatorio_cid_frequentes'])
     
     results = cursor.fetchall()
     for i, (codigo, descricao, freq) in enumerate(results, 1):
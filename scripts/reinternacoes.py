@@ -0,0 +1,160 @@
+"""
+Detecção de reinternações
+Ordena as internações por paciente e data de internação e compara cada uma com a anterior do
+mesmo paciente de forma vetorizada (O(n log n) pela ordenação), gravando em 'internacoes'
+se ela é uma reinternação em até N dias da alta anterior e se foi seguida de uma
+"""
+
+import sqlite3
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+import pandas as pd
+
+# Adiciona o diretório raiz ao path para importar as consultas registradas
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.consultas import CONSULTAS
+
+DB_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'database', 'internacoes_datasus.db')
+
+DIAS_REINTERNACAO = 30
+
+# O RD não traz identificador do paciente: a chave combina nascimento, sexo, município e CEP
+# (a idade fica de fora porque muda entre internações do mesmo paciente)
+COLUNAS_CHAVE_PACIENTE = ['data_nascimento', 'codigo_sexo', 'codigo_municipio_residencia', 'cep']
+
+COLUNAS_REINTERNACAO = {
+    'reinternacao': 'BOOLEAN',
+    'dias_desde_alta_anterior': 'INTEGER',
+    'gerou_reinternacao': 'BOOLEAN',
+}
+
+def garantir_colunas(conn):
+    """Acrescenta as colunas de reinternação em bancos criados antes delas"""
+    existentes = {row[1] for row in conn.execute('PRAGMA table_info(internacoes)')}
+    for coluna, tipo in COLUNAS_REINTERNACAO.items():
+        if coluna not in existentes:
+            conn.execute(f'ALTER TABLE internacoes ADD COLUMN {coluna} {tipo}')
+
+def datas_em_dias(valores):
+    """Datas AAAAMMDD (texto ou número) em dias desde 1970; inválidas viram NaT"""
+    datas = pd.to_datetime(pd.Series(valores).astype(str).str[:8], format='%Y%m%d', errors='coerce')
+    return datas.to_numpy(dtype='datetime64[D]')
+
+def chave_paciente(df):
+    """Código inteiro por paciente, a partir das colunas de COLUNAS_CHAVE_PACIENTE"""
+    chaves = pd.MultiIndex.from_frame(df[COLUNAS_CHAVE_PACIENTE].astype(str))
+    return pd.factorize(chaves)[0]
+
+def marcar_reinternacoes(chaves, entradas, saidas, dias=DIAS_REINTERNACAO):
+    """
+    Compara cada internação com a anterior do mesmo paciente (por data de internação)
+    Retorna, na ordem de entrada: reinternação (bool), dias desde a alta anterior (float, NaN
+    sem internação anterior) e se a internação foi seguida de uma reinternação (bool)
+    Internações que começam antes da alta anterior (transferências) não contam
+    """
+
+    n = len(chaves)
+    reinternacao = np.zeros(n, dtype=bool)
+    gerou = np.zeros(n, dtype=bool)
+    intervalo = np.full(n, np.nan)
+    if n < 2:
+        return reinternacao, intervalo, gerou
+
+    ordem = np.lexsort((entradas, chaves))
+    chaves, entradas, saidas = chaves[ordem], entradas[ordem], saidas[ordem]
+
+    mesmo_paciente = chaves[1:] == chaves[:-1]
+    dias_desde_alta = (entradas[1:] - saidas[:-1]).astype('timedelta64[D]').astype(float)
+    dias_desde_alta[np.isnat(entradas[1:]) | np.isnat(saidas[:-1])] = np.nan
+
+    validos = mesmo_paciente & ~np.isnan(dias_desde_alta)
+    with np.errstate(invalid='ignore'):
+        marcadas = validos & (dias_desde_alta >= 0) & (dias_desde_alta <= dias)
+
+    # Posição i+1 na ordem ordenada é a reinternação; a posição i foi seguida dela
+    reinternacao[ordem[1:]] = marcadas
+    gerou[ordem[:-1]] = marcadas
+    intervalo[ordem[1:]] = np.where(validos, dias_desde_alta, np.nan)
+    return reinternacao, intervalo, gerou
+
+def calcular_reinternacoes(conn, dias=DIAS_REINTERNACAO):
+    """Marca as reinternações de todas as internações do banco; retorna quantas foram marcadas"""
+
+    garantir_colunas(conn)
+    base = pd.read_sql_query(CONSULTAS['etl_reinternacoes_base'], conn)
+
+    reinternacao, intervalo, gerou = marcar_reinternacoes(
+        chave_paciente(base),
+        datas_em_dias(base['data_internacao']),
+        datas_em_dias(base['data_saida']),
+        dias
+    )
+
+    # Grava por uma tabela temporária e um único UPDATE ... FROM
+    conn.execute('DROP TABLE IF EXISTS temp.reinternacoes_calculadas')
+    conn.execute('''
+        CREATE TEMP TABLE reinternacoes_calculadas (
+            id INTEGER PRIMARY KEY, reinternacao BOOLEAN, dias_desde_alta_anterior INTEGER, gerou_reinternacao BOOLEAN
+        )
+    ''')
+    conn.executemany(
+        'INSERT INTO temp.reinternacoes_calculadas VALUES (?, ?, ?, ?)',
+        zip(
+            base['id'].tolist(),
+            reinternacao.tolist(),
+            [None if np.isnan(d) else int(d) for d in intervalo],
+            gerou.tolist()
+        )
+    )
+    conn.execute('''
+        UPDATE internacoes
+        SET reinternacao = r.reinternacao,
+            dias_desde_alta_anterior = r.dias_desde_alta_anterior,
+            gerou_reinternacao = r.gerou_reinternacao
+        FROM temp.reinternacoes_calculadas r
+        WHERE r.id = internacoes.id
+    ''')
+    conn.execute('DROP TABLE temp.reinternacoes_calculadas')
+    conn.commit()
+
+    return int(reinternacao.sum())
+
+def atualizar_reinternacoes_database(dias=DIAS_REINTERNACAO):
+    """Etapa do pipeline: marca as reinternações no banco principal e mostra as maiores taxas"""
+
+    if not os.path.exists(DB_PATH):
+        print("Banco de dados não encontrado!")
+        return False
+
+    conn = sqlite3.connect(DB_PATH, timeout=60)
+
+    print(f"=== REINTERNAÇÕES EM ATÉ {dias} DIAS ===")
+    inicio = time.perf_counter()
+    marcadas = calcular_reinternacoes(conn, dias)
+    total = conn.execute('SELECT COUNT(*) FROM internacoes').fetchone()[0]
+    print(f"✅ {marcadas:,} reinternações em {total:,} internações ({time.perf_counter() - inicio:.1f}s)")
+
+    print("\nDiagnósticos com maior taxa de reinternação:")
+    for codigo, descricao, internacoes, reinternacoes, taxa in conn.execute(CONSULTAS['relatorio_reinternacao_cid']):
+        print(f"  {codigo} - {descricao}: {reinternacoes}/{internacoes} ({taxa:.1f}%)")
+
+    print("\nMunicípios com maior taxa de reinternação:")
+    for codigo, nome, internacoes, reinternacoes, taxa in conn.execute(CONSULTAS['relatorio_reinternacao_municipio']):
+        print(f"  {codigo} - {nome}: {reinternacoes}/{internacoes} ({taxa:.1f}%)")
+
+    conn.close()
+    return True
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Marca as reinternações no banco de internações')
+    parser.add_argument('--dias', type=int, default=DIAS_REINTERNACAO,
+                        help='Intervalo máximo entre a alta e a nova internação')
+    args = parser.parse_args()
+
+    if not atualizar_reinternacoes_database(args.dias):
+        sys.exit(1)
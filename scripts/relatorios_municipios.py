@@ -0,0 +1,298 @@
+"""
+Relatórios em lote por município de residência
+Lê a base uma única vez, calcula os indicadores de todos os grupos com groupby (KPIs, principais
+causas, composição dos custos, caráter da internação e evolução mensal) e distribui as tabelas já
+separadas por grupo entre processos que gravam um relatório HTML (ou CSVs) para cada um
+"""
+
+import os
+import re
+import sys
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from html import escape
+
+import pandas as pd
+
+# Adiciona o diretório raiz ao path para importar a configuração e as consultas
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.settings import DATABASE, DIRS, MESES, PARTICIONAMENTO
+from config.motor import executar_consulta
+from config.particoes import executar_consulta_particionada
+
+# Agrupamentos dos relatórios: coluna da chave e coluna do nome exibido
+# (municipios.regiao_saude guarda só o estado, não a região de saúde, por isso não é um nível)
+NIVEIS = {
+    'municipio': {'chave': 'codigo_municipio_residencia', 'nome': 'municipio', 'titulo': 'Município de Residência'},
+}
+
+TOP_CAUSAS = 10
+
+# Relatórios entregues a cada tarefa do pool (menos tarefas, menos serialização)
+RELATORIOS_POR_TAREFA = 25
+
+COMPONENTES_CUSTO = {
+    'valor_servicos_hospitalares': 'Serviços Hospitalares',
+    'valor_servicos_profissionais': 'Serviços Profissionais',
+    'valor_uti': 'UTI',
+}
+
+ESTILO = '''
+    body { font-family: Arial, sans-serif; margin: 2em; color: #222; }
+    h1 { color: #1f4e79; } h2 { color: #1f4e79; border-bottom: 1px solid #ccc; padding-bottom: .2em; }
+    .kpis { display: flex; gap: 1em; flex-wrap: wrap; }
+    .kpi { background: #f2f6fa; border-radius: 6px; padding: .8em 1.2em; min-width: 12em; }
+    .kpi b { display: block; font-size: 1.4em; } .kpi small { color: #666; }
+    table { border-collapse: collapse; margin: .5em 0 1.5em; }
+    th, td { padding: .35em .8em; border-bottom: 1px solid #ddd; text-align: left; }
+    th { background: #1f4e79; color: #fff; }
+'''
+
+def moeda(valor):
+    """Valor em reais no formato brasileiro"""
+    return 'R$ ' + f'{valor:,.2f}'.replace(',', 'X').replace('.', ',').replace('X', '.')
+
+def numero(valor, casas=0):
+    return f'{valor:,.{casas}f}'.replace(',', 'X').replace('.', ',').replace('X', '.')
+
+def nome_arquivo(codigo):
+    """Nome de arquivo seguro para o código do grupo"""
+    return re.sub(r'[^\w-]+', '_', str(codigo)).strip('_') or 'sem_codigo'
+
+def carregar_base():
+    """Base dos relatórios numa única leitura (das partições, quando ativas)"""
+    if PARTICIONAMENTO['ativo'] and DATABASE['engine'] == 'sqlite':
+        return executar_consulta_particionada('relatorio_lote_base')
+    return executar_consulta('relatorio_lote_base')
+
+def preparar_base(df, nivel):
+    """Preenche nomes ausentes e converte a chave em categoria para os groupby"""
+
+    chave = NIVEIS[nivel]['chave']
+    df['municipio'] = df['municipio'].fillna('Município ' + df['codigo_municipio_residencia'].astype(str))
+    df['diagnostico'] = df['diagnostico'].fillna('Diagnóstico ' + df['codigo_diagnostico_principal'].astype(str))
+    df['carater_internacao'] = df['carater_internacao'].fillna('Não informado')
+    df[chave] = df[chave].astype('category')
+    return df
+
+def resumo_kpis(grupos):
+    """KPIs da visão geral a partir de um groupby (ou do DataFrame inteiro)"""
+    return grupos.agg(
+        internacoes=('valor_total', 'size'),
+        valor_total=('valor_total', 'sum'),
+        valor_medio=('valor_total', 'mean'),
+        permanencia_media=('dias_permanencia', 'mean'),
+        dias_uti=('dias_uti_total', 'sum'),
+    )
+
+def calcular_indicadores(df, nivel):
+    """Todas as tabelas dos relatórios, de todos os grupos, em groupby sobre a mesma base"""
+
+    chave = NIVEIS[nivel]['chave']
+    grupos = df.groupby(chave, observed=True)
+
+    kpis = resumo_kpis(grupos)
+    kpis['nome'] = grupos[NIVEIS[nivel]['nome']].first()
+
+    custos = grupos[list(COMPONENTES_CUSTO)].sum()
+
+    causas = df.groupby([chave, 'codigo_diagnostico_principal', 'diagnostico'], observed=True).agg(
+        internacoes=('valor_total', 'size'),
+        valor_total=('valor_total', 'sum'),
+        permanencia_media=('dias_permanencia', 'mean'),
+    ).reset_index().sort_values([chave, 'internacoes'], ascending=[True, False])
+    causas = causas.groupby(chave, observed=True).head(TOP_CAUSAS)
+
+    carater = df.groupby([chave, 'carater_internacao'], observed=True).agg(
+        internacoes=('valor_total', 'size'),
+        valor_total=('valor_total', 'sum'),
+    ).reset_index()
+
+    mensal = df.groupby([chave, 'ano_competencia', 'mes_competencia'], observed=True).agg(
+        internacoes=('valor_total', 'size'),
+        valor_total=('valor_total', 'sum'),
+        permanencia_media=('dias_permanencia', 'mean'),
+    ).reset_index()
+
+    return kpis, custos, {'causas': causas, 'carater': carater, 'mensal': mensal}
+
+def separar_por_grupo(kpis, custos, tabelas, chave):
+    """Fan-out: as tabelas de cada grupo, com uma única divisão de cada tabela"""
+
+    relatorios = {
+        codigo: {'kpis': kpis.loc[codigo].to_dict(), 'custos': custos.loc[codigo].to_dict()}
+        for codigo in kpis.index
+    }
+    for nome, tabela in tabelas.items():
+        for codigo, parte in tabela.groupby(chave, observed=True):
+            relatorios[codigo][nome] = parte.drop(columns=chave).reset_index(drop=True)
+    return relatorios
+
+def tabela_html(df, colunas):
+    """Tabela HTML com as colunas renomeadas e formatadas: {coluna: (título, formatador)}"""
+
+    if df is None or df.empty:
+        return '<p>Sem registros.</p>'
+    formatada = pd.DataFrame({
+        titulo: df[coluna].map(formatador) if formatador else df[coluna]
+        for coluna, (titulo, formatador) in colunas.items()
+    })
+    return formatada.to_html(index=False, border=0, escape=True)
+
+def html_relatorio(codigo, relatorio, nivel, referencia, gerado_em):
+    """Página HTML estática de um grupo"""
+
+    kpis, custos = relatorio['kpis'], relatorio['custos']
+    total_custos = sum(custos.values()) or 1
+
+    cartoes = [
+        ('Internações', numero(kpis['internacoes']), f"{kpis['internacoes'] / referencia['internacoes'] * 100:.1f}% do estado"),
+        ('Valor Total', moeda(kpis['valor_total']), f"{kpis['valor_total'] / referencia['valor_total'] * 100:.1f}% do estado"),
+        ('Valor Médio', moeda(kpis['valor_medio']), f"estado: {moeda(referencia['valor_medio'])}"),
+        ('Permanência Média', f"{numero(kpis['permanencia_media'], 1)} dias", f"estado: {numero(referencia['permanencia_media'], 1)} dias"),
+        ('Diárias de UTI', numero(kpis['dias_uti']), ''),
+    ]
+    composicao = pd.DataFrame({
+        'componente': [COMPONENTES_CUSTO[coluna] for coluna in COMPONENTES_CUSTO],
+        'valor': [custos[coluna] for coluna in COMPONENTES_CUSTO],
+        'percentual': [custos[coluna] / total_custos * 100 for coluna in COMPONENTES_CUSTO],
+    })
+    mensal = relatorio.get('mensal')
+    if mensal is not None:
+        mensal = mensal.assign(competencia=mensal['mes_competencia'].map(MESES) + '/' + mensal['ano_competencia'].astype(str))
+
+    secoes = [
+        '<h2>📊 Visão Geral</h2><div class="kpis">' + ''.join(
+            f'<div class="kpi">{escape(titulo)}<b>{valor}</b><small>{escape(nota)}</small></div>'
+            for titulo, valor, nota in cartoes
+        ) + '</div>',
+        f'<h2>🏥 Principais Causas (top {TOP_CAUSAS})</h2>' + tabela_html(relatorio.get('causas'), {
+            'codigo_diagnostico_principal': ('CID', None),
+            'diagnostico': ('Diagnóstico', None),
+            'internacoes': ('Internações', numero),
+            'valor_total': ('Valor Total', moeda),
+            'permanencia_media': ('Permanência Média', lambda v: numero(v, 1)),
+        }),
+        '<h2>💰 Composição dos Custos</h2>' + tabela_html(composicao, {
+            'componente': ('Componente', None),
+            'valor': ('Valor', moeda),
+            'percentual': ('% do Total', lambda v: f'{numero(v, 1)}%'),
+        }),
+        '<h2>🚑 Caráter da Internação</h2>' + tabela_html(relatorio.get('carater'), {
+            'carater_internacao': ('Caráter', None),
+            'internacoes': ('Internações', numero),
+            'valor_total': ('Valor Total', moeda),
+        }),
+        '<h2>📈 Evolução Mensal</h2>' + tabela_html(mensal, {
+            'competencia': ('Competência', None),
+            'internacoes': ('Internações', numero),
+            'valor_total': ('Valor Total', moeda),
+            'permanencia_media': ('Permanência Média', lambda v: numero(v, 1)),
+        }),
+    ]
+
+    titulo = f"{NIVEIS[nivel]['titulo']}: {kpis['nome']}"
+    if nivel == 'municipio':
+        titulo += f' ({codigo})'
+    return f'''<!DOCTYPE html>
+<html lang="pt-BR">
+<head><meta charset="utf-8"><title>{escape(titulo)}</title><style>{ESTILO}</style></head>
+<body>
+<h1>🏥 Relatório de Internações Hospitalares</h1>
+<p><b>{escape(titulo)}</b><br><small>SIH/SUS · gerado em {gerado_em}</small></p>
+{''.join(secoes)}
+</body>
+</html>
+'''
+
+def gravar_relatorios(lote, nivel, formato, destino, referencia, gerado_em):
+    """Tarefa do pool: grava os relatórios de um lote de grupos; retorna quantos gravou"""
+
+    for codigo, relatorio in lote:
+        arquivo = nome_arquivo(codigo)
+        if formato == 'html':
+            with open(os.path.join(destino, f'{arquivo}.html'), 'w', encoding='utf-8') as f:
+                f.write(html_relatorio(codigo, relatorio, nivel, referencia, gerado_em))
+        else:
+            pasta = os.path.join(destino, arquivo)
+            os.makedirs(pasta, exist_ok=True)
+            pd.DataFrame([relatorio['kpis'] | relatorio['custos']]).to_csv(os.path.join(pasta, 'kpis.csv'), index=False)
+            for nome in ('causas', 'carater', 'mensal'):
+                if nome in relatorio:
+                    relatorio[nome].to_csv(os.path.join(pasta, f'{nome}.csv'), index=False)
+    return len(lote)
+
+def gravar_indice(kpis, nivel, formato, destino, gerado_em):
+    """Índice com os KPIs de todos os grupos e o link de cada relatório"""
+
+    kpis = kpis.sort_values('internacoes', ascending=False)
+    if formato == 'csv':
+        kpis.to_csv(os.path.join(destino, 'indice.csv'), index_label=NIVEIS[nivel]['chave'])
+        return
+
+    linhas = ''.join(
+        f'<tr><td><a href="{nome_arquivo(codigo)}.html">{escape(str(linha.nome))}</a></td>'
+        f'<td>{numero(linha.internacoes)}</td><td>{moeda(linha.valor_total)}</td>'
+        f'<td>{moeda(linha.valor_medio)}</td><td>{numero(linha.permanencia_media, 1)}</td></tr>'
+        for codigo, linha in zip(kpis.index, kpis.itertuples())
+    )
+    with open(os.path.join(destino, 'index.html'), 'w', encoding='utf-8') as f:
+        f.write(f'''<!DOCTYPE html>
+<html lang="pt-BR">
+<head><meta charset="utf-8"><title>Relatórios por {NIVEIS[nivel]['titulo']}</title><style>{ESTILO}</style></head>
+<body>
+<h1>🏥 Relatórios por {NIVEIS[nivel]['titulo']}</h1>
+<p><small>{len(kpis)} relatórios · gerado em {gerado_em}</small></p>
+<table><tr><th>{NIVEIS[nivel]['titulo']}</th><th>Internações</th><th>Valor Total</th><th>Valor Médio</th><th>Permanência Média</th></tr>
+{linhas}
+</table>
+</body>
+</html>
+''')
+
+def gerar_relatorios(nivel='municipio', formato='html', destino=None, workers=None):
+    """Gera os relatórios de todos os grupos do nível; retorna o diretório de saída"""
+
+    destino = destino or os.path.join(DIRS['relatorios'], nivel)
+    os.makedirs(destino, exist_ok=True)
+    gerado_em = datetime.now().strftime('%d/%m/%Y %H:%M')
+
+    print(f"=== RELATÓRIOS POR {NIVEIS[nivel]['titulo'].upper()} ===")
+    inicio = time.perf_counter()
+    df = preparar_base(carregar_base(), nivel)
+    print(f"✅ {len(df):,} internações lidas ({time.perf_counter() - inicio:.1f}s)")
+
+    inicio = time.perf_counter()
+    referencia = resumo_kpis(df.assign(estado=0).groupby('estado')).iloc[0].to_dict()
+    kpis, custos, tabelas = calcular_indicadores(df, nivel)
+    relatorios = separar_por_grupo(kpis, custos, tabelas, NIVEIS[nivel]['chave'])
+    print(f"✅ Indicadores de {len(relatorios):,} grupos calculados ({time.perf_counter() - inicio:.1f}s)")
+
+    inicio = time.perf_counter()
+    itens = list(relatorios.items())
+    lotes = [itens[i:i + RELATORIOS_POR_TAREFA] for i in range(0, len(itens), RELATORIOS_POR_TAREFA)]
+    gravados = 0
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        tarefas = [
+            executor.submit(gravar_relatorios, lote, nivel, formato, destino, referencia, gerado_em)
+            for lote in lotes
+        ]
+        for tarefa in tarefas:
+            gravados += tarefa.result()
+    gravar_indice(kpis, nivel, formato, destino, gerado_em)
+    print(f"✅ {gravados:,} relatórios {formato.upper()} gravados em {destino} ({time.perf_counter() - inicio:.1f}s)")
+
+    return destino
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Gera relatórios estáticos por município de residência')
+    parser.add_argument('--nivel', choices=list(NIVEIS), default='municipio')
+    parser.add_argument('--formato', choices=['html', 'csv'], default='html')
+    parser.add_argument('--destino', help='Diretório de saída (padrão: data/relatorios/<nivel>)')
+    parser.add_argument('--workers', type=int, default=None, help='Processos de renderização (padrão: núcleos da máquina)')
+    args = parser.parse_args()
+
+    gerar_relatorios(args.nivel, args.formato, args.destino, args.workers)
@@ -0,0 +1,72 @@
+"""
+Taxas de internação e de custo por 10 mil habitantes
+Lê as estimativas populacionais (data/raw/populacao_municipios.csv), preenche a população dos
+municípios e grava na tabela taxas_municipios as taxas brutas e padronizadas por idade e sexo
+de cada município x CID x competência, mostrando as maiores do período inteiro
+"""
+
+import sqlite3
+import os
+import sys
+import time
+import argparse
+
+# Adiciona o diretório raiz ao path para importar o motor de taxas
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.settings import FILES
+from config.taxas import (
+    TODOS, ler_populacao, linhas_populacao, casos_por_estrato, calcular_taxas, gravar_taxas,
+    atualizar_populacao_municipios
+)
+
+DB_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'database', 'internacoes_datasus.db')
+
+def atualizar_taxas_database(populacao_path=None):
+    """Etapa do pipeline: calcula as taxas por habitante; sem estimativas populacionais, não faz nada"""
+
+    if not os.path.exists(DB_PATH):
+        print("Banco de dados não encontrado!")
+        return False
+
+    populacao_path = populacao_path or FILES['populacao']
+    if not os.path.exists(populacao_path):
+        print(f"⚠️ Estimativas populacionais não encontradas em {populacao_path}; taxas não calculadas")
+        return True
+
+    print("=== TAXAS POR 10 MIL HABITANTES ===")
+    inicio = time.perf_counter()
+    indice, codigos, populacao = ler_populacao(populacao_path)
+    print(f"✅ População de {len(codigos):,} municípios carregada ({populacao.sum():,.0f} habitantes)")
+
+    conn = sqlite3.connect(DB_PATH, timeout=60)
+    try:
+        atualizados = atualizar_populacao_municipios(conn, indice, codigos, populacao)
+        print(f"✅ População preenchida em {atualizados:,} municípios")
+
+        casos = casos_por_estrato(conn)
+        taxas = calcular_taxas(casos, indice, populacao)
+        gravar_taxas(conn, taxas)
+
+        sem_populacao = casos.loc[linhas_populacao(indice, casos['municipio']) < 0, 'internacoes'].sum()
+        print(f"✅ {len(taxas):,} taxas gravadas ({time.perf_counter() - inicio:.1f}s)")
+        if sem_populacao:
+            print(f"⚠️ {sem_populacao:,} internações de municípios sem estimativa populacional ficaram de fora")
+
+        print("\nMunicípios com maior taxa padronizada de internação:")
+        maiores = taxas[(taxas['periodo'] == TODOS) & (taxas['cid'] == TODOS)].nlargest(10, 'taxa_padronizada')
+        for linha in maiores.itertuples():
+            print(f"  {linha.codigo_municipio}: {linha.taxa_padronizada:.1f} por 10 mil "
+                  f"(bruta {linha.taxa_bruta:.1f}, {linha.internacoes:,} internações)")
+    finally:
+        conn.close()
+
+    return True
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Calcula as taxas de internação por 10 mil habitantes')
+    parser.add_argument('--populacao', help='CSV de estimativas populacionais (padrão: data/raw/populacao_municipios.csv)')
+    args = parser.parse_args()
+
+    if not atualizar_taxas_database(args.populacao):
+        sys.exit(1)
@@ -0,0 +1,60 @@
+"""
+Validação da qualidade dos dados consolidados
+Avalia as regras de config/qualidade.py no CSV consolidado e grava, na tabela qualidade_dados,
+as violações de cada regra com uma amostra das AIHs para conferência
+"""
+
+import sqlite3
+import os
+import sys
+import time
+import argparse
+
+# Adiciona o diretório raiz ao path para importar as regras
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.settings import FILES
+from config.qualidade import REGRAS, TAMANHO_LOTE, validar_arquivo, gravar_qualidade
+
+DB_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'database', 'internacoes_datasus.db')
+
+def validar_qualidade_database(csv_path=None, tamanho_lote=TAMANHO_LOTE):
+    """Etapa do pipeline: valida o CSV consolidado e grava o resultado no banco"""
+
+    csv_path = csv_path or FILES['csv_completo']
+    if not os.path.exists(csv_path):
+        print(f"❌ CSV consolidado não encontrado: {csv_path}")
+        return False
+
+    print("=== QUALIDADE DOS DADOS ===")
+    inicio = time.perf_counter()
+    registros, resultado = validar_arquivo(csv_path, tamanho_lote)
+    print(f"✅ {registros:,} registros avaliados em {len(resultado)} regras ({time.perf_counter() - inicio:.1f}s)")
+
+    for nome in REGRAS.keys() - resultado.keys():
+        print(f"⚠️ Regra '{nome}' ignorada: colunas {REGRAS[nome]['colunas']} ausentes do arquivo")
+
+    conn = sqlite3.connect(DB_PATH, timeout=60)
+    try:
+        gravar_qualidade(conn, os.path.basename(csv_path), registros, resultado)
+    finally:
+        conn.close()
+
+    print("\nViolações por regra:")
+    for nome, r in sorted(resultado.items(), key=lambda item: item[1]['violacoes'], reverse=True):
+        percentual = r['violacoes'] / registros * 100 if registros else 0.0
+        marcador = '✅' if not r['violacoes'] else '⚠️'
+        print(f"  {marcador} {REGRAS[nome]['descricao']}: {r['violacoes']:,} ({percentual:.2f}%)")
+        if r['amostra']:
+            print(f"     AIHs: {', '.join(r['amostra'][:5])}")
+
+    return True
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Valida a qualidade dos dados consolidados do SIH')
+    parser.add_argument('--csv', help='CSV a validar (padrão: o consolidado em data/processed)')
+    parser.add_argument('--lote', type=int, default=TAMANHO_LOTE, help='Linhas lidas por lote')
+    args = parser.parse_args()
+
+    if not validar_qualidade_database(args.csv, args.lote):
+        sys.exit(1)
@@ -0,0 +1,338 @@
+"""
+Serviço HTTP local, somente leitura, com as agregações do dashboard
+Outras ferramentas (BI, relatórios agendados) consultam KPIs, principais causas, série temporal
+e ranking de municípios em JSON ou Arrow sem abrir o banco nem refazer as junções.
+Cada consulta base roda uma vez por versão dos dados (tamanho e data dos arquivos); as
+respostas levam ETag e um cliente com a versão atual recebe 304 sem tocar no banco.
+As requisições são atendidas por um pool fixo de threads, cada uma com uma conexão do pool
+
+Uso: python servico/servidor.py [--porta 8502] [--workers 8]
+     curl "http://127.0.0.1:8502/principais-causas?ano=2025&mes=1&limite=5"
+"""
+
+import os
+import sys
+import json
+import hashlib
+import logging
+import argparse
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from http.server import HTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qs
+
+import pandas as pd
+
+# Adiciona o diretório raiz ao path para importar a configuração e as consultas
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.settings import DATABASE, PARTICIONAMENTO, SERVICO, LOGGING
+from config.motor import PoolConexoes, executar_consulta, versao_dados
+from config.particoes import executar_consulta_particionada
+
+logging.basicConfig(level=LOGGING['level'], format=LOGGING['format'])
+logger = logging.getLogger('servico')
+
+# Respostas prontas guardadas por ETag (as mais antigas saem primeiro)
+MAXIMO_RESPOSTAS = 256
+
+LIMITE_PADRAO = 10
+LIMITE_MAXIMO = 500
+
+SOMAS = ['internacoes', 'valor_total', 'dias_permanencia']
+
+def importar_pyarrow():
+    """Importa o pyarrow só quando uma resposta Arrow é pedida, já que ele é opcional"""
+    try:
+        import pyarrow
+    except ImportError as e:
+        raise ImportError("Respostas Arrow requerem o pacote pyarrow (pip install pyarrow)") from e
+    return pyarrow
+
+def inteiro(parametros, nome, padrao=None, minimo=None, maximo=None):
+    """Parâmetro inteiro da URL, com limites; ValueError vira resposta 400"""
+
+    valor = parametros.get(nome)
+    if valor in (None, ''):
+        return padrao
+    try:
+        valor = int(valor)
+    except ValueError:
+        raise ValueError(f"Parâmetro '{nome}' deve ser inteiro: {valor}")
+    if minimo is not None:
+        valor = max(valor, minimo)
+    if maximo is not None:
+        valor = min(valor, maximo)
+    return valor
+
+def filtrar_competencia(df, parametros):
+    """Linhas do ano e do mês pedidos (sem filtro quando ausentes)"""
+
+    ano = inteiro(parametros, 'ano')
+    mes = inteiro(parametros, 'mes')
+    if ano is not None:
+        df = df[df['ano_competencia'] == ano]
+    if mes is not None:
+        df = df[df['mes_competencia'] == mes]
+    return df
+
+def ordem_ranking(parametros):
+    ordem = parametros.get('ordem', 'internacoes')
+    if ordem not in ('internacoes', 'valor_total'):
+        raise ValueError("Parâmetro 'ordem' deve ser 'internacoes' ou 'valor_total'")
+    return ordem
+
+def com_medias(df):
+    """Valor médio e permanência média a partir das somas"""
+    df['valor_medio'] = df['valor_total'] / df['internacoes']
+    df['permanencia_media'] = df['dias_permanencia'] / df['internacoes']
+    return df.drop(columns='dias_permanencia')
+
+def ranking(df, chaves, parametros):
+    """Soma por chave no período e devolve os maiores pela ordem pedida"""
+    limite = inteiro(parametros, 'limite', LIMITE_PADRAO, 1, LIMITE_MAXIMO)
+    df = filtrar_competencia(df, parametros)
+    df = df.groupby(chaves, as_index=False, dropna=False)[SOMAS].sum()
+    return com_medias(df.nlargest(limite, ordem_ranking(parametros)))
+
+def kpis(df, parametros):
+    df = filtrar_competencia(df, parametros)
+    totais = df[SOMAS + ['dias_uti']].sum()
+    return com_medias(pd.DataFrame([{
+        'competencias': len(df),
+        'internacoes': int(totais['internacoes']),
+        'valor_total': float(totais['valor_total']),
+        'dias_permanencia': float(totais['dias_permanencia']),
+        'dias_uti': float(totais['dias_uti']),
+    }]))
+
+def serie_temporal(df, parametros):
+    granularidade = parametros.get('granularidade', 'mes')
+    if granularidade not in ('mes', 'dia'):
+        raise ValueError("Parâmetro 'granularidade' deve ser 'mes' ou 'dia'")
+
+    df = filtrar_competencia(df, parametros)
+    if granularidade == 'mes':
+        chaves = ['ano_competencia', 'mes_competencia']
+    else:
+        # Datas gravadas como AAAAMMDD (texto ou número) viram AAAA-MM-DD
+        df = df.assign(data=pd.to_datetime(
+            df['data_internacao'].astype(str).str.replace('-', '', regex=False).str[:8],
+            format='%Y%m%d', errors='coerce'
+        ).dt.strftime('%Y-%m-%d'))
+        chaves = ['data']
+    return com_medias(df.groupby(chaves, as_index=False)[SOMAS].sum().sort_values(chaves))
+
+# Rotas do serviço: consulta base (config/consultas.py) e agregação sobre ela
+ENDPOINTS = {
+    'kpis': {
+        'consulta': 'servico_kpis',
+        'agregar': kpis,
+        'parametros': ['ano', 'mes'],
+    },
+    'principais-causas': {
+        'consulta': 'servico_principais_causas',
+        'agregar': lambda df, p: ranking(df, ['codigo_diagnostico_principal', 'descricao'], p),
+        'parametros': ['ano', 'mes', 'limite', 'ordem'],
+    },
+    'serie-temporal': {
+        'consulta': 'servico_serie_temporal',
+        'agregar': serie_temporal,
+        'parametros': ['ano', 'mes', 'granularidade'],
+    },
+    'ranking-municipios': {
+        'consulta': 'servico_ranking_municipios',
+        'agregar': lambda df, p: ranking(df, ['codigo_municipio_residencia', 'nome'], p),
+        'parametros': ['ano', 'mes', 'limite', 'ordem'],
+    },
+}
+
+class Agregacoes:
+    """
+    Tabelas base (uma por consulta) e respostas prontas da versão atual dos dados
+    Quando a versão muda, tudo é descartado e recarregado na próxima requisição
+    """
+
+    def __init__(self, workers):
+        self.workers = workers
+        self.pool = None
+        self.trava = threading.Lock()
+        self.travas_consulta = {endpoint['consulta']: threading.Lock() for endpoint in ENDPOINTS.values()}
+        self.versao = None
+        self.tabelas = {}
+        self.respostas = OrderedDict()
+
+    def versao_atual(self):
+        """Versão dos dados, descartando os caches se ela mudou"""
+
+        versao = versao_dados()
+        with self.trava:
+            if versao != self.versao:
+                if self.versao is not None:
+                    logger.info(f"Dados alterados (versão {self.versao} → {versao}); caches descartados")
+                self.versao = versao
+                self.tabelas = {}
+                self.respostas.clear()
+        return versao
+
+    def carregar(self, nome):
+        """Executa a consulta base no pool de conexões (ou nas partições)"""
+
+        if PARTICIONAMENTO['ativo'] and DATABASE['engine'] == 'sqlite':
+            return executar_consulta_particionada(nome)
+
+        with self.trava:
+            if self.pool is None:
+                self.pool = PoolConexoes(self.workers)
+        with self.pool.conexao() as conn:
+            return executar_consulta(nome, conn)
+
+    def tabela(self, nome, versao):
+        """Tabela base da consulta; só uma thread a carrega, as demais esperam e reaproveitam"""
+
+        with self.travas_consulta[nome]:
+            chave = (nome, versao)
+            if chave not in self.tabelas:
+                self.tabelas[chave] = self.carregar(nome)
+            return self.tabelas[chave]
+
+    def resposta(self, rota, parametros, formato, versao, etag):
+        """Corpo e tipo da resposta, a partir do cache de respostas quando possível"""
+
+        with self.trava:
+            if etag in self.respostas:
+                self.respostas.move_to_end(etag)
+                return self.respostas[etag]
+
+        endpoint = ENDPOINTS[rota]
+        resultado = endpoint['agregar'](self.tabela(endpoint['consulta'], versao), parametros)
+
+        if formato == 'arrow':
+            pyarrow = importar_pyarrow()
+            tabela = pyarrow.Table.from_pandas(resultado.reset_index(drop=True), preserve_index=False)
+            saida = pyarrow.BufferOutputStream()
+            with pyarrow.ipc.new_stream(saida, tabela.schema) as escritor:
+                escritor.write_table(tabela)
+            pronta = (saida.getvalue().to_pybytes(), 'application/vnd.apache.arrow.stream')
+        else:
+            dados = resultado.to_json(orient='records', force_ascii=False, double_precision=6)
+            corpo = f'{{"versao": "{versao}", "endpoint": "{rota}", "dados": {dados}}}'
+            pronta = (corpo.encode('utf-8'), 'application/json; charset=utf-8')
+
+        with self.trava:
+            self.respostas[etag] = pronta
+            if len(self.respostas) > MAXIMO_RESPOSTAS:
+                self.respostas.popitem(last=False)
+        return pronta
+
+    def fechar(self):
+        if self.pool is not None:
+            self.pool.fechar()
+
+class RequisicaoAgregacoes(BaseHTTPRequestHandler):
+    """GET das rotas de ENDPOINTS; ?formato=arrow (ou Accept Arrow) devolve um stream Arrow IPC"""
+
+    server_version = 'InternacoesDATASUS/1.0'
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        rota = url.path.strip('/')
+        parametros = {nome: valores[0] for nome, valores in parse_qs(url.query).items()}
+
+        if rota in ('', 'versao'):
+            return self.enviar_json(200, {
+                'versao': self.server.agregacoes.versao_atual(),
+                'endpoints': {nome: endpoint['parametros'] for nome, endpoint in ENDPOINTS.items()},
+            })
+        if rota not in ENDPOINTS:
+            return self.enviar_json(404, {'erro': f"Endpoint desconhecido: /{rota}", 'endpoints': list(ENDPOINTS)})
+
+        formato = parametros.pop('formato', None)
+        if formato is None:
+            formato = 'arrow' if 'arrow' in self.headers.get('Accept', '') else 'json'
+        if formato not in ('json', 'arrow'):
+            return self.enviar_json(400, {'erro': "Parâmetro 'formato' deve ser 'json' ou 'arrow'"})
+
+        # Parâmetros fora da rota não mudam a resposta nem o ETag
+        parametros = {nome: parametros[nome] for nome in ENDPOINTS[rota]['parametros'] if nome in parametros}
+        versao = self.server.agregacoes.versao_atual()
+        identidade = json.dumps([versao, rota, sorted(parametros.items()), formato])
+        etag = '"' + hashlib.sha1(identidade.encode()).hexdigest()[:20] + '"'
+
+        if etag in [valor.strip() for valor in self.headers.get('If-None-Match', '').split(',')]:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+
+        try:
+            corpo, tipo = self.server.agregacoes.resposta(rota, parametros, formato, versao, etag)
+        except ValueError as e:
+            return self.enviar_json(400, {'erro': str(e)})
+        except ImportError as e:
+            return self.enviar_json(406, {'erro': str(e)})
+        except Exception as e:
+            logger.exception(f"Erro em /{rota}")
+            return self.enviar_json(503, {'erro': f"Dados indisponíveis: {e}"})
+
+        self.send_response(200)
+        self.send_header('Content-Type', tipo)
+        self.send_header('Content-Length', str(len(corpo)))
+        self.send_header('ETag', etag)
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('X-Versao-Dados', versao)
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def enviar_json(self, status, conteudo):
+        corpo = json.dumps(conteudo, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(corpo)))
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def log_message(self, formato, *args):
+        logger.info(f"{self.address_string()} - {formato % args}")
+
+class ServidorAgregacoes(HTTPServer):
+    """HTTPServer que atende cada conexão em um pool fixo de threads"""
+
+    def __init__(self, endereco, workers=SERVICO['workers']):
+        super().__init__(endereco, RequisicaoAgregacoes)
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='servico')
+        self.agregacoes = Agregacoes(workers)
+
+    def process_request(self, request, client_address):
+        self.executor.submit(self.atender, request, client_address)
+
+    def atender(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        self.executor.shutdown(wait=True)
+        self.agregacoes.fechar()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Serviço HTTP local com as agregações das internações')
+    parser.add_argument('--host', default=SERVICO['host'])
+    parser.add_argument('--porta', type=int, default=SERVICO['porta'])
+    parser.add_argument('--workers', type=int, default=SERVICO['workers'], help='Threads que atendem as requisições')
+    args = parser.parse_args()
+
+    servidor = ServidorAgregacoes((args.host, args.porta), args.workers)
+    print(f"✅ Serviço em http://{args.host}:{args.porta} ({args.workers} workers, motor {DATABASE['engine']})")
+    print(f"   Endpoints: {', '.join('/' + nome for nome in ENDPOINTS)}")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        print("\nEncerrando o serviço...")
+    finally:
+        servidor.server_close()